@@ -0,0 +1,79 @@
+"""Compares rebuilding the nested dictionary of mappings per chromosome
+position (as GeneRegion.retrieve_mappings_per_chromosome did on every
+call) with building the ChromosomePositionTable once, for a TTN-sized
+transcript. analyse_transcript retrieved the mappings four times.
+
+Run from the repository root via:
+    python -m benchmarks.benchmark_chromosome_position_table"""
+import tracemalloc
+import timeit
+import random
+
+from metadome.domain.models.entities.gene_region import ChromosomePositionTable
+from metadome.domain.services.computation.codon_computations import retrieve_background_variant_counts
+
+N_CODONS = 35991 # length of the longest TTN isoform
+N_RETRIEVALS = 4
+
+class BenchmarkMapping(object):
+    def __init__(self, base_pair, codon, codon_base_pair_position, amino_acid_position):
+        self.base_pair = base_pair
+        self.codon = codon
+        self.codon_base_pair_position = codon_base_pair_position
+        self.amino_acid_position = amino_acid_position
+
+def create_mappings():
+    random.seed(0)
+    mappings_per_cDNA = {}
+    chromosome_pos_to_cDNA = {}
+    for amino_acid_position in range(N_CODONS):
+        codon = ''.join(random.choice('ACGT') for _ in range(3))
+        for codon_base_pair_position in range(3):
+            cDNA_position = amino_acid_position*3 + codon_base_pair_position
+            mappings_per_cDNA[cDNA_position] = BenchmarkMapping(codon[codon_base_pair_position], codon, codon_base_pair_position, amino_acid_position)
+            chromosome_pos_to_cDNA[179390716 + cDNA_position] = cDNA_position
+    return chromosome_pos_to_cDNA, mappings_per_cDNA
+
+def build_nested_dictionary(chromosome_pos_to_cDNA, mappings_per_cDNA, gencode_transcription_id):
+    """The previous implementation of GeneRegion.retrieve_mappings_per_chromosome"""
+    mappings_per_chromosome = dict()
+    for chromosome_position in chromosome_pos_to_cDNA.keys():
+        mappings_per_chromosome[chromosome_position] = {}
+        mappings_per_chromosome[chromosome_position]['base_pair_representation'] = mappings_per_cDNA[chromosome_pos_to_cDNA[chromosome_position]].codon
+        mappings_per_chromosome[chromosome_position]['codon_base_pair_position'] = mappings_per_cDNA[chromosome_pos_to_cDNA[chromosome_position]].codon_base_pair_position
+        mappings_per_chromosome[chromosome_position]['amino_acid_position'] = mappings_per_cDNA[chromosome_pos_to_cDNA[chromosome_position]].amino_acid_position
+        mappings_per_chromosome[chromosome_position]['base_pair'] = mappings_per_cDNA[chromosome_pos_to_cDNA[chromosome_position]].base_pair
+        mappings_per_chromosome[chromosome_position]['gencode_transcription_id'] = gencode_transcription_id
+    return mappings_per_chromosome
+
+def measure(function, repeat=5):
+    """Returns the best wall time (in seconds) and the peak memory (in bytes) of a call"""
+    best_time = min(timeit.repeat(function, number=1, repeat=repeat))
+    tracemalloc.start()
+    function()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best_time, peak_memory
+
+if __name__ == '__main__':
+    chromosome_pos_to_cDNA, mappings_per_cDNA = create_mappings()
+    transcript_id = 'ENST00000589042.1'
+
+    def nested_dictionaries():
+        for _ in range(N_RETRIEVALS):
+            build_nested_dictionary(chromosome_pos_to_cDNA, mappings_per_cDNA, transcript_id)
+
+    def position_table():
+        ChromosomePositionTable.initializeFromMappings(chromosome_pos_to_cDNA, mappings_per_cDNA, transcript_id)
+
+    print("{} chromosome positions, {} retrievals per transcript".format(len(chromosome_pos_to_cDNA), N_RETRIEVALS))
+    for name, function in [('nested dictionaries', nested_dictionaries), ('position table', position_table)]:
+        seconds, peak_memory = measure(function)
+        print("{:<30} {:>8.1f} ms {:>8.1f} MiB peak".format(name, seconds*1000, peak_memory/1024**2))
+
+    # the background counts iterate over all positions
+    nested_dictionary = build_nested_dictionary(chromosome_pos_to_cDNA, mappings_per_cDNA, transcript_id)
+    table = ChromosomePositionTable.initializeFromMappings(chromosome_pos_to_cDNA, mappings_per_cDNA, transcript_id)
+    for name, mappings in [('background counts (dict)', nested_dictionary), ('background counts (table)', table)]:
+        seconds, peak_memory = measure(lambda: retrieve_background_variant_counts(mappings))
+        print("{:<30} {:>8.1f} ms {:>8.1f} MiB peak".format(name, seconds*1000, peak_memory/1024**2))
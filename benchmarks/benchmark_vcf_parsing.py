@@ -0,0 +1,67 @@
+"""Compares the records per second of parsing gnomAD-like exome records
+with PyVCF (as tabix_query did) and with VCFRecord, retrieving only the
+AC, AF and AN values that annotateTranscriptWithGnomADData uses. The
+synthetic records have as many INFO fields as the gnomAD r2.0.2 exome
+sites file.
+
+Run from the repository root via:
+    python -m benchmarks.benchmark_vcf_parsing"""
+import timeit
+import random
+import io
+import vcf
+
+from metadome.domain.parsers.vcf_record import VCFHeader, VCFRecord
+
+N_RECORDS = 20000
+N_POPULATIONS = 8
+N_INFO_FIELDS_PER_POPULATION = 14
+N_ALTERNATE_ALLELES = 2
+
+def create_vcf_lines():
+    random.seed(0)
+    info_definitions = [('AC', 'A', 'Integer'), ('AF', 'A', 'Float'), ('AN', '1', 'Integer'), ('CSQ', '.', 'String')]
+    for population in range(N_POPULATIONS):
+        for field in range(N_INFO_FIELDS_PER_POPULATION):
+            info_definitions.append(('FIELD_{}_POP_{}'.format(field, population), 'A' if field % 2 == 0 else '1', 'Integer' if field % 3 else 'Float'))
+
+    header_lines = ['##fileformat=VCFv4.1']
+    header_lines += ['##INFO=<ID={},Number={},Type={},Description="{}">'.format(ID, number, value_type, ID) for ID, number, value_type in info_definitions]
+    header_lines += ['#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO']
+
+    record_lines = []
+    for i in range(N_RECORDS):
+        info = []
+        for ID, number, value_type in info_definitions:
+            n_values = N_ALTERNATE_ALLELES if number == 'A' else 1
+            if value_type == 'Integer':
+                values = [str(random.randint(0, 100000)) for _ in range(n_values)]
+            elif value_type == 'Float':
+                values = ['{:.3e}'.format(random.random()) for _ in range(n_values)]
+            else:
+                values = ['G|missense_variant|MODERATE|OR4F5|ENSG00000186092|Transcript|ENST00000335137|protein_coding|1/1||||'+str(i)]
+            info.append(ID+'='+','.join(values))
+        record_lines.append('\t'.join(['1', str(69000+i), 'rs'+str(i), 'A', 'G,T', '1000.0', 'PASS', ';'.join(info)]))
+
+    return header_lines, record_lines
+
+if __name__ == '__main__':
+    header_lines, record_lines = create_vcf_lines()
+    vcf_text = '\n'.join(header_lines+record_lines)+'\n'
+
+    def pyvcf_records():
+        for record in vcf.Reader(fsock=io.StringIO(vcf_text)):
+            for i, _ in enumerate(record.ALT):
+                (record.INFO['AC'][i], record.INFO['AF'][i], record.INFO['AN'])
+
+    def vcf_records():
+        header = VCFHeader.initializeFromLines(header_lines)
+        for line in record_lines:
+            record = VCFRecord.initializeFromLine(line, header)
+            for i, _ in enumerate(record.ALT):
+                (record.INFO['AC'][i], record.INFO['AF'][i], record.INFO['AN'])
+
+    print("{} records with {} INFO fields".format(N_RECORDS, 4+N_POPULATIONS*N_INFO_FIELDS_PER_POPULATION))
+    for name, function in [('PyVCF', pyvcf_records), ('VCFRecord', vcf_records)]:
+        seconds = min(timeit.repeat(function, number=1, repeat=3))
+        print("{:<30} {:>10.0f} records/s".format(name, N_RECORDS/seconds))
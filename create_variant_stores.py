@@ -0,0 +1,12 @@
+import logging
+
+from metadome.domain.services.variant_store_creation import create_variant_stores
+from metadome.database import db
+from metadome.application import app
+
+logging.basicConfig(format='%(levelname)s:%(message)s', level=logging.INFO)
+
+db.init_app(app)
+with app.app_context():
+    # import the variants in the coding regions of all mappings
+    create_variant_stores()
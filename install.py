@@ -1,4 +1,5 @@
-from metadome.default_settings import RECONSTRUCT_METADOMAINS
+import os
+from metadome.default_settings import RECONSTRUCT_METADOMAINS, PFAM_HMM_CACHE_DIR
 from metadome.domain.infrastructure import write_all_genes_names_to_disk
 from metadome.domain.services.meta_domain_creation import create_metadomains
 from metadome.domain.services.database_creation import create_db
@@ -13,6 +14,9 @@ with app.app_context():
     db.create_all()
     create_db()
 
+    # the meta_domain creation populates the Pfam HMM cache
+    os.makedirs(PFAM_HMM_CACHE_DIR, exist_ok=True)
+
     # now create all meta_domains
     create_metadomains(reconstruct=RECONSTRUCT_METADOMAINS)
 
@@ -36,6 +36,7 @@ GENE_NAMES_FILE = DATA_DIR+'gene_names.txt'
 
 # local executables
 BLASTP_EXECUTABLE = "/usr/externals/blast/bin/blastp"
+BLASTP_NUM_THREADS = 15 # number of threads per blastp process
 CLUSTALW_EXECUTABLE = "/usr/externals/clustalw/clustalw2"
 HMMFETCH_EXECUTABLE = "/usr/externals/hmmer/binaries/hmmfetch"
 HMMLOGO_EXECUTABLE = "/usr/externals/hmmer/binaries/hmmlogo"
@@ -46,8 +47,11 @@ HMMSTAT_EXECUTABLE = "/usr/externals/hmmer/binaries/hmmstat"
 # Genome specific files
 GENCODE_HG_ANNOTATION_FILE_GTF = DATA_DIR+"Gencode/gencode.v19.annotation.gtf"
 GENCODE_HG_ANNOTATION_FILE_GFF3 = DATA_DIR+"Gencode/gencode.v19.annotation.gff3"
+GENCODE_HG_ANNOTATION_CDS_INDEX_FILE = GENCODE_HG_ANNOTATION_FILE_GFF3+".CDS.transcript_id.index.json" # Index of the CDS features per transcript in GENCODE_HG_ANNOTATION_FILE_GFF3, (re)built when missing or outdated
 GENCODE_HG_TRANSCRIPTION_FILE = DATA_DIR+"Gencode/gencode.v19.pc_transcripts.fa"
 GENCODE_HG_TRANSLATION_FILE = DATA_DIR+"Gencode/gencode.v19.pc_translations.fa"
+GENCODE_HG_TRANSCRIPTION_INDEX_FILE = GENCODE_HG_TRANSCRIPTION_FILE+".transcription_id.index.json" # Header index of GENCODE_HG_TRANSCRIPTION_FILE, (re)built when missing or outdated
+GENCODE_HG_TRANSLATION_INDEX_FILE = GENCODE_HG_TRANSLATION_FILE+".gene_name.index.json" # Header index of GENCODE_HG_TRANSLATION_FILE, (re)built when missing or outdated
 GENCODE_REFSEQ_FILE = DATA_DIR+"Gencode/gencode.v19.metadata.RefSeq"
 GENCODE_SWISSPROT_FILE = DATA_DIR+"Gencode/gencode.v19.metadata.SwissProt"
 GENCODE_BASIC_FILE = DATA_DIR+"Gencode/ucsc.gencode.v19.wgEncodeGencodeBasic.txt"
@@ -66,6 +70,7 @@ UNIPROT_SPROT_CANONICAL_AND_ISOFORM = UNIPROT_DIR+"uniprot_sprot_canonical_and_v
 UNIPROT_SPROT_ISOFORM = UNIPROT_DIR+"uniprot_sprot_varsplic.fasta"
 UNIPROT_SPROT_CANONICAL = UNIPROT_DIR+"uniprot_sprot.fasta"
 UNIPROT_SPROT_SPECIES_FILTER = "HUMAN"
+UNIPROT_INDEX_FILE_SUFFIX = ".accession.index.json" # Suffix of the accession code index next to each UniProt FASTA file, (re)built when missing or outdated
 
 # Meta-domain files
 METADOMAIN_DIR = DATA_DIR+"metadomains/"
@@ -74,6 +79,10 @@ METADOMAIN_ALIGNMENT_FILE_NAME = 'metadomain_alignments' # Alignments are saved
 METADOMAIN_MAPPING_FILE_NAME = 'metadomain_mappings' # Mappings are saved as: METADOMAIN_DIR+<Pfam_id>+'/'+METADOMAIN_MAPPING_FILE_NAME
 METADOMAIN_DETAILS_FILE_NAME = 'metadomain_details.json' # Details are saved as: METADOMAIN_DIR+<Pfam_id>+'/'+METADOMAIN_DETAILS_FILE_NAME
 METADOMAIN_SNV_ANNOTATION_FILE_NAME = 'metadomain_snv_annotation' # Annotations are saved as: METADOMAIN_DIR+<Pfam_id>+'/'+METADOMAIN_SNV_ANNOTATION_FILE_NAME
+METADOMAIN_MAPPING_MEMORY_MAPPED_DIR_NAME = 'metadomain_mappings.mmap' # Memory-mapped mappings (one file per column), preferred over the csv format when present
+METADOMAIN_SNV_ANNOTATION_MEMORY_MAPPED_DIR_NAME = 'metadomain_snv_annotation.mmap' # Memory-mapped annotations (one file per column), preferred over the csv format when present
+METADOMAIN_CACHE_MAX_BYTES = 2*1024**3 # Estimated memory budget (in bytes) for the meta domains kept in memory per process
+METADOMAIN_ANNOTATION_N_WORKERS = 1 # Number of processes that annotate the per chromosome shards of a meta domain concurrently, 1 annotates within the calling process
 
 # Pre-build visualization files
 PRE_BUILD_VISUALIZATION_DIR = DATA_DIR+"metadome_visualization/"
@@ -81,19 +90,25 @@ PRE_BUILD_VISUALIZATION_FILE_NAME = 'metadome_visualization.json' # Visualizatio
 PRE_BUILD_VISUALIZATION_TASK_FILE_NAME = 'visualization_task'
 PRE_BUILD_VISUALIZATION_ERROR_FILE_NAME = 'visualization_error'
 
+# Per transcript annotation files
+TRANSCRIPT_ANNOTATION_CACHE_DIR = DATA_DIR+"transcript_annotation/" # Annotations are saved as: TRANSCRIPT_ANNOTATION_CACHE_DIR+<Transcript_id>+'/'+<variant source>+'_'+<checksum>+'.json', only used if this directory exists
+
 # PFAM specific files
 PFAM_DIR = DATA_DIR+"PFAM/Pfam30.0"
 PFAM_ALIGNMENT_DIR = PFAM_DIR+"/alignment/"
 PFAM_HMM_DAT = PFAM_DIR+"/Pfam-A.hmm.dat.gz"
 PFAM_HMM = PFAM_DIR+"/Pfam-A.hmm"
+PFAM_HMM_CACHE_DIR = PFAM_DIR+"/hmm_cache/" # HMMs and their consensus, hmmstat and hmmlogo are saved as: PFAM_HMM_CACHE_DIR+<Pfam AC>+'/'+<result>+'_'+<checksum>+('.hmm'|'.json'), only used if this directory exists
 
 # gnomAD specific files
 GNOMAD_DIR = DATA_DIR + "gnoMAD/"
 GNOMAD_VCF_FILE = GNOMAD_DIR + "pass_gnomad.exomes.r2.0.2.sites.vcf.gz"
 GNOMAD_ACCEPTED_FILTERS = ['PASS']
+GNOMAD_VARIANT_STORE = GNOMAD_DIR + "gnomad_coding_snvs.sqlite" # Local store of the gnomAD SNVs in the coding regions, used instead of GNOMAD_VCF_FILE for the imported regions (see create_variant_stores.py)
 
 # ClinVar specific files
 CLINVAR_DIR = DATA_DIR + 'ClinVar/GRCh37/'
 CLINVAR_ORIGINAL_VCF_FILE = CLINVAR_DIR + 'clinvar.vcf.gz'
 CLINVAR_VCF_FILE = CLINVAR_ORIGINAL_VCF_FILE
 CLINVAR_CONSIDERED_CLINSIG = ['Pathogenic']
+CLINVAR_VARIANT_STORE = CLINVAR_DIR + 'clinvar_coding_snvs.sqlite' # Local store of the ClinVar SNVs in the coding regions, used instead of CLINVAR_VCF_FILE for the imported regions (see create_variant_stores.py)
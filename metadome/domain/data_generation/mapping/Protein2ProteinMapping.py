@@ -8,12 +8,21 @@ def createMappingOfAASequenceToAASequence(primary_sequence, secondary_sequence):
     """Annotates a blast result with the atomic sequence and a mapping of the translated
      sequence based on the gene to the atomic sequence (e.g. the measured structure)"""
     # align the two sequences
-    seq1, seq2 = clustalw_pairwiseAlignment(primary_sequence, secondary_sequence)
+    seq1, seq2 = pairwiseAlignment(primary_sequence, secondary_sequence)
     # Create a mapping of the sequence 
     mapping_seq1_seq2 = createAlignedSequenceMapping(seq1, seq2)
     
     return {'mapping':mapping_seq1_seq2, 'primary_sequence':seq1, 'secondary_sequence':seq2}
 
+def pairwiseAlignment(seq1, seq2):
+    """Creates a pairwise alignment for two given sequences via ClustalW.
+    Returns the aligned sequences"""
+    # identical sequences do not need to be aligned
+    if seq1 == seq2:
+        return seq1, seq2
+    
+    return clustalw_pairwiseAlignment(seq1, seq2)
+
 def map_single_residue(aligned_mapping, cur_protein_position, alternate_position_mapping=None):
     """Maps a single residue for a previously mapped sequence at a given position"""
     # check if the number is in the mapping
@@ -15,37 +15,25 @@ import logging
 
 _log = logging.getLogger(__name__)
         
-def generate_gene_to_swissprot_mapping(gene_name):
+def generate_gene_to_swissprot_mapping(gene_name, mrna_translations=None, matching_coding_translations=None, blast_results=None):
     """
     Given a gene_name, this method generates a mapping between swissprot and 
-    every GENCODE Basic protein-coding translation for that gene
+    every GENCODE Basic protein-coding translation for that gene. The 
+    transcription ids of the GENCODE Basic translations may be provided
+    as mrna_translations, e.g. if retrieved for multiple genes at once.
+    Likewise the translations to be mapped may be provided as 
+    matching_coding_translations (see retrieve_matching_coding_translations)
+    and their blast output as blast_results (see blastUniprotSequencesInBatch)
     """
     _log.info("Starting swissprot mapping for gene '"+gene_name+"'")
     
     # The result of this method; a dictionary containing all items that will be added to the database
     to_be_added_db_entries = {"genes":dict(), "proteins":dict(), "chromosome_positions":dict(), "mappings":dict()}    
     
-    # retrieve all translations for the gene
-    matching_translations = retrieveGeneTranslations_gencode(gene_name)
+    # retrieve the translations to be mapped
+    if matching_coding_translations is None:
+        matching_coding_translations = retrieve_matching_coding_translations(gene_name, mrna_translations)
     
-    # filter out translations that are not validated on the mRNA level
-    mrna_translations =  [a['transcription_id'] for a in retrieveMRNAValidatedTranslations_gencode(gene_name)]
-    mrna_filtered_translations = [translation for translation in matching_translations if translation['transcription-id'] in mrna_translations]
-    n_translations = len(matching_translations)
-    n_translations_after_mrna_filter  = len(mrna_filtered_translations)
-    if n_translations > n_translations_after_mrna_filter:
-        _log.debug("Filtered out '"+str(n_translations - n_translations_after_mrna_filter)+"' from the original '"+str(n_translations)+"' matching translation(s) for gene "+gene_name+", by focussing on mRNA level validation")
-    
-    # filter out any non-coding genes, by excluding any sequences that do not start with a methionine ('M')
-    matching_coding_translations = [translation for translation in mrna_filtered_translations if translation['sequence'].startswith('M')]
-    n_translations_after_coding_filter  = len(matching_coding_translations)
-    if n_translations_after_mrna_filter > n_translations_after_coding_filter:
-        _log.debug("Filtered out '"+str(n_translations - n_translations_after_coding_filter)+"' from the original '"+str(n_translations)+"' matching translation(s) for gene "+gene_name+", by checking if the sequence starts with a Methionine")
-    
-    # retrieve the lengths for the sequences
-    sequences_lengths = [len(s['sequence']) for s in matching_coding_translations]
-    _log.info("Found '"+str(len(matching_coding_translations))+"' matching protein coding translation(s) for gene "+gene_name+", with lengths: "+str(sequences_lengths))
-
     # start creation of the mapping between the gene and swissprot
     for matching_coding_translation in matching_coding_translations:
         # retrieve the nucleotide and coding sequence information
@@ -71,7 +59,7 @@ def generate_gene_to_swissprot_mapping(gene_name):
         
         # retrieve uniprot match
         try:
-            uniprot = retrieveIdenticalUniprotMatch(matching_coding_translation, species_filter=UNIPROT_SPROT_SPECIES_FILTER)
+            uniprot = retrieveIdenticalUniprotMatch(matching_coding_translation, species_filter=UNIPROT_SPROT_SPECIES_FILTER, blast_results=blast_results)
         except (NoUniProtACFoundException) as e:
             _log.error("For gene '"+str(gene_name)+
                                     "' with translation '"+str(matching_coding_translation['translation-name'])+
@@ -91,4 +79,33 @@ def generate_gene_to_swissprot_mapping(gene_name):
                                     "' the translation '"+str(matching_coding_translation['translation-name'])+
                                     "' is matched and mapped with '"+str(uniprot['uniprot_ac'])+"'")
     
-    return to_be_added_db_entries
\ No newline at end of file
+    return to_be_added_db_entries
+
+def retrieve_matching_coding_translations(gene_name, mrna_translations=None):
+    """
+    Retrieves the GENCODE protein-coding translations for the gene_name that 
+    are validated on the mRNA level, see generate_gene_to_swissprot_mapping
+    """
+    # retrieve all translations for the gene
+    matching_translations = retrieveGeneTranslations_gencode(gene_name)
+    
+    # filter out translations that are not validated on the mRNA level
+    if mrna_translations is None:
+        mrna_translations =  [a['transcription_id'] for a in retrieveMRNAValidatedTranslations_gencode(gene_name)]
+    mrna_filtered_translations = [translation for translation in matching_translations if translation['transcription-id'] in mrna_translations]
+    n_translations = len(matching_translations)
+    n_translations_after_mrna_filter  = len(mrna_filtered_translations)
+    if n_translations > n_translations_after_mrna_filter:
+        _log.debug("Filtered out '"+str(n_translations - n_translations_after_mrna_filter)+"' from the original '"+str(n_translations)+"' matching translation(s) for gene "+gene_name+", by focussing on mRNA level validation")
+    
+    # filter out any non-coding genes, by excluding any sequences that do not start with a methionine ('M')
+    matching_coding_translations = [translation for translation in mrna_filtered_translations if translation['sequence'].startswith('M')]
+    n_translations_after_coding_filter  = len(matching_coding_translations)
+    if n_translations_after_mrna_filter > n_translations_after_coding_filter:
+        _log.debug("Filtered out '"+str(n_translations - n_translations_after_coding_filter)+"' from the original '"+str(n_translations)+"' matching translation(s) for gene "+gene_name+", by checking if the sequence starts with a Methionine")
+    
+    # retrieve the lengths for the sequences
+    sequences_lengths = [len(s['sequence']) for s in matching_coding_translations]
+    _log.info("Found '"+str(len(matching_coding_translations))+"' matching protein coding translation(s) for gene "+gene_name+", with lengths: "+str(sequences_lengths))
+    
+    return matching_coding_translations
@@ -1,7 +1,11 @@
 from metadome.domain.repositories import MappingRepository, ProteinRepository, InterproRepository
-from metadome.domain.services.helper_functions import convertListOfIntegerToRanges
+from metadome.domain.services.helper_functions import convertListOfIntegerToRanges,\
+    IntervalIndex
 from metadome.domain.models.entities.codon import Codon
 
+import collections.abc
+import numpy as np
+
 class FailedToConstructGeneRegion(Exception):
     pass
 
@@ -11,6 +15,104 @@ class RegioncDNALengthDoesNotEqualProteinLengthException(Exception):
 class MalformedGeneRegionException(Exception):
     pass
 
+class ChromosomePositionTable(collections.abc.Mapping):
+    """
+    ChromosomePositionTable
+    Read-only, array-backed representation of the mappings of a gene 
+    region per chromosome position, as:
+    {chromosome_position: {'base_pair_representation', 'codon_base_pair_position',
+    'amino_acid_position', 'base_pair', 'gencode_transcription_id'}}
+    The dictionary per chromosome position is only created on lookup.
+    Missing integer values are stored as -1, missing strings as ''
+    
+    Variables
+    name                        description
+    chromosome_positions        numpy.ndarray of the sorted chromosome positions
+    cDNA_positions              numpy.ndarray of the cDNA position per chromosome position
+    codons                      numpy.ndarray of the codon per chromosome position
+    codon_base_pair_positions   numpy.ndarray of the position in the codon per chromosome position
+    amino_acid_positions        numpy.ndarray of the amino acid position per chromosome position
+    base_pairs                  numpy.ndarray of the base pair per chromosome position
+    gencode_transcription_id    str the transcription id of the gene region
+    """
+    
+    def row_for_chromosome_position(self, chromosome_position):
+        """Returns the row of the chromosome position, raises a KeyError if not present"""
+        row = int(np.searchsorted(self.chromosome_positions, chromosome_position))
+        if row == len(self.chromosome_positions) or self.chromosome_positions[row] != chromosome_position:
+            raise KeyError(chromosome_position)
+        return row
+    
+    def __getitem__(self, chromosome_position):
+        row = self.row_for_chromosome_position(chromosome_position)
+        return self._create_mapping(str(self.codons[row]), int(self.codon_base_pair_positions[row]), int(self.amino_acid_positions[row]), str(self.base_pairs[row]))
+    
+    def __contains__(self, chromosome_position):
+        try:
+            self.row_for_chromosome_position(chromosome_position)
+        except KeyError:
+            return False
+        return True
+    
+    def items(self):
+        """Iterates over (chromosome_position, mapping) in a single pass over the arrays"""
+        codons = [codon or None for codon in self.codons.tolist()]
+        codon_base_pair_positions = [None if x == -1 else x for x in self.codon_base_pair_positions.tolist()]
+        amino_acid_positions = [None if x == -1 else x for x in self.amino_acid_positions.tolist()]
+        base_pairs = [base_pair or None for base_pair in self.base_pairs.tolist()]
+        
+        for row, chromosome_position in enumerate(self.chromosome_positions.tolist()):
+            yield chromosome_position, {'base_pair_representation': codons[row],
+                                        'codon_base_pair_position': codon_base_pair_positions[row],
+                                        'amino_acid_position': amino_acid_positions[row],
+                                        'base_pair': base_pairs[row],
+                                        'gencode_transcription_id': self.gencode_transcription_id}
+    
+    def retrieve_codon_per_amino_acid_position(self):
+        """Returns {amino_acid_position: codon} for the amino acid positions in this table"""
+        amino_acid_positions, first_rows = np.unique(self.amino_acid_positions, return_index=True)
+        codons = self.codons[first_rows]
+        
+        present = amino_acid_positions != -1
+        return dict(zip(amino_acid_positions[present].tolist(), codons[present].tolist()))
+    
+    def _create_mapping(self, codon, codon_base_pair_position, amino_acid_position, base_pair):
+        return {'base_pair_representation': codon or None,
+                'codon_base_pair_position': None if codon_base_pair_position == -1 else codon_base_pair_position,
+                'amino_acid_position': None if amino_acid_position == -1 else amino_acid_position,
+                'base_pair': base_pair or None,
+                'gencode_transcription_id': self.gencode_transcription_id}
+    
+    def __iter__(self):
+        return iter(self.chromosome_positions.tolist())
+    
+    def __len__(self):
+        return len(self.chromosome_positions)
+    
+    def __init__(self, chromosome_positions, cDNA_positions, codons, codon_base_pair_positions, amino_acid_positions, base_pairs, gencode_transcription_id):
+        self.chromosome_positions = chromosome_positions
+        self.cDNA_positions = cDNA_positions
+        self.codons = codons
+        self.codon_base_pair_positions = codon_base_pair_positions
+        self.amino_acid_positions = amino_acid_positions
+        self.base_pairs = base_pairs
+        self.gencode_transcription_id = gencode_transcription_id
+    
+    @classmethod
+    def initializeFromMappings(cls, chromosome_pos_to_cDNA, mappings_per_cDNA, gencode_transcription_id):
+        """Builds the table from {chromosome_position: cDNA_position} and {cDNA_position: models.mapping.Mapping}"""
+        chromosome_positions = np.array(sorted(chromosome_pos_to_cDNA.keys()), dtype=np.int64)
+        cDNA_positions = np.array([chromosome_pos_to_cDNA[chromosome_position] for chromosome_position in chromosome_positions.tolist()], dtype=np.int64)
+        mappings = [mappings_per_cDNA[cDNA_position] for cDNA_position in cDNA_positions.tolist()]
+        
+        return cls(chromosome_positions=chromosome_positions,
+                   cDNA_positions=cDNA_positions,
+                   codons=np.array([mapping.codon or '' for mapping in mappings], dtype='U3'),
+                   codon_base_pair_positions=np.array([-1 if mapping.codon_base_pair_position is None else mapping.codon_base_pair_position for mapping in mappings], dtype=np.int8),
+                   amino_acid_positions=np.array([-1 if mapping.amino_acid_position is None else mapping.amino_acid_position for mapping in mappings], dtype=np.int32),
+                   base_pairs=np.array([mapping.base_pair or '' for mapping in mappings], dtype='U1'),
+                   gencode_transcription_id=gencode_transcription_id)
+
 class GeneRegion(object):
     """
     GeneRegion Model Entity
@@ -30,8 +132,10 @@ class GeneRegion(object):
     uniprot_ac                str representing the region's uniprot accession code
     uniprot_name              str representing the region's uniprot name
     interpro_domains          list containing interpro domains (models.interpro.Interpro)
+    domain_index              IntervalIndex of the interpro domains over the positions [uniprot_start-1, uniprot_stop]
     regions                   list of regions
-    mappings_per_chromosome   dictionary of mappings per chromosome positions; {POS: models.mapping.Mapping}
+    mappings_per_chromosome   ChromosomePositionTable of the mappings per chromosome position, built once on initialization
+    codons                    list of the codons (models.entities.codon.Codon) indexed by protein position, created on first retrieval
     """
     
     def retrieve_specific_domains_in_gene(self, domain_id):
@@ -40,7 +144,21 @@ class GeneRegion(object):
         return sorted([domain for domain in self.interpro_domains if domain.ext_db_id == domain_id], key=lambda k: k.uniprot_start)
     
     def retrieve_codon_for_protein_position(self, protein_pos):
-        """Returns the codon for this gene region at the protein position"""
+        """Returns the codon for this gene region at the protein position,
+        each codon is created once and reused on subsequent calls"""
+        # check if the codon has been created previously
+        if 0 <= protein_pos < len(self.codons) and not self.codons[protein_pos] is None:
+            return self.codons[protein_pos]
+        
+        _codon = self.create_codon_for_protein_position(protein_pos)
+        
+        # store the codon for reuse
+        if 0 <= protein_pos < len(self.codons):
+            self.codons[protein_pos] = _codon
+        return _codon
+    
+    def create_codon_for_protein_position(self, protein_pos):
+        """Creates the codon for this gene region at the protein position"""
         _codon = None
         # retrieve te mappings
         _mappings = []
@@ -51,20 +169,12 @@ class GeneRegion(object):
         return _codon
     
     def retrieve_mappings_per_chromosome(self):
-        """Returns the mappings for this gene region per chromosome position"""
-        mappings_per_chromosome = dict()
-        for chromosome_position in self.chromosome_pos_to_cDNA.keys():            
-            mappings_per_chromosome[chromosome_position] = {}
-            mappings_per_chromosome[chromosome_position]['base_pair_representation'] = self.mappings_per_cDNA[self.chromosome_pos_to_cDNA[chromosome_position]].codon
-            mappings_per_chromosome[chromosome_position]['codon_base_pair_position'] = self.mappings_per_cDNA[self.chromosome_pos_to_cDNA[chromosome_position]].codon_base_pair_position
-            mappings_per_chromosome[chromosome_position]['amino_acid_position'] = self.mappings_per_cDNA[self.chromosome_pos_to_cDNA[chromosome_position]].amino_acid_position
-            mappings_per_chromosome[chromosome_position]['base_pair'] = self.mappings_per_cDNA[self.chromosome_pos_to_cDNA[chromosome_position]].base_pair
-            mappings_per_chromosome[chromosome_position]['gencode_transcription_id'] = self.gencode_transcription_id
-        return mappings_per_chromosome
+        """Returns the (shared, read-only) mappings for this gene region per chromosome position"""
+        return self.mappings_per_chromosome
     
     def get_domains_for_position(self, position):
         """Checks if there are any protein domains present at the given position"""
-        return [domain for domain in self.interpro_domains if domain.uniprot_start-1 <= position <= domain.uniprot_stop]
+        return self.domain_index.retrieve(position)
     
     
     def __init__(self, _gene):
@@ -81,10 +191,13 @@ class GeneRegion(object):
         self.uniprot_ac = str()
         self.uniprot_name = str()
         self.interpro_domains = []
+        self.domain_index = IntervalIndex([])
         self.regions = []
         self.mappings_per_cDNA = dict()
         self.chromosome_pos_to_cDNA = dict()
         self.protein_pos_to_cDNA = dict()
+        self.mappings_per_chromosome = None
+        self.codons = []
         self.initialize_from_gene(_gene)
     
     def initialize_from_gene(self, _gene):
@@ -105,6 +218,7 @@ class GeneRegion(object):
         self.uniprot_ac = _protein.uniprot_ac
         self.uniprot_name = _protein.uniprot_name
         self.interpro_domains = InterproRepository.get_domains_for_protein(self.protein_id)
+        self.domain_index = IntervalIndex([(domain.uniprot_start-1, domain.uniprot_stop, domain) for domain in self.interpro_domains])
         
         # Retrieve mappings from the database
         self.mappings_per_cDNA = {x.cDNA_position:x for x in MappingRepository.get_mappings_for_gene(_gene)}
@@ -156,6 +270,12 @@ class GeneRegion(object):
 
         # convert the chromosome to ranges
         self.regions = list(convertListOfIntegerToRanges(sorted(self.chromosome_pos_to_cDNA.keys())))
+        
+        # build the mappings per chromosome position once, shared by all consumers
+        self.mappings_per_chromosome = ChromosomePositionTable.initializeFromMappings(self.chromosome_pos_to_cDNA, self.mappings_per_cDNA, self.gencode_transcription_id)
+        
+        # the codons are created on first retrieval
+        self.codons = [None] * self.protein_region_length
 
     def __repr__(self):
         return "<GeneRegion(chr='%s', gene_name='%s', gencode_transcription_id='%s', protein_region_length='%s', cDNA_region_length='%s', strand='%s', number of chromosomal regions='%s')>" % (
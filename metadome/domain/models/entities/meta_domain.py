@@ -1,11 +1,15 @@
 from metadome.domain.data_generation.mapping.meta_domain_mapping import generate_pfam_aligned_codons
-from metadome.domain.services.annotation.codon_annotation import annotate_ClinVar_SNVs_for_codons,\
-    annotate_gnomAD_SNVs_for_codons
+from metadome.domain.services.annotation.codon_annotation import annotate_ClinVar_and_gnomAD_SNVs_for_codon_groups
 from metadome.domain.models.entities.single_nucleotide_variant import SingleNucleotideVariant
 from metadome.domain.models.entities.codon import Codon
+from metadome.domain.services.columnar_storage import read_table,\
+    write_memory_mapped_table, dataframe_from_columns, MemoryMappedTable,\
+    DictionaryEncodedColumn
 from metadome.default_settings import METADOMAIN_DIR,\
     METADOMAIN_MAPPING_FILE_NAME, METADOMAIN_DETAILS_FILE_NAME,\
-    METADOMAIN_SNV_ANNOTATION_FILE_NAME
+    METADOMAIN_SNV_ANNOTATION_FILE_NAME,\
+    METADOMAIN_MAPPING_MEMORY_MAPPED_DIR_NAME,\
+    METADOMAIN_SNV_ANNOTATION_MEMORY_MAPPED_DIR_NAME
 
 import pandas as pd
 import numpy as np
@@ -25,6 +29,124 @@ class ConsensusPositionOutOfBounds(Exception):
 class NotInMetaDomain(Exception):
     pass
 
+class ConsensusPositionIndex(object):
+    """
+    ConsensusPositionIndex
+    Used for O(hits) retrieval of meta domain rows per consensus position
+    
+    The rows of the indexed DataFrame are stored as columnar arrays that
+    are sorted on consensus_pos, the rows that correspond to consensus
+    position p are located at values[offsets[p]:offsets[p+1]]
+    
+    Variables
+    name                       description
+    columns                    list of the column names of the indexed DataFrame
+    values                     dictionary {column: numpy.ndarray or DictionaryEncodedColumn} containing the column values sorted on consensus_pos
+    offsets                    numpy.ndarray of length consensus_length+1 containing the row offsets per consensus position
+    memory_mapped              bool True if the values are memory-mapped from disk
+    row_order                  numpy.ndarray containing the original row number of each sorted row, None if the rows were stored sorted
+    n_rows                     int number of rows in the index
+    """
+    
+    def records_for_consensus_position(self, consensus_position):
+        """Retrieves the rows for this consensus position as a list of 
+        dictionaries, similar to pandas.DataFrame.to_dict('records')"""
+        start = self.offsets[consensus_position]
+        stop = self.offsets[consensus_position+1]
+        
+        if start == stop:
+            return []
+        
+        return self.records_for_rows(slice(start, stop))
+    
+    def records_for_rows(self, rows):
+        """Retrieves the rows (a slice or array of row numbers) as a list of dictionaries"""
+        # convert the column values to native python types
+        column_values = [self.values[column][rows].tolist() for column in self.columns]
+        return [dict(zip(self.columns, row)) for row in zip(*column_values)]
+    
+    def select_rows(self, conditions):
+        """Retrieves the row numbers for which each column equals the 
+        value, as provided by the conditions {column: value}. The rows are
+        returned in the original order of the indexed rows"""
+        mask = np.ones(self.n_rows, dtype=bool)
+        for column, value in conditions.items():
+            if isinstance(self.values[column], DictionaryEncodedColumn):
+                mask &= self.values[column].equals(value)
+            else:
+                mask &= np.asarray(self.values[column]) == value
+        rows = np.flatnonzero(mask)
+        
+        if self.row_order is None:
+            return rows
+        return rows[np.argsort(self.row_order[rows], kind='mergesort')]
+    
+    def count_unique(self, column):
+        """Counts the distinct values in the column"""
+        if isinstance(self.values[column], DictionaryEncodedColumn):
+            return self.values[column].count_unique()
+        return len(pd.unique(self.values[column]))
+    
+    def to_dataframe(self):
+        """Materializes the indexed rows as a pandas.DataFrame, sorted on consensus_pos"""
+        return dataframe_from_columns(self.columns, self.values)
+    
+    def estimate_memory_usage(self):
+        """Estimates the number of bytes held in memory by this index, 
+        memory-mapped arrays are shared via the page cache and not counted"""
+        n_bytes = self.offsets.nbytes
+        for column in self.columns:
+            if isinstance(self.values[column], DictionaryEncodedColumn):
+                n_bytes += self.values[column].estimate_memory_usage(self.memory_mapped)
+            elif not self.memory_mapped:
+                n_bytes += self.values[column].nbytes
+        return int(n_bytes)
+    
+    def __init__(self, columns, values, offsets, memory_mapped=False, row_order=None):
+        self.columns = columns
+        self.values = values
+        self.offsets = offsets
+        self.memory_mapped = memory_mapped
+        self.row_order = row_order
+        self.n_rows = len(values[columns[0]]) if len(columns) > 0 else 0
+    
+    @classmethod
+    def initializeFromDataFrame(cls, dataframe, consensus_length):
+        """Builds the index for a DataFrame containing a 'consensus_pos' column"""
+        columns = [column for column in dataframe.columns]
+        
+        if not 'consensus_pos' in columns:
+            # Nothing to index (e.g. a not yet annotated meta domain)
+            return cls(columns, {column: np.asarray(dataframe[column]) for column in columns}, np.zeros(consensus_length+1, dtype=np.int64))
+        
+        # sort the rows on consensus position, a stable sort retains the original order within each position
+        consensus_positions = np.asarray(dataframe.consensus_pos)
+        order = np.argsort(consensus_positions, kind='mergesort')
+        
+        # compute the first row for each consensus position, the last entry closes the final position
+        offsets = np.searchsorted(consensus_positions[order], np.arange(consensus_length+1), side='left')
+        
+        values = {column: np.asarray(dataframe[column])[order] for column in columns}
+        
+        return cls(columns, values, offsets, row_order=order)
+    
+    @classmethod
+    def initializeFromMemoryMappedTable(cls, table, consensus_length):
+        """Builds the index for a MemoryMappedTable, if the table is stored
+        sorted on 'consensus_pos' the memory-mapped columns are used as is"""
+        if not 'consensus_pos' in table.columns:
+            # Nothing to index (e.g. a not yet annotated meta domain)
+            return cls(table.columns, table.values, np.zeros(consensus_length+1, dtype=np.int64), memory_mapped=True)
+        
+        consensus_positions = np.asarray(table.values['consensus_pos'])
+        if np.all(consensus_positions[:-1] <= consensus_positions[1:]):
+            offsets = np.searchsorted(consensus_positions, np.arange(consensus_length+1), side='left')
+            return cls(table.columns, table.values, offsets, memory_mapped=True)
+        
+        # the table is not sorted, copy it into memory
+        _log.warning("The table in '"+str(table.directory)+"' is not sorted on consensus_pos, it is loaded into memory")
+        return cls.initializeFromDataFrame(table.to_dataframe(), consensus_length)
+
 class MetaDomain(object):
     """
     MetaDomain Model Entity
@@ -40,6 +162,70 @@ class MetaDomain(object):
     meta_domain_mapping        pandas.DataFrame containing all codons annotated with corresponding consensus position
     meta_domain_annotation     pandas.DataFrame containing all SNVs with corresponding consensus position
     """
+    
+    @staticmethod
+    def compute_alignment_depth_per_consensus_position(meta_domain_mapping, consensus_length):
+        """Computes the number of uniquely aligned codons for each consensus 
+        position in a single pass over the meta_domain_mapping. Codons are
+        considered identical if they share the chromosome, strand and
+        chromosomal positions (i.e. Codon.unique_str_representation())"""
+        alignment_depth = np.zeros(consensus_length, dtype=np.int64)
+        
+        if len(meta_domain_mapping) == 0:
+            return alignment_depth
+        
+        # the order of the base pairs does not matter for the chromosomal region of a codon
+        chromosome_positions = np.sort(meta_domain_mapping[['chromosome_position_base_pair_one',
+                                                            'chromosome_position_base_pair_two',
+                                                            'chromosome_position_base_pair_three']].values, axis=1)
+        
+        # count the distinct codons per consensus position
+        aligned_codons = pd.DataFrame({'consensus_pos': meta_domain_mapping.consensus_pos.values,
+                                       'chr': meta_domain_mapping.chr.values,
+                                       'strand': meta_domain_mapping.strand.values,
+                                       'position_one': chromosome_positions[:, 0],
+                                       'position_two': chromosome_positions[:, 1],
+                                       'position_three': chromosome_positions[:, 2]})
+        depth_per_consensus_pos = aligned_codons.drop_duplicates().groupby('consensus_pos').size()
+        
+        # only consider positions within the consensus
+        consensus_positions = depth_per_consensus_pos.index.values
+        within_consensus = (consensus_positions >= 0) & (consensus_positions < consensus_length)
+        alignment_depth[consensus_positions[within_consensus]] = depth_per_consensus_pos.values[within_consensus]
+        
+        return alignment_depth
+    
+    @staticmethod
+    def initialize_index(table, consensus_length):
+        """Initializes the ConsensusPositionIndex for a pandas.DataFrame or
+        MemoryMappedTable, returns the DataFrame (None for a memory-mapped
+        table, which is only materialized on request) and the index"""
+        if isinstance(table, MemoryMappedTable):
+            return None, ConsensusPositionIndex.initializeFromMemoryMappedTable(table, consensus_length)
+        return table, ConsensusPositionIndex.initializeFromDataFrame(table, consensus_length)
+    
+    @property
+    def meta_domain_mapping(self):
+        if self._meta_domain_mapping is None:
+            self._meta_domain_mapping = self._meta_domain_mapping_index.to_dataframe()
+        return self._meta_domain_mapping
+    
+    @meta_domain_mapping.setter
+    def meta_domain_mapping(self, meta_domain_mapping):
+        # (re-)build the consensus position index, each time the mapping is set
+        self._alignment_depth_per_consensus_position = None
+        self._meta_domain_mapping, self._meta_domain_mapping_index = MetaDomain.initialize_index(meta_domain_mapping, self.consensus_length)
+    
+    @property
+    def meta_domain_annotation(self):
+        if self._meta_domain_annotation is None:
+            self._meta_domain_annotation = self._meta_domain_annotation_index.to_dataframe()
+        return self._meta_domain_annotation
+    
+    @meta_domain_annotation.setter
+    def meta_domain_annotation(self, meta_domain_annotation):
+        # (re-)build the consensus position index, each time the annotation is set
+        self._meta_domain_annotation, self._meta_domain_annotation_index = MetaDomain.initialize_index(meta_domain_annotation, self.consensus_length)
         
     def get_annotated_SNVs_for_consensus_position(self, consensus_position):
         """Retrieves SNVs for this consensus position as:
@@ -52,7 +238,7 @@ class MetaDomain(object):
             raise ConsensusPositionOutOfBounds("The provided consensus position ('"+str(consensus_position)+"') is above the maximum consensus length ('"+str(self.consensus_length)+"'), this position foes not exist")
         
         # Retrieve all codons aligned to the consensus position
-        aligned_to_position = self.meta_domain_annotation[self.meta_domain_annotation.consensus_pos == consensus_position].to_dict('records')
+        aligned_to_position = self._meta_domain_annotation_index.records_for_consensus_position(consensus_position)
         
         # first check if the consensus position is present in the mappings_per_consensus_pos
         if len(aligned_to_position) >0:
@@ -72,13 +258,12 @@ class MetaDomain(object):
         based on the uniprot ac and position"""
         consensus_positions = []
         # Retrieve all codons aligned to the consensus position
-        aligned_to_position = self.meta_domain_mapping[(self.meta_domain_mapping.uniprot_ac == uniprot_ac) &\
-                                                       (self.meta_domain_mapping.amino_acid_position == uniprot_position)]
+        aligned_to_position = self._meta_domain_mapping_index.select_rows({'uniprot_ac': uniprot_ac, 'amino_acid_position': uniprot_position})
         
         # check if there are any matches
         if len(aligned_to_position) > 0:
             # check how many matches and type check if all positions are the same
-            unique_consensus_positions = pd.unique(aligned_to_position.consensus_pos)
+            unique_consensus_positions = pd.unique(np.asarray(self._meta_domain_mapping_index.values['consensus_pos'])[aligned_to_position])
             
             if len(unique_consensus_positions) > 1:
                 _log.warning("There are more than one consensus positions assigned ('"+str(unique_consensus_positions)+"') to the protein '"+str(uniprot_ac)+"' for position '"+str(uniprot_position)+"'")
@@ -94,7 +279,8 @@ class MetaDomain(object):
     def get_codon_for_transcript_and_position(self, transcript_id, protein_position):
         """Construct the codon for a provided position"""
         # Retrieve all codons aligned to the consensus position
-        aligned_to_position = self.meta_domain_mapping[(self.meta_domain_mapping.gencode_transcription_id == transcript_id) & (self.meta_domain_mapping.amino_acid_position == protein_position)].to_dict('records')
+        aligned_to_position = self._meta_domain_mapping_index.records_for_rows(
+            self._meta_domain_mapping_index.select_rows({'gencode_transcription_id': transcript_id, 'amino_acid_position': protein_position})[:1])
         
         if len(aligned_to_position) == 0:
             raise NotInMetaDomain("No codons found to be aligned for metadomain '"+str(self.domain_id)+"' for transcript '"+str(transcript_id)+"' at position '"+str(protein_position)+"'")
@@ -113,7 +299,7 @@ class MetaDomain(object):
             raise ConsensusPositionOutOfBounds("The provided consensus position ('"+str(consensus_position)+"') is above the maximum consensus length ('"+str(self.consensus_length)+"'), this position foes not exist")
         
         # Retrieve all codons aligned to the consensus position
-        aligned_to_position = self.meta_domain_mapping[self.meta_domain_mapping.consensus_pos == consensus_position].to_dict('records')
+        aligned_to_position = self._meta_domain_mapping_index.records_for_consensus_position(consensus_position)
         
         # first check if the consensus position is present in the mappings_per_consensus_pos
         if len(aligned_to_position) >0:
@@ -138,70 +324,93 @@ class MetaDomain(object):
         if consensus_position >= self.consensus_length:
             raise ConsensusPositionOutOfBounds("The provided consensus position ('"+str(consensus_position)+"') is above the maximum consensus length ('"+str(self.consensus_length)+"'), this position foes not exist")
         
-        # Retrieve all codons aligned to the consensus position
-        aligned_to_position = self.meta_domain_mapping[self.meta_domain_mapping.consensus_pos == consensus_position].to_dict('records')
-
-        unique_keys = [Codon.initializeFromDict(codon_dict).unique_str_representation() for codon_dict in aligned_to_position]
-        return len(np.unique(unique_keys))
+        return int(self.get_alignment_depth_per_consensus_position()[consensus_position])
+    
+    def get_alignment_depth_per_consensus_position(self):
+        """Retrieves the number of aligned codons for each consensus position as numpy.ndarray"""
+        if self._alignment_depth_per_consensus_position is None:
+            self._alignment_depth_per_consensus_position = MetaDomain.compute_alignment_depth_per_consensus_position(self.meta_domain_mapping, self.consensus_length)
+        return self._alignment_depth_per_consensus_position
     
     def get_max_alignment_depth(self):
-        alignment_depths = [ self.get_alignment_depth_for_consensus_position(consensus_position) for consensus_position in range(self.consensus_length)]
+        alignment_depths = self.get_alignment_depth_per_consensus_position()
+        if len(alignment_depths) == 0:
+            return 0
         return int(np.max(alignment_depths))
     
+    def estimate_memory_usage(self):
+        """Estimates the number of bytes held by the DataFrames and indices of this meta domain"""
+        n_bytes = 0
+        for dataframe in [self._meta_domain_mapping, self._meta_domain_annotation]:
+            # memory-mapped tables that are not materialized are not counted
+            if not dataframe is None:
+                n_bytes += int(dataframe.memory_usage(index=True, deep=True).sum())
+        for index in [self._meta_domain_mapping_index, self._meta_domain_annotation_index]:
+            n_bytes += index.estimate_memory_usage()
+        return n_bytes
+    
     def annotate_metadomain(self, reannotate=False):
         """Annotate this meta domain with gnomAD and ClinVar variants"""
         # check if a Meta Domain is already mapped
         meta_domain_dir = METADOMAIN_DIR+self.domain_id
         meta_domain_snv_annotation_file = meta_domain_dir+'/'+METADOMAIN_SNV_ANNOTATION_FILE_NAME
+        meta_domain_snv_annotation_memory_mapped_dir = meta_domain_dir+'/'+METADOMAIN_SNV_ANNOTATION_MEMORY_MAPPED_DIR_NAME
         
         # initialize the meta_domain_annotation as a list
         meta_domain_annotation = []
         
         # Check if the mapping has previously been annotated already
-        if os.path.exists(meta_domain_snv_annotation_file) and not reannotate:
+        if (os.path.exists(meta_domain_snv_annotation_memory_mapped_dir) or os.path.exists(meta_domain_snv_annotation_file)) and not reannotate:
             # The mapping exists, load it
             _log.info('Loading previously annotated MetaDomain for domain id: '+str(self.domain_id))
-            # Read the files
-            _log.info("Reading '{}'".format(meta_domain_snv_annotation_file))
-            self.meta_domain_annotation = pd.read_csv(meta_domain_snv_annotation_file)
+            # Read the files, prefer the memory-mapped format over csv
+            self.meta_domain_annotation = read_table(meta_domain_snv_annotation_memory_mapped_dir, meta_domain_snv_annotation_file)
         else:
             # The annotation does not exists yet, or needs be recreated/reannotated
             _log.info('Start annotation of MetaDomain for domain id: '+str(self.domain_id))
            
-            # Retrieve all codons
+            # Retrieve all codons, grouped per consensus position and unique codon
+            consensus_positions = []
+            codon_groups = []
             for consensus_position in range(self.consensus_length):
                 meta_codons = self.get_codons_aligned_to_consensus_position(consensus_position)
-                
-                # Annotate ClinVar and gnomAD SNVs
                 for unique_str_repr in meta_codons.keys():
-                    for snv in annotate_ClinVar_SNVs_for_codons(meta_codons[unique_str_repr]): 
-                        snv['consensus_pos'] = consensus_position
-                        meta_domain_annotation.append(snv)
-                    for snv in annotate_gnomAD_SNVs_for_codons(meta_codons[unique_str_repr]):
-                        snv['consensus_pos'] = consensus_position
-                        meta_domain_annotation.append(snv)
+                    consensus_positions.append(consensus_position)
+                    codon_groups.append(meta_codons[unique_str_repr])
+            
+            # Annotate ClinVar and gnomAD SNVs, with one sweep per chromosome over all codons
+            ClinVar_SNVs_per_group, gnomAD_SNVs_per_group = annotate_ClinVar_and_gnomAD_SNVs_for_codon_groups(codon_groups)
+            
+            for consensus_position, ClinVar_SNVs, gnomAD_SNVs in zip(consensus_positions, ClinVar_SNVs_per_group, gnomAD_SNVs_per_group):
+                for snv in ClinVar_SNVs + gnomAD_SNVs:
+                    snv['consensus_pos'] = consensus_position
+                    meta_domain_annotation.append(snv)
                         
             # convert meta_domain_mapping to a pandas Dataframe
             meta_domain_annotation = pd.DataFrame(meta_domain_annotation)
             
-            # save meta_domain_mapping to disk
-            meta_domain_annotation.to_csv(meta_domain_snv_annotation_file)
+            # save meta_domain_annotation to disk
+            write_memory_mapped_table(meta_domain_annotation, meta_domain_snv_annotation_memory_mapped_dir, sort_column='consensus_pos')
             
             # set to variable
             self.meta_domain_annotation = meta_domain_annotation
             
             _log.info('Finished annotation of MetaDomain for domain id: '+str(self.domain_id))
     
-    def __init__(self, domain_id, consensus_length, n_instances, meta_domain_mapping, meta_domain_annotation):
+    def __init__(self, domain_id, consensus_length, n_instances, meta_domain_mapping, meta_domain_annotation, alignment_depth_per_consensus_position=None):
         self.domain_id = domain_id
         self.consensus_length = consensus_length
         self.n_instances = n_instances
         self.meta_domain_mapping = meta_domain_mapping
         self.meta_domain_annotation = meta_domain_annotation
         
+        # use a previously computed alignment depth if provided
+        if not alignment_depth_per_consensus_position is None:
+            self._alignment_depth_per_consensus_position = np.array(alignment_depth_per_consensus_position, dtype=np.int64)
+        
         # derive from meta_domain_mapping
-        self.n_proteins = len(pd.unique(self.meta_domain_mapping.uniprot_ac))
-        self.n_transcripts = len(pd.unique(self.meta_domain_mapping.gencode_transcription_id))
+        self.n_proteins = self._meta_domain_mapping_index.count_unique('uniprot_ac')
+        self.n_transcripts = self._meta_domain_mapping_index.count_unique('gencode_transcription_id')
         
     @classmethod
     def initializeFromDomainID(cls, domain_id, recreate=False):        
@@ -217,24 +426,32 @@ class MetaDomain(object):
             meta_domain_dir = METADOMAIN_DIR+domain_id
             meta_domain_details_file = meta_domain_dir+'/'+METADOMAIN_DETAILS_FILE_NAME
             meta_domain_mapping_file = meta_domain_dir+'/'+METADOMAIN_MAPPING_FILE_NAME
+            meta_domain_mapping_memory_mapped_dir = meta_domain_dir+'/'+METADOMAIN_MAPPING_MEMORY_MAPPED_DIR_NAME
             
             # first check if the metadomain dir exist
             if not os.path.isdir(meta_domain_dir):
                 raise UnsupportedMetaDomainIdentifier("For Pfam ID '"+str(domain_id)+"' there was no metadomain alignment present")
             
             # Check if the mapping has previously been build already
-            if os.path.exists(meta_domain_mapping_file) and os.path.exists(meta_domain_details_file) and not recreate:
+            if (os.path.exists(meta_domain_mapping_memory_mapped_dir) or os.path.exists(meta_domain_mapping_file)) and os.path.exists(meta_domain_details_file) and not recreate:
                 # The mapping exists, load it
                 _log.info('Loading previously build creation of MetaDomain for domain id: '+str(domain_id))
-                # Read the files
-                _log.info("Reading '{}'".format(meta_domain_mapping_file))
-                meta_domain_mapping = pd.read_csv(meta_domain_mapping_file)
+                # Read the files, prefer the memory-mapped format over csv
+                meta_domain_mapping = read_table(meta_domain_mapping_memory_mapped_dir, meta_domain_mapping_file)
                 _log.info("Reading '{}'".format(meta_domain_details_file))
                 with open(meta_domain_details_file) as f:
                     meta_domain_details = json.load(f)
                     
                 consensus_length = meta_domain_details['consensus_length']
                 n_instances = meta_domain_details['n_instances']
+                
+                # Meta domains created before the alignment depth was part of the details
+                if not 'alignment_depth_per_consensus_position' in meta_domain_details.keys():
+                    _log.info("Adding the alignment depth to '{}'".format(meta_domain_details_file))
+                    mapping_dataframe = meta_domain_mapping.to_dataframe() if isinstance(meta_domain_mapping, MemoryMappedTable) else meta_domain_mapping
+                    meta_domain_details['alignment_depth_per_consensus_position'] = [int(x) for x in cls.compute_alignment_depth_per_consensus_position(mapping_dataframe, consensus_length)]
+                    with open(meta_domain_details_file, 'w') as f:
+                        json.dump(meta_domain_details, f)
             else:
                 # The mapping does not exists yet, we need to create it
                 _log.info('Start creation of MetaDomain for domain id: '+str(domain_id))
@@ -259,18 +476,21 @@ class MetaDomain(object):
                 # convert meta_domain_mapping to a pandas Dataframe
                 meta_domain_mapping = pd.DataFrame(meta_domain_mapping)
                 
+                # add the alignment depth to the meta_domain_details
+                meta_domain_details['alignment_depth_per_consensus_position'] = [int(x) for x in cls.compute_alignment_depth_per_consensus_position(meta_domain_mapping, consensus_length)]
+                
                 ## Save the results to disk
                 # save meta_domain_details
                 with open(meta_domain_details_file, 'w') as f:
                     json.dump(meta_domain_details, f)
                 
                 # save meta_domain_mapping to disk
-                meta_domain_mapping.to_csv(meta_domain_mapping_file)
+                write_memory_mapped_table(meta_domain_mapping, meta_domain_mapping_memory_mapped_dir, sort_column='consensus_pos')
         else:
             raise UnsupportedMetaDomainIdentifier("Expected a Pfam domain, instead the identifier '"+str(domain_id)+"' was received")
         
         # Attempt to create the object
-        meta_domain = cls(domain_id, consensus_length, n_instances, meta_domain_mapping, pd.DataFrame())
+        meta_domain = cls(domain_id, consensus_length, n_instances, meta_domain_mapping, pd.DataFrame(), meta_domain_details['alignment_depth_per_consensus_position'])
         
         # Annotate this meta domain
         meta_domain.annotate_metadomain()
@@ -1,3 +1,9 @@
+from metadome.domain.services.file_storage import retrieve_persisted_index
+
+import logging
+
+_log = logging.getLogger(__name__)
+
 def unwrap_fasta_alignment(alignment):
     """Unwraps a .fasta alignment by removing the end of line
     characters and formatting the fasta sequences as 
@@ -9,4 +15,78 @@ def unwrap_fasta_alignment(alignment):
             new.append("")
         else:
             new[-1] += i
-    return new
\ No newline at end of file
+    return new
+
+
+class FastaHeaderIndex(object):
+    """
+    FastaHeaderIndex
+    Used for random access to the entries of a FASTA file, e.g. the Gencode
+    or UniProt FASTA files. The byte offset and length of each entry (header
+    plus sequence lines) is indexed on the key(s) of its header and the
+    index is persisted next to the FASTA file, so it is only built once per
+    version of the file
+
+    Variables
+    name                       description
+    filename                   str the FASTA file
+    entries_per_key            dictionary {key: [(offset, length), ...]} of the entries in file order
+    """
+
+    def retrieve_entries(self, key):
+        """Retrieves the entries for the key as a list of (header, sequence)
+        in file order, the header includes the leading '>' and wrapped
+        sequence lines are joined"""
+        entries = []
+        with open(self.filename, 'rb') as f:
+            for offset, length in self.entries_per_key.get(key, []):
+                f.seek(offset)
+                lines = f.read(length).decode().split('\n')
+                entries.append((lines[0], ''.join(lines[1:])))
+        return entries
+
+    def keys(self):
+        return self.entries_per_key.keys()
+
+    def __init__(self, filename, entries_per_key):
+        self.filename = filename
+        self.entries_per_key = entries_per_key
+
+    @classmethod
+    def initializeFromFile(cls, filename, index_filename, retrieve_keys):
+        """Reads the persisted index if it matches the size and modification
+        time of the FASTA file, otherwise the index is (re)built by scanning
+        the file. retrieve_keys returns the keys for a header (without '>')"""
+        def build_index():
+            _log.info("Building the header index of '{}'".format(filename))
+            entries_per_key = {}
+
+            def add_entry(header_keys, header_offset, entry_end):
+                for key in header_keys:
+                    if not key in entries_per_key:
+                        entries_per_key[key] = []
+                    entries_per_key[key].append((header_offset, entry_end-header_offset))
+
+            with open(filename, 'rb') as f:
+                offset = 0
+                header_offset = None
+                header_keys = []
+                entry_end = None
+                for line in f:
+                    if line.startswith(b'>'):
+                        if not header_offset is None:
+                            add_entry(header_keys, header_offset, entry_end)
+                        header_offset = offset
+                        header_keys = retrieve_keys(line[1:].decode().rstrip('\n'))
+                        entry_end = offset+len(line.rstrip(b'\n'))
+                    elif not header_offset is None and line.strip():
+                        # the entry ends with its last sequence line
+                        entry_end = offset+len(line.rstrip(b'\n'))
+                    offset += len(line)
+
+                if not header_offset is None:
+                    add_entry(header_keys, header_offset, entry_end)
+            return entries_per_key
+
+        entries_per_key = retrieve_persisted_index(filename, index_filename, build_index)
+        return cls(filename, {key: [tuple(entry) for entry in entries] for key, entries in entries_per_key.items()})
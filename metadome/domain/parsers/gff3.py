@@ -1,6 +1,11 @@
 from collections import namedtuple
+import urllib.request
 import gzip
-import urllib
+from metadome.domain.services.file_storage import retrieve_persisted_index
+
+import logging
+
+_log = logging.getLogger(__name__)
 
 #Initialized GeneInfo named tuple. Note: namedtuple is immutable
 gffInfoFields = ["seqid", "source", "type", "start", "end", "score", "strand", "phase", "attributes"]
@@ -19,6 +24,26 @@ def parseGFFAttributes(attributeString):
         ret[urllib.request.unquote(key)] = urllib.request.unquote(value)
     return ret
 
+def parseGFF3Parts(parts, attributes):
+    """Normalizes the (tab separated) parts of a GFF3 line, with the already parsed attributes, as a GFFRecord"""
+    #If this fails, the file format is not standard-compatible
+    assert len(parts) == len(gffInfoFields)
+    #Normalize data
+    normalizedInfo = {
+        "seqid": None if parts[0] == "." else urllib.request.unquote(parts[0]),
+        "source": None if parts[1] == "." else urllib.request.unquote(parts[1]),
+        "type": None if parts[2] == "." else urllib.request.unquote(parts[2]),
+        "start": None if parts[3] == "." else int(parts[3]),
+        "end": None if parts[4] == "." else int(parts[4]),
+        "score": None if parts[5] == "." else float(parts[5]),
+        "strand": None if parts[6] == "." else urllib.request.unquote(parts[6]),
+        "phase": None if parts[7] == "." else urllib.request.unquote(parts[7]),
+        "attributes": attributes
+    }
+    #Alternatively, you can emit the dictionary here, if you need mutability:
+    #    yield normalizedInfo
+    return GFFRecord(**normalizedInfo)
+
 def parseGFF3(filename, filter_on_values=None):
     """
     A minimalistic GFF3 format parser.
@@ -40,20 +65,59 @@ def parseGFF3(filename, filter_on_values=None):
                 if type(filter_on_values) is str:
                     if not(filter_on_values in line): continue
             parts = line.strip().split("\t")
-            #If this fails, the file format is not standard-compatible
-            assert len(parts) == len(gffInfoFields)
-            #Normalize data
-            normalizedInfo = {
-                "seqid": None if parts[0] == "." else urllib.request.unquote(parts[0]),
-                "source": None if parts[1] == "." else urllib.request.unquote(parts[1]),
-                "type": None if parts[2] == "." else urllib.request.unquote(parts[2]),
-                "start": None if parts[3] == "." else int(parts[3]),
-                "end": None if parts[4] == "." else int(parts[4]),
-                "score": None if parts[5] == "." else float(parts[5]),
-                "strand": None if parts[6] == "." else urllib.request.unquote(parts[6]),
-                "phase": None if parts[7] == "." else urllib.request.unquote(parts[7]),
-                "attributes": parseGFFAttributes(parts[8])
-            }
-            #Alternatively, you can emit the dictionary here, if you need mutability:
-            #    yield normalizedInfo
-            yield GFFRecord(**normalizedInfo)
\ No newline at end of file
+            yield parseGFF3Parts(parts, parseGFFAttributes(parts[8]))
+
+class GFF3RecordIndex(object):
+    """
+    GFF3RecordIndex
+    Used for random access to the features of a (uncompressed) GFF3 file
+    with a specific type, indexed on one of their attributes (e.g. the CDS
+    features per transcript_id). Only the byte offsets of the lines are
+    kept and the index is persisted next to the GFF3 file, so it is only
+    built once per version of the file
+
+    Variables
+    name                       description
+    filename                   str the GFF3 file
+    offsets_per_key            dictionary {attribute value: [offset, ...]} of the lines in file order
+    """
+
+    def retrieve_records(self, key):
+        """Retrieves the features for the key as a list of GFFRecord in file order"""
+        records = []
+        with open(self.filename, 'rb') as f:
+            for offset in self.offsets_per_key.get(key, []):
+                f.seek(offset)
+                parts = f.readline().decode().strip().split("\t")
+                records.append(parseGFF3Parts(parts, parseGFFAttributes(parts[8])))
+        return records
+
+    def __init__(self, filename, offsets_per_key):
+        self.filename = filename
+        self.offsets_per_key = offsets_per_key
+
+    @classmethod
+    def initializeFromFile(cls, filename, index_filename, feature_type, attribute):
+        """Reads the persisted index if it matches the size and modification
+        time of the GFF3 file, otherwise the index is (re)built in a single
+        pass over the file, decoding only the attributes of the lines with
+        the feature type"""
+        def build_index():
+            _log.info("Building the '"+feature_type+"' index of '"+filename+"'")
+            offsets_per_key = {}
+            encoded_feature_type = feature_type.encode()
+            with open(filename, 'rb') as f:
+                offset = 0
+                for line in f:
+                    if not line.startswith(b'#'):
+                        parts = line.split(b'\t', 8)
+                        if len(parts) == len(gffInfoFields) and parts[2] == encoded_feature_type:
+                            key = parseGFFAttributes(parts[8].decode().strip()).get(attribute)
+                            if not key is None:
+                                if not key in offsets_per_key:
+                                    offsets_per_key[key] = []
+                                offsets_per_key[key].append(offset)
+                    offset += len(line)
+            return offsets_per_key
+
+        return cls(filename, retrieve_persisted_index(filename, index_filename, build_index))
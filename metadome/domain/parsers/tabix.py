@@ -1,6 +1,8 @@
 import logging
-import vcf
+import threading
+import os
 from enum import Enum
+from metadome.domain.parsers.vcf_record import VCFHeader, VCFRecord
 _log = logging.getLogger(__name__)
 
 
@@ -12,9 +14,54 @@ class variant_coordinate_system(Enum):
     zero_based = 1
     one_based = 2
 
+class TabixVCFReader(object):
+    """
+    TabixVCFReader
+    Used for querying a tabix indexed (bgzipped) VCF file, the lines are
+    parsed as VCFRecord, which only interprets the INFO values that are
+    requested
+
+    Variables
+    name                       description
+    filename                   str the VCF file
+    tabix_file                 pysam.TabixFile of the VCF file
+    header                     VCFHeader of the VCF file
+    """
+
+    def fetch(self, chrom, start, end):
+        """Generates the records overlapping the (0-based, half-open) region"""
+        for line in self.tabix_file.fetch(chrom, start, end):
+            yield VCFRecord.initializeFromLine(line, self.header)
+
+    def __init__(self, filename, encoding='ascii'):
+        # pysam is only needed once a VCF file is queried, as for PyVCF
+        import pysam
+
+        self.filename = filename
+        self.tabix_file = pysam.TabixFile(filename, encoding=encoding)
+        self.header = VCFHeader.initializeFromLines(self.tabix_file.header)
+
+# the open readers of the current process and thread
+_open_vcf_readers = threading.local()
+
+def retrieve_vcf_reader(filename, encoding='ascii'):
+    """Retrieves an open TabixVCFReader for the file. The readers are reused
+    per process and thread, a forked process (e.g. a Celery worker) opens
+    its own readers."""
+    # readers inherited from the parent process share its file handles
+    if getattr(_open_vcf_readers, 'pid', None) != os.getpid():
+        _open_vcf_readers.pid = os.getpid()
+        _open_vcf_readers.readers = {}
+
+    if not (filename, encoding) in _open_vcf_readers.readers:
+        _log.debug("Opening '{}'".format(filename))
+        _open_vcf_readers.readers[(filename, encoding)] = TabixVCFReader(filename, encoding)
+
+    return _open_vcf_readers.readers[(filename, encoding)]
+
 def tabix_query(filename, chrom, start, end, inputfile_variant_coordinate_system, encoding='ascii'):
     """Call tabix and generate an array of strings for each line it returns."""    
-    vcf_reader = vcf.Reader(filename=filename, encoding=encoding)
+    vcf_reader = retrieve_vcf_reader(filename, encoding)
     try:
         if inputfile_variant_coordinate_system == variant_coordinate_system.one_based:
             for record in vcf_reader.fetch(chrom, start-1, end):
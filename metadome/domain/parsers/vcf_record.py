@@ -0,0 +1,134 @@
+from collections.abc import Mapping
+import re
+
+# the first fields of an INFO definition in the header
+INFO_DEFINITION_PATTERN = re.compile(r'^##INFO=<ID=([^,>]+),Number=([^,>]+),Type=([^,>]+)')
+
+class VCFHeader(object):
+    """
+    VCFHeader
+    Used for representation of the INFO definitions in the header of a
+    VCF file, needed to interpret the INFO values of the records
+
+    Variables
+    name                       description
+    info_definitions           dictionary {ID: (Number, Type)} of the INFO fields, e.g. {'AN': ('1', 'Integer')}
+    """
+
+    def __init__(self, info_definitions):
+        self.info_definitions = info_definitions
+
+    @classmethod
+    def initializeFromLines(cls, header_lines):
+        info_definitions = {}
+        for header_line in header_lines:
+            match = INFO_DEFINITION_PATTERN.match(header_line)
+            if not match is None:
+                info_definitions[match.group(1)] = (match.group(2), match.group(3))
+        return cls(info_definitions)
+
+class LazyInfo(Mapping):
+    """
+    LazyInfo
+    Used for the INFO field of a VCFRecord, the field is only split once a
+    key is requested and only the requested values are converted to the
+    types in the header. The converted values equal those of PyVCF: values
+    with Number=1 are scalars, all others are lists, a '.' is None and a
+    Flag is True
+
+    Variables
+    name                       description
+    info_string                str the unparsed INFO field
+    header                     VCFHeader of the file the record originates from
+    """
+
+    def _split(self):
+        if self._raw_values is None:
+            self._raw_values = {}
+            if self.info_string != '.':
+                for entry in self.info_string.split(';'):
+                    key, _, value = entry.partition('=')
+                    self._raw_values[key] = value if _ else None
+        return self._raw_values
+
+    def _convert(self, key, raw_value):
+        number, value_type = self.header.info_definitions.get(key, (None, 'String' if raw_value else 'Flag'))
+        if value_type == 'Flag' or raw_value is None:
+            return True
+
+        values = raw_value.split(',')
+        if value_type == 'Integer':
+            try:
+                values = [None if value == '.' else int(value) for value in values]
+            except ValueError:
+                # integers are flexibly parsed as floats, as PyVCF does
+                values = [None if value == '.' else float(value) for value in values]
+        elif value_type == 'Float':
+            values = [None if value == '.' else float(value) for value in values]
+        else:
+            values = [None if value == '.' else value for value in values]
+
+        return values[0] if number == '1' else values
+
+    def __getitem__(self, key):
+        if not key in self._values:
+            self._values[key] = self._convert(key, self._split()[key])
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._split())
+
+    def __len__(self):
+        return len(self._split())
+
+    def __init__(self, info_string, header):
+        self.info_string = info_string
+        self.header = header
+        self._raw_values = None
+        self._values = {}
+
+class VCFRecord(object):
+    """
+    VCFRecord
+    Used for representation of a single line of a VCF file with the same
+    fields (and values) as a PyVCF record, except that the ALT alleles are
+    plain strings and the INFO values are parsed lazily
+
+    Variables
+    name                       description
+    CHROM                      str the chromosome
+    POS                        int the (1-based) position
+    ID                         str the identifier, None if missing
+    REF                        str the reference allele
+    ALT                        list of str the alternate alleles, [None] if missing
+    FILTER                     list of the filters, [] if PASS and None if missing
+    INFO                       LazyInfo of the INFO field
+    """
+
+    def __init__(self, CHROM, POS, ID, REF, ALT, FILTER, INFO):
+        self.CHROM = CHROM
+        self.POS = POS
+        self.ID = ID
+        self.REF = REF
+        self.ALT = ALT
+        self.FILTER = FILTER
+        self.INFO = INFO
+
+    @classmethod
+    def initializeFromLine(cls, line, header):
+        fields = line.rstrip('\n').split('\t', 8)
+
+        filter_string = fields[6]
+        if filter_string == '.':
+            _filter = None
+        elif filter_string == 'PASS':
+            _filter = []
+        else:
+            _filter = filter_string.split(';')
+
+        return cls(CHROM=fields[0], POS=int(fields[1]),
+                   ID=None if fields[2] == '.' else fields[2],
+                   REF=fields[3],
+                   ALT=[None if alt == '.' else alt for alt in fields[4].split(',')],
+                   FILTER=_filter,
+                   INFO=LazyInfo(fields[7], header))
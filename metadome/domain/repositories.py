@@ -332,6 +332,29 @@ class MappingRepository:
             _session.remove()
 
 
+    @staticmethod
+    def retrieve_chromosome_positions_per_chromosome():
+        """Retrieves the (sorted) chromosomal positions of all mappings as {chromosome: [ chromosome_position ]}"""
+        # Open as session
+        _session = db.create_scoped_session()
+
+        try:
+            _positions_per_chromosome = {}
+            for chromosome, chromosome_position in _session.query(Mapping.chromosome, Mapping.chromosome_position).distinct().order_by(Mapping.chromosome, Mapping.chromosome_position).all():
+                if not chromosome in _positions_per_chromosome:
+                    _positions_per_chromosome[chromosome] = []
+
+                _positions_per_chromosome[chromosome].append(chromosome_position)
+            return _positions_per_chromosome
+        except (AlchemyResourceClosedError, AlchemyOperationalError, PsycopOperationalError) as e:
+            raise RecoverableError(str(e))
+        except:
+            _log.error(traceback.format_exc())
+            raise
+        finally:
+            # Close this session, thus all items are cleared and memory usage is kept at a minimum
+            _session.remove()
+
     @staticmethod
     def get_mappings_for_gene(_gene):
         """Retrieves all mappings for a Gene object"""
@@ -0,0 +1,59 @@
+from metadome.default_settings import TRANSCRIPT_ANNOTATION_CACHE_DIR,\
+    GNOMAD_VCF_FILE, GNOMAD_VARIANT_STORE, GNOMAD_ACCEPTED_FILTERS,\
+    CLINVAR_VCF_FILE, CLINVAR_VARIANT_STORE, CLINVAR_CONSIDERED_CLINSIG
+from metadome.domain.services.file_storage import compute_file_status_checksum,\
+    atomic_write
+import json
+import os
+
+import logging
+
+_log = logging.getLogger(__name__)
+
+# the files and settings that determine the annotation per variant source
+VARIANT_SOURCE_DEPENDENCIES = {'gnomAD': ([GNOMAD_VCF_FILE, GNOMAD_VARIANT_STORE], GNOMAD_ACCEPTED_FILTERS),
+                               'ClinVar': ([CLINVAR_VCF_FILE, CLINVAR_VARIANT_STORE], CLINVAR_CONSIDERED_CLINSIG)}
+
+class UnsupportedVariantSource(Exception):
+    pass
+
+def compute_variant_source_checksum(variant_source):
+    """Computes a checksum over the path, size and modification time of the
+    files of the variant source and over its filter settings. The contents
+    of the (multiple GB) VCF files are not read."""
+    if not variant_source in VARIANT_SOURCE_DEPENDENCIES:
+        raise UnsupportedVariantSource("Variant source '"+str(variant_source)+"' is not supported for caching")
+
+    filenames, filter_settings = VARIANT_SOURCE_DEPENDENCIES[variant_source]
+    return compute_file_status_checksum(filenames, filter_settings)
+
+def retrieve_cached_transcript_annotation(transcript_id, variant_source, annotate):
+    """Retrieves the annotation ({chrom_pos: [SNV entry, ...]}, as returned
+    by annotateSNVs) of the transcript for the variant source from the cache.
+    If it is not cached it is computed via annotate() and stored, provided
+    that TRANSCRIPT_ANNOTATION_CACHE_DIR exists."""
+    if not os.path.isdir(TRANSCRIPT_ANNOTATION_CACHE_DIR):
+        return annotate()
+
+    transcript_dir = TRANSCRIPT_ANNOTATION_CACHE_DIR+transcript_id
+    cache_file_prefix = variant_source+'_'
+    cache_file = transcript_dir+'/'+cache_file_prefix+compute_variant_source_checksum(variant_source)+'.json'
+
+    if os.path.isfile(cache_file):
+        with open(cache_file) as f:
+            # json stores the chromosome positions as strings
+            return {int(chrom_pos): SNVs for chrom_pos, SNVs in json.load(f).items()}
+
+    annotation = annotate()
+
+    os.makedirs(transcript_dir, exist_ok=True)
+    with atomic_write(cache_file) as f:
+        json.dump(annotation, f)
+
+    # remove the annotations of previous versions of the variant source
+    for filename in os.listdir(transcript_dir):
+        if filename.startswith(cache_file_prefix) and filename.endswith('.json') and transcript_dir+'/'+filename != cache_file:
+            os.remove(transcript_dir+'/'+filename)
+
+    _log.info("Cached the {} annotation of '{}'".format(variant_source, transcript_id))
+    return annotation
@@ -2,6 +2,8 @@ from metadome.domain.services.annotation.annotation import annotateSNVs
 from metadome.domain.models.entities.single_nucleotide_variant import SingleNucleotideVariant
 from metadome.domain.services.annotation.gene_region_annotators import annotateTranscriptWithGnomADData,\
     annotateTranscriptWithClinvarData
+from metadome.domain.services.helper_functions import convertListOfIntegerToRanges
+from metadome.default_settings import METADOMAIN_ANNOTATION_N_WORKERS
 
 def annotate_ClinVar_SNVs_for_codons(codons):
     """Annotate provided codons with ClinVar SNVs"""
@@ -11,6 +13,82 @@ def annotate_gnomAD_SNVs_for_codons(codons):
     """Annotate provided codons with gnomAD SNVs"""
     return annotate_SNVs_for_codons(annotateTranscriptFunction=annotateTranscriptWithGnomADData, codons=codons, variant_source='gnomAD')
 
+def annotate_ClinVar_SNVs_for_codon_groups(codon_groups):
+    """Annotate the provided groups of codons with ClinVar SNVs"""
+    return annotate_SNVs_for_codon_groups(annotateTranscriptFunction=annotateTranscriptWithClinvarData, codon_groups=codon_groups, variant_source='ClinVar')
+
+def annotate_gnomAD_SNVs_for_codon_groups(codon_groups):
+    """Annotate the provided groups of codons with gnomAD SNVs"""
+    return annotate_SNVs_for_codon_groups(annotateTranscriptFunction=annotateTranscriptWithGnomADData, codon_groups=codon_groups, variant_source='gnomAD')
+
+def annotate_ClinVar_and_gnomAD_SNVs_for_codon_groups(codon_groups, n_workers=METADOMAIN_ANNOTATION_N_WORKERS):
+    """Annotate the provided groups of identical codons with ClinVar and
+    gnomAD SNVs. The groups are sharded per chromosome and the shards of
+    both variant sources are annotated by n_workers processes. Returns the
+    ClinVar SNVs per group and the gnomAD SNVs per group"""
+    # shard the groups per chromosome
+    group_indices_per_chromosome = {}
+    for i, codons in enumerate(codon_groups):
+        if not codons[0].chr in group_indices_per_chromosome:
+            group_indices_per_chromosome[codons[0].chr] = []
+
+        group_indices_per_chromosome[codons[0].chr].append(i)
+
+    shards = [(annotateTranscriptFunction, variant_source, group_indices_per_chromosome[chromosome])
+              for annotateTranscriptFunction, variant_source in [(annotateTranscriptWithClinvarData, 'ClinVar'), (annotateTranscriptWithGnomADData, 'gnomAD')]
+              for chromosome in sorted(group_indices_per_chromosome.keys())]
+
+    if n_workers > 1:
+        # the process pool is only needed when annotating concurrently
+        from sklearn.externals.joblib.parallel import Parallel, delayed
+        SNVs_per_shard = Parallel(n_jobs=n_workers)(delayed(annotate_SNVs_for_codon_groups)(annotateTranscriptFunction, [codon_groups[i] for i in group_indices], variant_source)
+                                                    for annotateTranscriptFunction, variant_source, group_indices in shards)
+    else:
+        SNVs_per_shard = [annotate_SNVs_for_codon_groups(annotateTranscriptFunction, [codon_groups[i] for i in group_indices], variant_source)
+                          for annotateTranscriptFunction, variant_source, group_indices in shards]
+
+    # merge the shards in the order of the groups
+    SNVs_per_variant_source = {'ClinVar': [[] for _ in codon_groups], 'gnomAD': [[] for _ in codon_groups]}
+    for (_, variant_source, group_indices), SNVs_per_group in zip(shards, SNVs_per_shard):
+        for i, SNVs in zip(group_indices, SNVs_per_group):
+            SNVs_per_variant_source[variant_source][i] = SNVs
+
+    return SNVs_per_variant_source['ClinVar'], SNVs_per_variant_source['gnomAD']
+
+def annotate_SNVs_for_codon_groups(annotateTranscriptFunction, codon_groups, variant_source):
+    """Annotate each of the provided groups (list) of codons with SNVs, as
+    annotate_SNVs_for_codons does per group. The regions of all codons are
+    merged per chromosome and the variant source is queried with one sweep
+    per chromosome, after which the variants are dispatched to the codons
+    on their position. Returns a list of SNVs per group"""
+    # merge the regions of all codons per chromosome
+    positions_per_chromosome = {}
+    for codons in codon_groups:
+        for codon in codons:
+            if not codon.chr in positions_per_chromosome:
+                positions_per_chromosome[codon.chr] = set()
+
+            for region_start, region_stop in codon.regions:
+                positions_per_chromosome[codon.chr].update(range(region_start, region_stop+1))
+
+    # sweep over the merged regions, keeping the variants per position
+    variants_per_position = {}
+    for chromosome in sorted(positions_per_chromosome.keys()):
+        for variant in annotateTranscriptFunction(chromosome, list(convertListOfIntegerToRanges(positions_per_chromosome[chromosome]))):
+            if not (chromosome, variant['POS']) in variants_per_position:
+                variants_per_position[(chromosome, variant['POS'])] = []
+
+            variants_per_position[(chromosome, variant['POS'])].append(variant)
+
+    def annotateTranscriptFromSweep(chromosome, regions):
+        """Yields the variants of the sweep in the same order as a query per codon region"""
+        for region_start, region_stop in regions:
+            for position in range(region_start, region_stop+1):
+                for variant in variants_per_position.get((chromosome, position), []):
+                    yield variant
+
+    return [annotate_SNVs_for_codons(annotateTranscriptFromSweep, codons, variant_source) for codons in codon_groups]
+
 def annotate_SNVs_for_codons(annotateTranscriptFunction, codons, variant_source):
     """Annotate provided codons with SNVs from the provided variant source and transcript annotation function"""
     # the list that will be returned
@@ -1,6 +1,8 @@
 from metadome.default_settings import GNOMAD_VCF_FILE, GNOMAD_ACCEPTED_FILTERS,\
- CLINVAR_CONSIDERED_CLINSIG, CLINVAR_VCF_FILE
+ CLINVAR_CONSIDERED_CLINSIG, CLINVAR_VCF_FILE, GNOMAD_VARIANT_STORE,\
+ CLINVAR_VARIANT_STORE
 from metadome.domain.parsers.tabix import tabix_query, variant_coordinate_system
+from metadome.domain.services.annotation.variant_store import retrieve_variant_store
 
 def annotateTranscriptWithClinvarData(chromosome, regions):
     """
@@ -34,6 +36,15 @@ def annotateTranscriptWithClinvarData(chromosome, regions):
     RS                  dbSNP ID (i.e. rs number)
     SSR                 Variant Suspect Reason Codes. One or more of the following values may be added: 0 - unspecified, 1 - Paralog, 2 - byEST, 4 - oldAlign, 8 - Para_EST, 16 - 1kg_failed, 1024 - other
     """
+    # use the local variant store if the regions have been imported
+    variant_store = retrieve_variant_store(CLINVAR_VARIANT_STORE)
+    if not variant_store is None and variant_store.covers(chromosome, regions):
+        return variant_store.annotate(chromosome, regions)
+    return annotateTranscriptWithClinvarDataFromTabix(chromosome, regions)
+
+def annotateTranscriptWithClinvarDataFromTabix(chromosome, regions):
+    """Annotates variants found within the ClinVar dataset by querying the
+    tabix indexed CLINVAR_VCF_FILE, see annotateTranscriptWithClinvarData"""
     for gene_sub_region in regions:
         for tabix_record in tabix_query(CLINVAR_VCF_FILE, chromosome[3:], gene_sub_region[0], gene_sub_region[1], variant_coordinate_system.one_based):
             for _, item in enumerate(tabix_record.ALT):
@@ -69,6 +80,15 @@ def annotateTranscriptWithGnomADData(chromosome, regions):
     Annotates variants found within the gnomAD dataset with specific FILTER settings.
         PASS : passed all variant filters imposed by ExAC, all such variants are considered real variants.
     """
+    # use the local variant store if the regions have been imported
+    variant_store = retrieve_variant_store(GNOMAD_VARIANT_STORE)
+    if not variant_store is None and variant_store.covers(chromosome, regions):
+        return variant_store.annotate(chromosome, regions)
+    return annotateTranscriptWithGnomADDataFromTabix(chromosome, regions)
+
+def annotateTranscriptWithGnomADDataFromTabix(chromosome, regions):
+    """Annotates variants found within the gnomAD dataset by querying the
+    tabix indexed GNOMAD_VCF_FILE, see annotateTranscriptWithGnomADData"""
     for gene_sub_region in regions:
         for tabix_record in tabix_query(GNOMAD_VCF_FILE, chromosome[3:], gene_sub_region[0], gene_sub_region[1], variant_coordinate_system.one_based):
             for i, item in enumerate(tabix_record.ALT):
@@ -80,4 +100,4 @@ def annotateTranscriptWithGnomADData(chromosome, regions):
                 
                 if gnomad_filter in GNOMAD_ACCEPTED_FILTERS:
                     gnomad_record = {'CHROM': tabix_record.CHROM, 'POS': tabix_record.POS, 'FILTER':gnomad_filter, 'REF':tabix_record.REF, 'ALT':item, 'INFO':{'AC':tabix_record.INFO['AC'][i], 'AF':tabix_record.INFO['AF'][i], 'AN':tabix_record.INFO['AN']}}
-                    yield gnomad_record
\ No newline at end of file
+                    yield gnomad_record
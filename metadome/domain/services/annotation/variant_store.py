@@ -0,0 +1,127 @@
+from metadome.domain.services.file_storage import atomic_replace
+from contextlib import closing
+import threading
+import sqlite3
+import os
+
+import logging
+
+_log = logging.getLogger(__name__)
+
+# the INFO fields (with their SQLite type) of the records that are used in the annotations
+GNOMAD_INFO_FIELDS = [('AC', 'INTEGER'), ('AF', 'REAL'), ('AN', 'INTEGER')]
+CLINVAR_INFO_FIELDS = [('ID', 'TEXT')]
+
+# the columns of the variants table, preceding the INFO fields
+VARIANT_COLUMNS = ['chromosome', 'position', 'REF', 'ALT']
+
+class VariantStoreDoesNotCoverRegion(Exception):
+    pass
+
+class LocalVariantStore(object):
+    """
+    LocalVariantStore
+    Used for the retrieval of the variant records that were imported from a
+    (tabix indexed) VCF file into a local SQLite database. The records are
+    indexed on (chromosome, position), so the variants in a region are
+    retrieved via a range lookup in the index. Only the INFO fields that
+    are used in the annotations are stored, as typed columns. The imported
+    regions are stored as well, so regions that were not imported can be
+    told apart from regions without variants.
+
+    Variables
+    name                       description
+    filename                   str the SQLite database containing the variants
+    file_status                os.stat_result of the database when it was opened
+    connection                 sqlite3.Connection the read only connection to the database
+    info_fields                list of the names of the stored INFO fields
+    """
+
+    def covers(self, chromosome, regions):
+        """Checks whether all (1-based, inclusive) regions on the chromosome
+        are within the imported regions"""
+        for region_start, region_stop in regions:
+            # the imported regions are disjoint, only the last one starting before the region can contain it
+            imported_region = self.connection.execute("SELECT stop FROM regions WHERE chromosome = ? AND start <= ? ORDER BY start DESC LIMIT 1",
+                                                      (chromosome, region_start)).fetchone()
+            if imported_region is None or imported_region[0] < region_stop:
+                return False
+        return True
+
+    def annotate(self, chromosome, regions):
+        """Yields the variant records within the (1-based, inclusive) regions
+        on the chromosome, in the same order as the tabix annotators. Raises
+        a VariantStoreDoesNotCoverRegion if the regions were not imported"""
+        if not self.covers(chromosome, regions):
+            raise VariantStoreDoesNotCoverRegion("The regions '"+str(regions)+"' on '"+chromosome+"' were not imported into '"+self.filename+"'")
+
+        query = "SELECT position, REF, ALT, "+", ".join('"'+name+'"' for name in self.info_fields)+\
+                " FROM variants WHERE chromosome = ? AND position BETWEEN ? AND ? ORDER BY position, rowid"
+        for region_start, region_stop in regions:
+            for row in self.connection.execute(query, (chromosome, region_start, region_stop)).fetchall():
+                yield {'CHROM': chromosome[3:], 'POS': row[0], 'REF': row[1], 'ALT': row[2],
+                       'INFO': dict(zip(self.info_fields, row[3:]))}
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.file_status = os.stat(filename)
+        # the connection is only used by the thread that opened it
+        self.connection = sqlite3.connect('file:'+filename+'?mode=ro', uri=True)
+        self.info_fields = [column[1] for column in self.connection.execute("PRAGMA table_info(variants)")][len(VARIANT_COLUMNS):]
+
+# the open variant stores of the current process and thread
+_open_variant_stores = threading.local()
+
+def retrieve_variant_store(filename):
+    """Retrieves the open LocalVariantStore of the file, or None if it does
+    not exist. The stores are reused per process and thread, a forked
+    process (e.g. a Celery worker) opens its own stores and a replaced
+    store is opened again."""
+    # connections inherited from the parent process share its file handles
+    if getattr(_open_variant_stores, 'pid', None) != os.getpid():
+        _open_variant_stores.pid = os.getpid()
+        _open_variant_stores.stores = {}
+
+    if not os.path.isfile(filename):
+        return None
+
+    variant_store = _open_variant_stores.stores.get(filename)
+    if variant_store is None or not os.path.samestat(variant_store.file_status, os.stat(filename)):
+        _log.debug("Opening '{}'".format(filename))
+        if not variant_store is None:
+            variant_store.connection.close()
+        variant_store = LocalVariantStore(filename)
+        _open_variant_stores.stores[filename] = variant_store
+
+    return variant_store
+
+def write_variant_store(annotateTranscriptFunction, regions_per_chromosome, info_fields, filename):
+    """Writes the variant records, as retrieved via annotateTranscriptFunction
+    for the (disjoint, 1-based, inclusive) regions per chromosome, to a SQLite
+    database at filename, readable via LocalVariantStore. Only the single
+    nucleotide variants and the info_fields [(name, SQLite type), ...] of
+    their INFO are stored. An existing store is replaced."""
+    n_records = 0
+    with atomic_replace(filename) as temporary_filename:
+        with closing(sqlite3.connect(temporary_filename)) as connection:
+            connection.execute("CREATE TABLE regions (chromosome TEXT NOT NULL, start INTEGER NOT NULL, stop INTEGER NOT NULL)")
+            connection.execute("CREATE TABLE variants (chromosome TEXT NOT NULL, position INTEGER NOT NULL, REF TEXT NOT NULL, ALT TEXT NOT NULL"+
+                               "".join(', "'+name+'" '+sqlite_type for name, sqlite_type in info_fields)+")")
+            insert_variant = "INSERT INTO variants VALUES ("+", ".join('?' for _ in range(len(VARIANT_COLUMNS)+len(info_fields)))+")"
+            for chromosome, regions in regions_per_chromosome.items():
+                _log.info("Importing the variants on '{}' into '{}'".format(chromosome, filename))
+                for record in annotateTranscriptFunction(chromosome, regions):
+                    # only single nucleotide variants are annotated
+                    if len(record['REF']) != 1 or len(str(record['ALT'])) != 1: continue
+
+                    connection.execute(insert_variant, [chromosome, int(record['POS']), str(record['REF']), str(record['ALT'])]+
+                                                       [record['INFO'][name] for name, _ in info_fields])
+                    n_records += 1
+
+                connection.executemany("INSERT INTO regions VALUES (?, ?, ?)", [(chromosome, region_start, region_stop) for region_start, region_stop in regions])
+
+            connection.execute("CREATE INDEX variants_per_position ON variants (chromosome, position)")
+            connection.execute("CREATE INDEX regions_per_start ON regions (chromosome, start)")
+            connection.commit()
+
+    _log.info("Imported {} variants into '{}'".format(n_records, filename))
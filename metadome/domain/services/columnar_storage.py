@@ -0,0 +1,213 @@
+import pandas as pd
+import numpy as np
+from metadome.domain.services.file_storage import atomic_replace
+import numbers
+import sys
+import json
+import os
+
+import logging
+
+_log = logging.getLogger(__name__)
+
+MEMORY_MAPPED_TABLE_DESCRIPTION = 'table.json'
+
+# the python types of the (string) categories of a DictionaryEncodedColumn, per type tag
+CATEGORY_TYPES = {'s': str, 'i': int, 'f': float, 'b': lambda value: value == 'True'}
+
+class MalformedColumnarFile(Exception):
+    pass
+
+class DictionaryEncodedColumn(object):
+    """
+    DictionaryEncodedColumn
+    Used for representation of a non-numeric column as integer codes that
+    refer to a dictionary of (fixed-width string) categories, slicing the
+    column returns the decoded values with their original python types
+
+    Variables
+    name                       description
+    codes                      numpy.ndarray of int32 codes, missing values are encoded as -1
+    categories                 numpy.ndarray of the unique values as strings
+    types                      numpy.ndarray of the type tag (see CATEGORY_TYPES) per category, None if all categories are strings
+    dtype                      str the dtype of the original column, 'object' or 'category'
+    """
+
+    def equals(self, value):
+        """Returns a boolean mask of the rows that equal value"""
+        matching_codes = np.flatnonzero(self._decoded_categories[:-1] == value)
+        if len(matching_codes) == 0:
+            return np.zeros(len(self.codes), dtype=bool)
+        return np.in1d(self.codes, matching_codes)
+
+    def count_unique(self):
+        """Counts the distinct values in this column, a missing value counts as a value"""
+        return len(np.unique(self.codes))
+
+    def to_values(self):
+        """Decodes the column with its original dtype, as a pandas.Categorical
+        or as a numpy.ndarray of python objects"""
+        if self.dtype == 'category':
+            return pd.Categorical.from_codes(np.array(self.codes), categories=self._decoded_categories[:-1])
+        return self._decoded_categories[self.codes]
+
+    def estimate_memory_usage(self, memory_mapped=False):
+        """Estimates the number of bytes held in memory, the codes and 
+        categories are not counted if these are memory-mapped"""
+        n_bytes = self._decoded_nbytes
+        if not memory_mapped:
+            n_bytes += self.codes.nbytes + self.categories.nbytes
+            if not self.types is None:
+                n_bytes += self.types.nbytes
+        return int(n_bytes)
+
+    def __getitem__(self, key):
+        return self._decoded_categories[self.codes[key]]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __init__(self, codes, categories, types=None, dtype='category'):
+        self.codes = codes
+        self.categories = categories
+        self.types = types
+        self.dtype = dtype
+
+        # decoded values as python objects, code -1 refers to the appended NaN
+        decoded_categories = categories.tolist() if types is None else [CATEGORY_TYPES[t](c) for c, t in zip(categories.tolist(), types.tolist())]
+        self._decoded_categories = np.empty(len(decoded_categories)+1, dtype=object)
+        self._decoded_categories[:-1] = decoded_categories
+        self._decoded_categories[-1] = np.nan
+        self._decoded_nbytes = self._decoded_categories.nbytes + sum(sys.getsizeof(c) for c in self._decoded_categories)
+
+class MemoryMappedTable(object):
+    """
+    MemoryMappedTable
+    Used for read-only access to a table that is stored as one .npy file
+    per column. Numeric columns are memory-mapped with their own dtype and
+    string columns are memory-mapped as DictionaryEncodedColumn, so that
+    the operating system can share one copy among all processes
+
+    Variables
+    name                       description
+    directory                  str the directory containing the table
+    columns                    list of the column names
+    values                     dictionary {column: numpy.ndarray or DictionaryEncodedColumn}
+    n_rows                     int number of rows in the table
+    """
+
+    def to_dataframe(self):
+        """Materializes the table as a pandas.DataFrame"""
+        return dataframe_from_columns(self.columns, self.values)
+
+    def __init__(self, directory, columns, values, n_rows):
+        self.directory = directory
+        self.columns = columns
+        self.values = values
+        self.n_rows = n_rows
+
+    @classmethod
+    def initializeFromDirectory(cls, directory):
+        with open(directory+'/'+MEMORY_MAPPED_TABLE_DESCRIPTION) as f:
+            description = json.load(f)
+
+        n_rows = description['n_rows']
+
+        # empty files can not be memory-mapped
+        mmap_mode = 'r' if n_rows > 0 else None
+
+        # tables written before the dtypes were stored only contain string categoricals
+        dtypes = description.get('dtypes', ['category']*len(description['columns']))
+
+        values = {}
+        for i, (column, encoding, dtype) in enumerate(zip(description['columns'], description['encodings'], dtypes)):
+            if encoding == 'values':
+                values[column] = np.load(directory+'/'+str(i)+'.values.npy', mmap_mode=mmap_mode)
+            elif encoding == 'dictionary':
+                types_file = directory+'/'+str(i)+'.types.npy'
+                values[column] = DictionaryEncodedColumn(np.load(directory+'/'+str(i)+'.codes.npy', mmap_mode=mmap_mode),
+                                                         np.load(directory+'/'+str(i)+'.categories.npy', mmap_mode=mmap_mode),
+                                                         np.load(types_file) if os.path.isfile(types_file) else None,
+                                                         dtype)
+            else:
+                raise MalformedColumnarFile("Unknown encoding '"+str(encoding)+"' for column '"+str(column)+"' in '"+str(directory)+"'")
+
+        return cls(directory, description['columns'], values, n_rows)
+
+def category_type(value):
+    """Retrieves the type tag (see CATEGORY_TYPES) of a category"""
+    if isinstance(value, (bool, np.bool_)):
+        return 'b'
+    if isinstance(value, numbers.Integral):
+        return 'i'
+    if isinstance(value, numbers.Real):
+        return 'f'
+    return 's'
+
+def encode_column(values):
+    """Encodes a pandas.Series as {'values': numpy.ndarray} for numeric and
+    boolean columns, or as {'codes': numpy.ndarray, 'categories': numpy.ndarray,
+    'types': numpy.ndarray} for all other columns, so that the categories
+    are decoded with their original python types"""
+    if values.dtype.kind in 'biuf':
+        return {'values': values.values}
+
+    # prefix the values with their type tag, so that e.g. 1, '1' and True are distinct categories
+    tagged_values = [category_type(value)+str(value) if present else None for value, present in zip(values, values.notnull())]
+
+    # missing values are encoded as code -1
+    codes, tagged_categories = pd.factorize(np.array(tagged_values, dtype=object))
+    return {'codes': np.asarray(codes, dtype=np.int32),
+            'categories': np.array([c[1:] for c in tagged_categories], dtype=np.str_),
+            'types': np.array([c[0] for c in tagged_categories], dtype=np.str_)}
+
+def dataframe_from_columns(columns, values):
+    """Creates a pandas.DataFrame from numpy.ndarray and DictionaryEncodedColumn columns"""
+    data = {}
+    for column in columns:
+        if isinstance(values[column], DictionaryEncodedColumn):
+            data[column] = values[column].to_values()
+        else:
+            data[column] = np.array(values[column])
+    return pd.DataFrame(data, columns=columns)
+
+def write_memory_mapped_table(dataframe, directory, sort_column=None):
+    """Writes the DataFrame as a directory with one .npy file per (encoded)
+    column, readable via MemoryMappedTable. If sort_column is provided the
+    rows are (stably) sorted on that column. An existing table in the
+    directory is replaced."""
+    if not sort_column is None and sort_column in dataframe.columns:
+        dataframe = dataframe.iloc[np.argsort(dataframe[sort_column].values, kind='mergesort')]
+
+    with atomic_replace(directory) as temporary_directory:
+        os.mkdir(temporary_directory)
+
+        description = {'columns': [str(column) for column in dataframe.columns], 'encodings': [], 'dtypes': [], 'n_rows': len(dataframe)}
+        for i, column in enumerate(dataframe.columns):
+            encoded_column = encode_column(dataframe[column])
+            for key, array in encoded_column.items():
+                np.save(temporary_directory+'/'+str(i)+'.'+key+'.npy', array)
+            description['encodings'].append('values' if 'values' in encoded_column else 'dictionary')
+            description['dtypes'].append(str(dataframe[column].dtype))
+
+        with open(temporary_directory+'/'+MEMORY_MAPPED_TABLE_DESCRIPTION, 'w') as f:
+            json.dump(description, f)
+
+def read_dataframe(csv_filename):
+    """Reads a DataFrame from the (legacy) csv file"""
+    _log.info("Reading '{}'".format(csv_filename))
+    return pd.read_csv(csv_filename, index_col=0)
+
+def read_table(memory_mapped_directory, csv_filename):
+    """Opens the memory-mapped table if present, otherwise falls back to
+    reading a pandas.DataFrame from the csv file"""
+    if os.path.isdir(memory_mapped_directory):
+        _log.info("Opening '{}'".format(memory_mapped_directory))
+        return MemoryMappedTable.initializeFromDirectory(memory_mapped_directory)
+
+    return read_dataframe(csv_filename)
+
+def convert_to_memory_mapped_table(csv_filename, memory_mapped_directory, sort_column=None):
+    """Converts a DataFrame stored in the csv format to a memory-mapped table"""
+    _log.info("Converting to '{}'".format(memory_mapped_directory))
+    write_memory_mapped_table(read_dataframe(csv_filename), memory_mapped_directory, sort_column)
@@ -1,5 +1,6 @@
 from metadome.domain.metrics.codon_statistics import codon_background_rates
 from metadome.domain.models.entities.single_nucleotide_variant import SingleNucleotideVariant
+from metadome.domain.models.entities.gene_region import ChromosomePositionTable
 
 class ExternalREFAlleleNotEqualsTranscriptionException(Exception):
     pass
@@ -8,10 +9,17 @@ def retrieve_background_variant_counts(mappings_per_chromosome):
     # the value that is to be returned
     variant_type_counts = dict()
     
-    for chrom_pos in mappings_per_chromosome.keys():
-        codon = mappings_per_chromosome[chrom_pos]['base_pair_representation']
-        residue_position = mappings_per_chromosome[chrom_pos]['amino_acid_position']
+    # retrieve the codon per residue position
+    if isinstance(mappings_per_chromosome, ChromosomePositionTable):
+        codon_per_residue_position = mappings_per_chromosome.retrieve_codon_per_amino_acid_position()
+    else:
+        codon_per_residue_position = dict()
+        for chrom_pos in mappings_per_chromosome.keys():
+            residue_position = mappings_per_chromosome[chrom_pos]['amino_acid_position']
+            if not residue_position in codon_per_residue_position.keys():
+                codon_per_residue_position[residue_position] = mappings_per_chromosome[chrom_pos]['base_pair_representation']
     
+    for residue_position, codon in codon_per_residue_position.items():
         if not residue_position in variant_type_counts.keys():
             variant_type_counts[residue_position] = dict()
             
@@ -1,65 +1,116 @@
 from metadome.domain.services.annotation.annotation import annotateSNVs
 from metadome.domain.services.annotation.gene_region_annotators import annotateTranscriptWithGnomADData    
+from metadome.domain.services.annotation.annotation_cache import retrieve_cached_transcript_annotation
 from metadome.domain.metrics.GeneticTolerance import background_corrected_mosy_score
 from metadome.domain.services.computation.codon_computations import retrieve_variant_type_counts
-from metadome.domain.services.helper_functions import create_sliding_window
 
-def compute_tolerance_landscape(gene_region, sliding_window_size, min_frequency=0.0):
-    # Annotate gnomad information
-    full_gnomad_annotations = annotateSNVs(annotateTranscriptWithGnomADData, 
-                                         mappings_per_chr_pos=gene_region.retrieve_mappings_per_chromosome(),
-                                         strand=gene_region.strand, 
-                                         chromosome=gene_region.chr,
-                                         regions=gene_region.regions)
+import numpy as np
+
+def compute_sliding_window_dn_ds(variant_type_counts, protein_region_start, protein_region_length, sliding_window_size):
+    """Computes the background corrected dn/ds and the coverage of the 
+    sliding window for each position in the protein region, identical to
+    summing the counts over create_sliding_window, but in O(L) via prefix
+    sums. Returns the numpy.ndarrays (sw_dn_ds, sw_coverage)"""
+    positions = np.arange(protein_region_length)
+    
+    # prefix sums of the variant type counts, starting with zero
+    prefix_sums = {}
+    for variant_type in ['missense', 'background_missense', 'synonymous', 'background_synonymous']:
+        counts = np.array([variant_type_counts[j + protein_region_start][variant_type] for j in positions], dtype=np.float64)
+        prefix_sums[variant_type] = np.concatenate(([0.0], np.cumsum(counts)))
+    
+    # compute the window boundaries (start inclusive, stop exclusive)
+    if sliding_window_size <= 0:
+        window_start = positions
+        window_stop = positions
+        sw_coverage = np.ones(protein_region_length)
+    else:
+        window_start = np.maximum(positions - sliding_window_size, 0)
+        window_stop = np.minimum(positions + sliding_window_size + 1, protein_region_length)
+        sw_coverage = (window_stop - window_start) / ((sliding_window_size*2)+1)
+    
+    window_sums = {variant_type: prefix_sums[variant_type][window_stop] - prefix_sums[variant_type][window_start] for variant_type in prefix_sums.keys()}
+    
+    sw_dn_ds = background_corrected_mosy_score(missense=window_sums['missense'], 
+                                               missense_background=window_sums['background_missense'],
+                                               synonymous=window_sums['synonymous'],
+                                               synonymous_background=window_sums['background_synonymous'])
+    
+    return sw_dn_ds, sw_coverage
+
+def annotate_gene_region_with_gnomad(gene_region):
+    """Annotates the gene region with gnomAD variants as:
+    {chrom_pos: [gnomad_variant, ...]}"""
+    return retrieve_cached_transcript_annotation(gene_region.gencode_transcription_id, 'gnomAD',
+                                                 lambda: annotateSNVs(annotateTranscriptWithGnomADData, 
+                                                                      mappings_per_chr_pos=gene_region.retrieve_mappings_per_chromosome(),
+                                                                      strand=gene_region.strand, 
+                                                                      chromosome=gene_region.chr,
+                                                                      regions=gene_region.regions))
+
+def filter_annotations_on_min_frequency(gnomad_annotations, min_frequency):
+    """Retains the gnomAD variants with an allele frequency >= min_frequency"""
     filtered_gnomad_annotations = dict()
-    # filter on the minimal frequency
-    for chrom_pos in full_gnomad_annotations.keys():
-        for gnomad_variant in full_gnomad_annotations[chrom_pos]:
+    for chrom_pos in gnomad_annotations.keys():
+        for gnomad_variant in gnomad_annotations[chrom_pos]:
             if gnomad_variant['AF'] >= min_frequency:
                 if not chrom_pos in filtered_gnomad_annotations.keys():
                     filtered_gnomad_annotations[chrom_pos] = []
                 filtered_gnomad_annotations[chrom_pos].append(gnomad_variant)
-        
-    variant_type_counts = retrieve_variant_type_counts(gene_region.retrieve_mappings_per_chromosome(), filtered_gnomad_annotations)
-    
-    # precompute the sliding window
-    sliding_window = create_sliding_window(gene_region.protein_region_length, sliding_window_size)
+    return filtered_gnomad_annotations
 
-    # Calculate the sliding window over the gene region
-    tolerance_landscape = []
-    for i in range(len(sliding_window)):
-        tolerance_landscape_entry = {}
-                
-        total_missense_region_i = 0
-        total_missense_background_region_i = 0
-        total_synonymous_region_i = 0
-        total_synonymous_background_region_i = 0
-        for j in sliding_window[i]['sw_range']:
-            # correct gene region for region start
-            j += gene_region.protein_region_start
-                        
-            total_missense_region_i += variant_type_counts[j]['missense']
-            total_missense_background_region_i += variant_type_counts[j]['background_missense']
-            total_synonymous_region_i += variant_type_counts[j]['synonymous']
-            total_synonymous_background_region_i += variant_type_counts[j]['background_synonymous']
-
-        region_i_dn_ds = background_corrected_mosy_score(missense=total_missense_region_i, 
-                                                         missense_background=total_missense_background_region_i,
-                                                         synonymous=total_synonymous_region_i,
-                                                         synonymous_background=total_synonymous_background_region_i)
-
-        # Add tolerance data
-        tolerance_landscape_entry['sw_dn_ds'] = region_i_dn_ds
-        tolerance_landscape_entry['sw_coverage']  = sliding_window[i]['sw_coverage']
-        tolerance_landscape_entry['sw_size']  = sliding_window_size
+def compute_tolerance_landscape_grid(gene_region, sliding_window_sizes, min_frequencies):
+    """Computes the tolerance landscape of the gene region for each 
+    combination of sliding window size and minimal allele frequency, while
+    annotating the gene region only once.
+    Returns {(min_frequency, sliding_window_size): {'tolerance_landscape': 
+    list of dict, 'sw_dn_ds': numpy.ndarray, 'sw_coverage': numpy.ndarray}}"""
+    # Annotate gnomad information
+    full_gnomad_annotations = annotate_gene_region_with_gnomad(gene_region)
+    mappings_per_chromosome = gene_region.retrieve_mappings_per_chromosome()
+    
+    # retrieve the codons once for all landscapes, corrected for gene region start
+    codons = [gene_region.retrieve_codon_for_protein_position(i + gene_region.protein_region_start).toCodonJson() for i in range(gene_region.protein_region_length)]
+    
+    tolerance_landscapes = {}
+    for min_frequency in min_frequencies:
+        # filter on the minimal frequency
+        filtered_gnomad_annotations = filter_annotations_on_min_frequency(full_gnomad_annotations, min_frequency)
+        variant_type_counts = retrieve_variant_type_counts(mappings_per_chromosome, filtered_gnomad_annotations)
         
-        # retrieve codon
-        protein_pos = i + gene_region.protein_region_start # correct for gene region start
-        current_codon = gene_region.retrieve_codon_for_protein_position(protein_pos).toCodonJson()
-        for key in current_codon.keys():
-            tolerance_landscape_entry[key] = current_codon[key]
+        for sliding_window_size in sliding_window_sizes:
+            sw_dn_ds, sw_coverage = compute_sliding_window_dn_ds(variant_type_counts, gene_region.protein_region_start, gene_region.protein_region_length, sliding_window_size)
+            
+            # Calculate the sliding window over the gene region
+            tolerance_landscape = []
+            for i, (region_i_dn_ds, region_i_coverage) in enumerate(zip(sw_dn_ds.tolist(), sw_coverage.tolist())):
+                tolerance_landscape_entry = {}
+                
+                # Add tolerance data
+                tolerance_landscape_entry['sw_dn_ds'] = region_i_dn_ds
+                tolerance_landscape_entry['sw_coverage']  = region_i_coverage
+                tolerance_landscape_entry['sw_size']  = sliding_window_size
+                
+                # Add codon information
+                for key in codons[i].keys():
+                    tolerance_landscape_entry[key] = codons[i][key]
+                
+                # Add information to landscape
+                tolerance_landscape.append(tolerance_landscape_entry)
             
-        # Add information to landscape
-        tolerance_landscape.append(tolerance_landscape_entry)
+            tolerance_landscapes[(min_frequency, sliding_window_size)] = {'tolerance_landscape': tolerance_landscape,
+                                                                          'sw_dn_ds': sw_dn_ds,
+                                                                          'sw_coverage': sw_coverage}
+    
+    return tolerance_landscapes
+
+def compute_tolerance_landscapes(gene_region, sliding_window_sizes, min_frequency=0.0):
+    """Computes the tolerance landscape of the gene region for each of the
+    sliding window sizes, while annotating the gene region only once.
+    Returns {sliding_window_size: {'tolerance_landscape': list of dict,
+    'sw_dn_ds': numpy.ndarray, 'sw_coverage': numpy.ndarray}}"""
+    tolerance_landscape_grid = compute_tolerance_landscape_grid(gene_region, sliding_window_sizes, [min_frequency])
+    return {sliding_window_size: tolerance_landscape_grid[(min_frequency, sliding_window_size)] for sliding_window_size in sliding_window_sizes}
 
-    return tolerance_landscape
\ No newline at end of file
+def compute_tolerance_landscape(gene_region, sliding_window_size, min_frequency=0.0):
+    return compute_tolerance_landscapes(gene_region, [sliding_window_size], min_frequency)[sliding_window_size]['tolerance_landscape']
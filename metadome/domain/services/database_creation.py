@@ -3,11 +3,17 @@ from metadome.domain.models.protein import Protein
 from metadome.domain.models.interpro import Interpro
 from metadome.domain.repositories import MappingRepository, SequenceRepository
 from metadome.domain.services.multi_threading import CalculateNumberOfActiveThreads
-from metadome.domain.data_generation.mapping.mapping_generator import generate_gene_to_swissprot_mapping
+from metadome.domain.data_generation.mapping.mapping_generator import generate_gene_to_swissprot_mapping,\
+    retrieve_matching_coding_translations
 from metadome.domain.infrastructure import add_gene_mapping_to_database,\
     filter_gene_names_present_in_database
-from metadome.domain.wrappers.gencode import retrieve_all_protein_coding_gene_names
+from metadome.domain.wrappers.gencode import retrieve_all_protein_coding_gene_names,\
+    retrieveMRNAValidatedTranslationsForGenes_gencode
 from metadome.domain.wrappers.interpro import retrieve_interpro_entries
+from metadome.domain.wrappers.uniprot import load_uniprot_sequences,\
+    blastUniprotSequencesInBatch
+from metadome.default_settings import UNIPROT_SPROT_CANONICAL_AND_ISOFORM,\
+    UNIPROT_SPROT_SPECIES_FILTER
 from sklearn.externals.joblib.parallel import Parallel, delayed
 
 import logging
@@ -21,6 +27,9 @@ def create_db():
     # the genes that are to be checked
     genes_of_interest = retrieve_all_protein_coding_gene_names()
          
+    # hold the human swissprot sequences in memory while mapping
+    load_uniprot_sequences(UNIPROT_SPROT_CANONICAL_AND_ISOFORM, UNIPROT_SPROT_SPECIES_FILTER)
+         
     # (re-) construct the mapping database  => GENE2PROTEIN_MAPPING_DB
     generate_mappings_for_genes(genes_of_interest, batch_size=10, use_parallel=True)
       
@@ -33,6 +42,10 @@ def generate_mappings_for_genes(genes_of_interest, batch_size, use_parallel):
     # filter gene names alreay present in the database
     genes_of_interest = filter_gene_names_present_in_database(genes_of_interest)
     
+    # retrieve the mRNA validated translations of all genes at once
+    mrna_translations_per_gene = {gene_name: [a['transcription_id'] for a in translations]
+                                  for gene_name, translations in retrieveMRNAValidatedTranslationsForGenes_gencode(genes_of_interest).items()}
+    
     # Create batches
     genes_of_interest_batches = [genes_of_interest[i:i+batch_size] for i in range(0, len(genes_of_interest), batch_size)]
     n_batches = len(genes_of_interest_batches)
@@ -44,11 +57,20 @@ def generate_mappings_for_genes(genes_of_interest, batch_size, use_parallel):
     for batch_counter, gene_batch in enumerate(genes_of_interest_batches):
         _log.info("Starting batch '"+str(batch_counter+1)+"' out of '"+str(n_batches)+"', with '"+str(len(gene_batch))+"' genes")
      
+        # retrieve the translations to be mapped
+        translations_per_gene = {gene: retrieve_matching_coding_translations(gene, mrna_translations_per_gene[gene]) for gene in gene_batch}
+        
+        # blast the translations of the batch with a single blastp process
+        blast_results = blastUniprotSequencesInBatch([translation for gene in gene_batch for translation in translations_per_gene[gene]],
+                                                     species_filter=UNIPROT_SPROT_SPECIES_FILTER)
+        blast_results_per_gene = {gene: {translation['sequence']: blast_results[translation['sequence']] for translation in translations_per_gene[gene] if translation['sequence'] in blast_results}
+                                  for gene in gene_batch}
+     
         gene_mappings = []
         if use_parallel:
-            gene_mappings = Parallel(n_jobs=CalculateNumberOfActiveThreads(batch_size))(delayed(generate_gene_to_swissprot_mapping)(gene) for gene in gene_batch)            
+            gene_mappings = Parallel(n_jobs=CalculateNumberOfActiveThreads(batch_size))(delayed(generate_gene_to_swissprot_mapping)(gene, mrna_translations_per_gene[gene], translations_per_gene[gene], blast_results_per_gene[gene]) for gene in gene_batch)            
         else:
-            gene_mappings = [generate_gene_to_swissprot_mapping(gene) for gene in gene_batch]
+            gene_mappings = [generate_gene_to_swissprot_mapping(gene, mrna_translations_per_gene[gene], translations_per_gene[gene], blast_results_per_gene[gene]) for gene in gene_batch]
 
         # add the batches to the database
         for gene_mapping in gene_mappings:
@@ -0,0 +1,72 @@
+from contextlib import contextmanager
+import hashlib
+import json
+import shutil
+import os
+
+import logging
+
+_log = logging.getLogger(__name__)
+
+def compute_file_status_checksum(filenames, settings=None):
+    """Computes a checksum over the path, size and modification time of the
+    (existing) files and over the (json serializable) settings, if provided.
+    The contents of the files are not read."""
+    checksum = hashlib.md5() if settings is None else hashlib.md5(json.dumps(settings).encode())
+    for filename in filenames:
+        if os.path.exists(filename):
+            file_status = os.stat(filename)
+            checksum.update("{}:{}:{}".format(filename, file_status.st_size, file_status.st_mtime_ns).encode())
+    return checksum.hexdigest()
+
+def _remove_path(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+@contextmanager
+def atomic_replace(filename):
+    """Provides a temporary path to write the file (or directory) to, which
+    replaces filename once the context exits without an exception, so
+    readers never encounter a partially written file. On an exception the
+    temporary path is removed."""
+    temporary_filename = filename+'.'+str(os.getpid())+'.tmp'
+    _remove_path(temporary_filename)
+    try:
+        yield temporary_filename
+        if os.path.isdir(temporary_filename) and os.path.isdir(filename):
+            # swap the directories, processes that still map the previous files keep on reading those
+            previous_filename = temporary_filename+'.old'
+            os.rename(filename, previous_filename)
+            os.rename(temporary_filename, filename)
+            shutil.rmtree(previous_filename)
+        else:
+            os.replace(temporary_filename, filename)
+    except BaseException:
+        _remove_path(temporary_filename)
+        raise
+
+@contextmanager
+def atomic_write(filename, mode='w'):
+    """Provides the opened file object to write filename via atomic_replace"""
+    with atomic_replace(filename) as temporary_filename:
+        with open(temporary_filename, mode) as f:
+            yield f
+
+def retrieve_persisted_index(filename, index_filename, build_index):
+    """Retrieves the (json serializable) index of the file as persisted at
+    index_filename, provided that it matches the size and modification time
+    of the file. Otherwise the index is (re)built via build_index() and
+    persisted, so it is only built once per version of the file"""
+    file_status = os.stat(filename)
+    if os.path.isfile(index_filename):
+        with open(index_filename) as f:
+            persisted_index = json.load(f)
+        if persisted_index.get('size') == file_status.st_size and persisted_index.get('mtime_ns') == file_status.st_mtime_ns and 'index' in persisted_index:
+            return persisted_index['index']
+
+    index = build_index()
+    with atomic_write(index_filename) as f:
+        json.dump({'size': file_status.st_size, 'mtime_ns': file_status.st_mtime_ns, 'index': index}, f)
+    return index
@@ -1,4 +1,5 @@
 import re
+from bisect import bisect_left, bisect_right
 
 
 transcript_id_pattern = re.compile(r"^ENST[0-9]{11}\.[0-9]+$")
@@ -48,3 +49,37 @@ def create_sliding_window(total_length, sliding_window_size):
     
         
     return region_sliding_window
+
+class IntervalIndex(object):
+    """
+    IntervalIndex
+    Used for the retrieval of all intervals containing a position in 
+    O(log n + hits). The boundaries split the positions into segments that
+    are each contained by the same set of intervals
+    
+    Variables
+    name                       description
+    boundaries                 sorted list of the positions at which the set of containing intervals changes
+    values_per_segment         list of the values of the intervals containing the segment [boundaries[i], boundaries[i+1])
+    """
+    
+    def retrieve(self, position):
+        """Retrieves the values of the intervals containing the position, 
+        in the order the intervals were provided. The list is a copy, so
+        callers may modify it without affecting the index"""
+        segment = bisect_right(self.boundaries, position) - 1
+        if segment < 0 or segment >= len(self.values_per_segment):
+            return []
+        return list(self.values_per_segment[segment])
+    
+    def __init__(self, intervals):
+        """Builds the index for a list of (start, stop, value), where both 
+        start and stop are inclusive"""
+        intervals = [(start, stop, value) for start, stop, value in intervals if start <= stop]
+        self.boundaries = sorted(set([start for start, _, _ in intervals] + [stop+1 for _, stop, _ in intervals]))
+        self.values_per_segment = [[] for _ in range(max(len(self.boundaries)-1, 0))]
+        
+        # add the value to each segment from the one starting at start, up to the one containing stop
+        for start, stop, value in intervals:
+            for segment in range(bisect_left(self.boundaries, start), bisect_right(self.boundaries, stop)):
+                self.values_per_segment[segment].append(value)
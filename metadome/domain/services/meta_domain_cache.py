@@ -0,0 +1,117 @@
+from metadome.domain.models.entities.meta_domain import MetaDomain
+from metadome.domain.services.columnar_storage import MEMORY_MAPPED_TABLE_DESCRIPTION
+from metadome.default_settings import METADOMAIN_DIR, METADOMAIN_CACHE_MAX_BYTES
+from collections import OrderedDict
+import threading
+import os
+
+import logging
+
+_log = logging.getLogger(__name__)
+
+def retrieve_metadomain_file_signature(domain_id):
+    """Retrieves the (file name, modification time, size) of all files
+    in the meta domain directory and the (table name, modification time,
+    size, inode) of the description of each memory mapped table, or None if
+    the directory does not exist. Any (re-)creation or (re-)annotation of
+    the meta domain changes this signature."""
+    meta_domain_dir = METADOMAIN_DIR+domain_id
+    if not os.path.isdir(meta_domain_dir):
+        return None
+    
+    signature = []
+    for entry in os.scandir(meta_domain_dir):
+        if entry.is_file():
+            file_stat = entry.stat()
+            signature.append((entry.name, file_stat.st_mtime_ns, file_stat.st_size))
+        elif entry.is_dir() and entry.name.endswith('.mmap'):
+            # memory mapped tables are replaced as a whole directory
+            table_description = os.path.join(entry.path, MEMORY_MAPPED_TABLE_DESCRIPTION)
+            if os.path.isfile(table_description):
+                file_stat = os.stat(table_description)
+                signature.append((entry.name, file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino))
+    
+    return tuple(sorted(signature))
+
+class MetaDomainCache(object):
+    """
+    MetaDomainCache
+    Least recently used cache of MetaDomain objects, bounded by the
+    estimated memory usage of the cached meta domains. Entries are
+    invalidated whenever the files of the meta domain change on disk.
+    
+    Variables
+    name                       description
+    max_bytes                  int the estimated memory budget of this cache
+    current_bytes              int the estimated memory usage of all cached meta domains
+    """
+    
+    def retrieve_metadomain(self, domain_id):
+        """Retrieves the MetaDomain for the domain_id, from the cache
+        if the meta domain files did not change since it was cached"""
+        signature = retrieve_metadomain_file_signature(domain_id)
+        
+        with self._lock:
+            if domain_id in self._entries.keys():
+                cached_signature, meta_domain, n_bytes = self._entries[domain_id]
+                if cached_signature == signature:
+                    self._entries.move_to_end(domain_id)
+                    return meta_domain
+                
+                # the files changed on disk, remove the outdated entry
+                _log.info("Meta domain files for '{}' changed on disk, reloading".format(domain_id))
+                self._remove(domain_id)
+        
+        # Load outside of the lock, so other meta domains can be retrieved meanwhile
+        meta_domain = MetaDomain.initializeFromDomainID(domain_id)
+        
+        # initialization may have (re-)created files, so determine the signature again
+        signature = retrieve_metadomain_file_signature(domain_id)
+        n_bytes = meta_domain.estimate_memory_usage()
+        
+        if n_bytes > self.max_bytes:
+            _log.warning("Meta domain '{}' ({} bytes) exceeds the cache budget of {} bytes, not caching it".format(domain_id, n_bytes, self.max_bytes))
+            return meta_domain
+        
+        with self._lock:
+            if domain_id in self._entries.keys():
+                self._remove(domain_id)
+            self._entries[domain_id] = (signature, meta_domain, n_bytes)
+            self.current_bytes += n_bytes
+            
+            # evict the least recently used meta domains until we are within budget
+            while self.current_bytes > self.max_bytes:
+                evicted_domain_id = next(iter(self._entries.keys()))
+                _log.debug("Evicting meta domain '{}' from the cache".format(evicted_domain_id))
+                self._remove(evicted_domain_id)
+        
+        return meta_domain
+    
+    def clear(self):
+        """Removes all meta domains from the cache"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+    
+    def _remove(self, domain_id):
+        _, _, n_bytes = self._entries.pop(domain_id)
+        self.current_bytes -= n_bytes
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def __contains__(self, domain_id):
+        return domain_id in self._entries
+
+# The meta domains cached within this process
+meta_domain_cache = MetaDomainCache(METADOMAIN_CACHE_MAX_BYTES)
+
+def retrieve_metadomain(domain_id):
+    """Retrieves the MetaDomain for the domain_id via the process wide cache"""
+    return meta_domain_cache.retrieve_metadomain(domain_id)
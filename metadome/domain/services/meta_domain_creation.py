@@ -1,9 +1,13 @@
 from metadome.domain.repositories import InterproRepository
 from metadome.domain.data_generation.mapping.meta_domain_mapping import generate_pfam_alignments
+from metadome.domain.services.columnar_storage import convert_to_memory_mapped_table
 
 import logging
 import os
-from metadome.default_settings import METADOMAIN_DIR
+from metadome.default_settings import METADOMAIN_DIR,\
+    METADOMAIN_MAPPING_FILE_NAME, METADOMAIN_SNV_ANNOTATION_FILE_NAME,\
+    METADOMAIN_MAPPING_MEMORY_MAPPED_DIR_NAME,\
+    METADOMAIN_SNV_ANNOTATION_MEMORY_MAPPED_DIR_NAME
 
 _log = logging.getLogger(__name__)
 
@@ -31,4 +35,35 @@ def create_metadomains(reconstruct):
         _log.info("Finished creation of alignment for '"+str(domains_processed)+"' out of '"+str(len(domains_of_interest))+"'")
         domains_processed+=1
          
-    _log.info("Finished the creation of meta-domain alignments of '"+str(len(domains_of_interest))+"' domains, resulting in '"+str(domains_processed)+"' successful meta-domain alignments, previously processed (='"+str(domains_already_processed)+"')")
\ No newline at end of file
+    _log.info("Finished the creation of meta-domain alignments of '"+str(len(domains_of_interest))+"' domains, resulting in '"+str(domains_processed)+"' successful meta-domain alignments, previously processed (='"+str(domains_already_processed)+"')")
+
+def migrate_metadomains_to_memory_mapped_format(remove_legacy_files=False):
+    """Converts the csv mappings and annotations of all
+    meta domains in METADOMAIN_DIR to the memory-mapped format. Meta 
+    domains that have already been converted are skipped."""
+    _log.info("Starting conversion of all meta-domains in '"+str(METADOMAIN_DIR)+"' to the memory-mapped format")
+    
+    files_to_convert = [(METADOMAIN_MAPPING_FILE_NAME, METADOMAIN_MAPPING_MEMORY_MAPPED_DIR_NAME),
+                        (METADOMAIN_SNV_ANNOTATION_FILE_NAME, METADOMAIN_SNV_ANNOTATION_MEMORY_MAPPED_DIR_NAME)]
+    
+    tables_converted = 0
+    for domain_id in sorted(os.listdir(METADOMAIN_DIR)):
+        meta_domain_dir = METADOMAIN_DIR+domain_id
+        if not os.path.isdir(meta_domain_dir):
+            continue
+        
+        for csv_file_name, memory_mapped_dir_name in files_to_convert:
+            csv_file = meta_domain_dir+'/'+csv_file_name
+            memory_mapped_dir = meta_domain_dir+'/'+memory_mapped_dir_name
+            
+            if not os.path.exists(csv_file):
+                continue
+            
+            if not os.path.exists(memory_mapped_dir):
+                convert_to_memory_mapped_table(csv_file, memory_mapped_dir, sort_column='consensus_pos')
+                tables_converted+=1
+            
+            if remove_legacy_files:
+                os.remove(csv_file)
+    
+    _log.info("Finished the conversion of meta-domains to the memory-mapped format, converted '"+str(tables_converted)+"' tables")
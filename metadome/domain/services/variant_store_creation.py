@@ -0,0 +1,28 @@
+from metadome.domain.repositories import MappingRepository
+from metadome.domain.services.annotation.gene_region_annotators import annotateTranscriptWithGnomADDataFromTabix,\
+    annotateTranscriptWithClinvarDataFromTabix
+from metadome.domain.services.annotation.variant_store import write_variant_store,\
+    GNOMAD_INFO_FIELDS, CLINVAR_INFO_FIELDS
+from metadome.domain.services.helper_functions import convertListOfIntegerToRanges
+from metadome.default_settings import GNOMAD_VARIANT_STORE, CLINVAR_VARIANT_STORE
+
+import logging
+
+_log = logging.getLogger(__name__)
+
+def create_variant_stores():
+    """Imports the gnomAD and ClinVar variants within the regions covered by
+    the mappings into the local variant stores. The stores need to be
+    recreated after the mappings, the VCF files or the filters on these
+    (i.e. GNOMAD_ACCEPTED_FILTERS and CLINVAR_CONSIDERED_CLINSIG) change."""
+    _log.info("Starting creation of the local variant stores")
+
+    # the coding regions, merged over all transcripts
+    regions_per_chromosome = {chromosome: list(convertListOfIntegerToRanges(chromosome_positions))
+                              for chromosome, chromosome_positions in MappingRepository.retrieve_chromosome_positions_per_chromosome().items()}
+
+    for annotateTranscriptFunction, info_fields, filename in [(annotateTranscriptWithGnomADDataFromTabix, GNOMAD_INFO_FIELDS, GNOMAD_VARIANT_STORE),
+                                                              (annotateTranscriptWithClinvarDataFromTabix, CLINVAR_INFO_FIELDS, CLINVAR_VARIANT_STORE)]:
+        write_variant_store(annotateTranscriptFunction, regions_per_chromosome, info_fields, filename)
+
+    _log.info("Finished creation of the local variant stores")
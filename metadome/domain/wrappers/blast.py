@@ -2,7 +2,7 @@ import logging
 import tempfile
 import subprocess
 import os
-from metadome.default_settings import BLASTP_EXECUTABLE
+from metadome.default_settings import BLASTP_EXECUTABLE, BLASTP_NUM_THREADS
 
 _log = logging.getLogger(__name__)
 
@@ -78,15 +78,44 @@ def run_blast(sequence, blastdb, max_target_seqs=None):
     
     with tempfile.NamedTemporaryFile(suffix=".fasta", delete=False) as tmp_file:
         tmp_file.write(sequence.encode('utf-8'))
-    out_blast = tmp_file.name + '.blastp'
+    output = run_blastp(tmp_file.name, blastdb, max_target_seqs)
+    os.remove(tmp_file.name)
+    
+    return output
+
+def run_blast_batch(sequences, blastdb, max_target_seqs=None, num_threads=BLASTP_NUM_THREADS):
+    """Blasts multiple sequences with a single blastp process and returns 
+    the output lines per sequence, in the order of the sequences. The output
+    lines are formatted as for run_blast, with the query numbered in the
+    qseqid as 'query_<index>'. max_target_seqs applies per sequence"""
+    if len(sequences) == 0:
+        return []
+    
+    with tempfile.NamedTemporaryFile(suffix=".fasta", delete=False) as tmp_file:
+        for i, sequence in enumerate(sequences):
+            tmp_file.write(('>query_'+str(i)+'\n'+sequence+'\n').encode('utf-8'))
+    output = run_blastp(tmp_file.name, blastdb, max_target_seqs, num_threads)
+    os.remove(tmp_file.name)
+    
+    # demultiplex the output on the qseqid
+    output_per_sequence = [[] for _ in sequences]
+    for line in output:
+        output_per_sequence[int(line.split(',')[0][len('query_'):])].append(line)
+    
+    return output_per_sequence
+
+def run_blastp(query_filename, blastdb, max_target_seqs=None, num_threads=BLASTP_NUM_THREADS):
+    """Runs blastp for the queries in the (FASTA) query file and returns
+    the output lines, see run_blast"""
+    out_blast = query_filename + '.blastp'
     
     if max_target_seqs is None:
-        args = [BLASTP_EXECUTABLE, "-query", tmp_file.name, "-evalue", "1e-5",
-            "-num_threads", "15", "-db", blastdb,
+        args = [BLASTP_EXECUTABLE, "-query", query_filename, "-evalue", "1e-5",
+            "-num_threads", str(num_threads), "-db", blastdb,
             "-out", out_blast, '-outfmt', '10 std nident']
     else:
-        args = [BLASTP_EXECUTABLE, "-query", tmp_file.name, "-evalue", "1e-5",
-            "-num_threads", "15", "-db", blastdb,
+        args = [BLASTP_EXECUTABLE, "-query", query_filename, "-evalue", "1e-5",
+            "-num_threads", str(num_threads), "-db", blastdb,
             "-out", out_blast, '-outfmt', '10 std nident',
             "-max_target_seqs", str(max_target_seqs)]
     try:
@@ -103,7 +132,6 @@ def run_blast(sequence, blastdb, max_target_seqs=None):
         os.remove(out_blast)
     else:
         output = []
-    os.remove(tmp_file.name)
     
     return output
 
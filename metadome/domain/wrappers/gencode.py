@@ -1,8 +1,12 @@
 import logging
+import threading
 from metadome.default_settings import GENCODE_HG_TRANSLATION_FILE,\
     GENCODE_SWISSPROT_FILE, GENCODE_HG_TRANSCRIPTION_FILE,\
-    GENCODE_HG_ANNOTATION_FILE_GFF3, GENCODE_BASIC_FILE, GENCODE_REFSEQ_FILE
+    GENCODE_HG_ANNOTATION_FILE_GFF3, GENCODE_BASIC_FILE, GENCODE_REFSEQ_FILE,\
+    GENCODE_HG_TRANSCRIPTION_INDEX_FILE, GENCODE_HG_TRANSLATION_INDEX_FILE,\
+    GENCODE_HG_ANNOTATION_CDS_INDEX_FILE
 from metadome.domain.parsers import gff3
+from metadome.domain.parsers.fasta import FastaHeaderIndex
 from Bio.Seq import translate
 import urllib
 
@@ -26,6 +30,53 @@ class TranscriptionNotContainingCDS(Exception):
 class TranscriptionStrandMismatchException(Exception):
     pass
 
+# the header indices of the Gencode FASTA files, loaded once per process
+_fasta_header_indices = {}
+_fasta_header_indices_lock = threading.Lock()
+
+# the CDS index of the Gencode annotation, loaded once per process
+_gff3_record_indices = {}
+_gff3_record_indices_lock = threading.Lock()
+
+# the offsets of the Gencode basic set per gene name, indexed once per process
+_gencode_basic_offsets = {}
+_gencode_basic_offsets_lock = threading.Lock()
+
+# the rows of the Gencode metadata files, loaded once per process
+_metadata_rows = {}
+_metadata_rows_lock = threading.Lock()
+
+def retrieve_fasta_header_index(filename, index_filename, retrieve_keys):
+    """Retrieves the header index of the Gencode FASTA file. The index is
+    loaded once per process, also when called from multiple threads at the
+    same time"""
+    if not filename in _fasta_header_indices:
+        with _fasta_header_indices_lock:
+            if not filename in _fasta_header_indices:
+                _fasta_header_indices[filename] = FastaHeaderIndex.initializeFromFile(filename, index_filename, retrieve_keys)
+    return _fasta_header_indices[filename]
+
+def retrieve_transcription_header_index():
+    """Retrieves the header index of the Gencode transcriptions on transcription id"""
+    return retrieve_fasta_header_index(GENCODE_HG_TRANSCRIPTION_FILE, GENCODE_HG_TRANSCRIPTION_INDEX_FILE,
+                                       lambda header: [header.split('|')[0]])
+
+def retrieve_translation_header_index():
+    """Retrieves the header index of the Gencode translations on gene name"""
+    return retrieve_fasta_header_index(GENCODE_HG_TRANSLATION_FILE, GENCODE_HG_TRANSLATION_INDEX_FILE,
+                                       lambda header: header.split('|')[5:6])
+
+def retrieve_CDS_index():
+    """Retrieves the index of the Gencode CDS annotation on transcription id.
+    The index is loaded once per process, also when called from multiple
+    threads at the same time"""
+    if not GENCODE_HG_ANNOTATION_FILE_GFF3 in _gff3_record_indices:
+        with _gff3_record_indices_lock:
+            if not GENCODE_HG_ANNOTATION_FILE_GFF3 in _gff3_record_indices:
+                _gff3_record_indices[GENCODE_HG_ANNOTATION_FILE_GFF3] = gff3.GFF3RecordIndex.initializeFromFile(GENCODE_HG_ANNOTATION_FILE_GFF3, GENCODE_HG_ANNOTATION_CDS_INDEX_FILE,
+                                                                                                              feature_type='CDS', attribute='transcript_id')
+    return _gff3_record_indices[GENCODE_HG_ANNOTATION_FILE_GFF3]
+
 def retrieveAllCharacterPositionsFromString(string_to_check, char_to_check):
     return [pos for pos, char in enumerate(string_to_check) if char == char_to_check]
 
@@ -45,66 +96,46 @@ def retrieveLongestTranslation(translations):
         
     return longest_translation
 
+def retrieve_metadata_rows(filename):
+    """Retrieves the rows of a tab separated Gencode metadata file as
+    {gencode_id: [tokens, ...]} in file order. The file is read once per
+    process, also when called from multiple threads at the same time"""
+    if not filename in _metadata_rows:
+        with _metadata_rows_lock:
+            if not filename in _metadata_rows:
+                _log.debug("Loading '"+filename+"'")
+                rows_per_gencode_id = {}
+                with open(filename) as metadata_file:
+                    for line in metadata_file:
+                        tokens = line.split('\t')
+                        if not tokens[0] in rows_per_gencode_id:
+                            rows_per_gencode_id[tokens[0]] = []
+                        rows_per_gencode_id[tokens[0]].append(tokens)
+                _metadata_rows[filename] = rows_per_gencode_id
+    return _metadata_rows[filename]
+
 def retrieveSwissProtIDs(gencode_ids):
     """Retrieve the SwissProt accession code and id based on multiple GencodeIDs"""
     results = {}
-    with open(GENCODE_SWISSPROT_FILE) as gencode_swissprot:
-        # read the lines in the file
-        lines = gencode_swissprot.readlines()
-        for line in lines:
-            # check for each of the gencode_ids
-            for gencode_id in gencode_ids:
-                # check if the unique identifier is on the current line
-                if gencode_id in line:
-                    if not(gencode_id in results.keys()):
-                        #Add the result to hits
-                        tokens = line.split('\t')
-                        
-                        # Only add the translation to the translation list if the gene_name exactly matches the one we are looking for
-                        if gencode_id == tokens[0]:                            
-                            # add the results
-                            result = {}
-                            result['ac'] = tokens[1].strip()
-                            result['swissprot_id'] = tokens[2].strip()
-                            
-                            # add the result to the results using the gencode id as an identifier
-                            results[gencode_id] = result
-                        else:
-                            _log.warning("When searching for swissprot id using Gencode ID '"+gencode_id+"', found entry '"+tokens[0]+"', which only partially matched the id")
-                    else:
-                        _log.warning("For Gencode ID '"+gencode_id+"', found an additional swissprot entry: '"+line+"', we already found '"+str(results[gencode_id])+"'")
+    swissprot_rows = retrieve_metadata_rows(GENCODE_SWISSPROT_FILE)
+    for gencode_id in gencode_ids:
+        for tokens in swissprot_rows.get(gencode_id, []):
+            if not(gencode_id in results.keys()):
+                # add the result to the results using the gencode id as an identifier
+                results[gencode_id] = {'ac': tokens[1].strip(), 'swissprot_id': tokens[2].strip()}
+            else:
+                _log.warning("For Gencode ID '"+gencode_id+"', found an additional swissprot entry: '"+'\t'.join(tokens)+"', we already found '"+str(results[gencode_id])+"'")
     if len(results) == 0:
-        raise NoSwissProtEntryFoundException("For Gencode ID '"+gencode_id+"', found no matching swissprot entry")
+        raise NoSwissProtEntryFoundException("For Gencode IDs '"+str(gencode_ids)+"', found no matching swissprot entry")
     
     return results
 
 def retrieveSwissProtID(gencode_id):
     """Retrieve the SwissProt accession code and id based on the GencodeID"""
-    
-    result = {}
-    with open(GENCODE_SWISSPROT_FILE) as gencode_swissprot:
-        # read the lines in the file
-        lines = gencode_swissprot.readlines()
-        for line in lines:
-            # check if the unique identifier is on the current line
-            if gencode_id in line:
-                if len(result) == 0:
-                    #Add the result to hits
-                    tokens = line.split('\t')
-                    
-                    # Only add the translation to the translation list if the gene_name exactly matches the one we are looking for
-                    if gencode_id == tokens[0]:
-                        # add the results
-                        result['ac'] = tokens[1].strip()
-                        result['swissprot_id'] = tokens[2].strip()
-                    else:
-                        _log.warning("When searching for swissprot id using Gencode ID '"+gencode_id+"', found entry '"+tokens[0]+"', which only partially matched the id")
-                else:
-                    _log.warning("For Gencode ID '"+gencode_id+"', found an additional swissprot entry: '"+line+"', we already found '"+str(result)+"'")
-    if len(result) == 0:
+    try:
+        return retrieveSwissProtIDs([gencode_id])[gencode_id]
+    except NoSwissProtEntryFoundException:
         raise NoSwissProtEntryFoundException("For Gencode ID '"+gencode_id+"', found no matching swissprot entry")
-    
-    return result
 
 def retrieveStrandDirection_gencode(CDS_annotations):
     """Retrieves the strand direction from cds annotations
@@ -131,142 +162,184 @@ def retrieveNucleotideSequence_gencode(translation):
     transcription_id = translation['transcription-id']
     
     _log.debug("Retrieving nucleotide sequence for transcription id")
-    with open(GENCODE_HG_TRANSCRIPTION_FILE) as hg_trancription:
-        # read the lines in the file
-        lines = hg_trancription.readlines()
-        for i in range(len(lines)):
-            # retrieve current line
-            line = lines[i]
+    # retrieve the fasta headers of the transcription id via the index
+    for line, sequence in retrieve_transcription_header_index().retrieve_entries(transcription_id):
+        ## Parse the Line
+        # Remove the fasta header syntax
+        line = line[1:]
+        
+        # convert the fasta header to tokens
+        tokens = line.split('|')
+        
+        # retrieve the various fields from the tokens
+        gene_name_id = tokens[1] # == translation['gene_name-id']
+        havana_gene_name_id = tokens[2] # == translation['Havana-gene_name-id']
+        havana_translation_id = tokens[3] # == translation['Havana-translation-id']
+        translation_name = tokens[4] # == translation['translation-name']
+        gene_name = tokens[5] # == translation['gene-name']
+        nucleotide_sequence_length = tokens[6]
+        
+        # perform checks that we are considering the correct sequence
+        if transcription_id == tokens[0] \
+            and gene_name_id == translation['gene_name-id'] \
+            and havana_gene_name_id == translation['Havana-gene_name-id'] \
+            and havana_translation_id == translation['Havana-translation-id'] \
+            and translation_name == translation['translation-name'] \
+            and gene_name == translation['gene-name']:
+            
+            utr5=None
+            utr3=None
+            CDS=None
+            
+            for token in tokens[7:]:
+                if token.startswith('UTR3'):utr3=token
+                if token.startswith('CDS'):CDS=token
+                if token.startswith('UTR5'): utr5 = token
+                    
+            if(utr3 is None):
+                _log.error("Non-fatal error: no UTR3 found for transcript '"+transcription_id+"'")
+            if(utr5 is None):
+                _log.error("Non-fatal error: no UTR5 found for transcript '"+transcription_id+"'")
+            if(CDS is None):
+                raise TranscriptionNotContainingCDS("No CDS found in transcript '"+transcription_id+"'")
+            
+            # append transcript elements to the object
+            matching_transcript['sequence'] = sequence
+            matching_transcript['sequence_length'] = nucleotide_sequence_length
+            matching_transcript['UTR5'] = utr5
+            matching_transcript['UTR3'] = utr3
+            matching_transcript['CDS'] = CDS
             
-            # check if the line is a fasta header, otherwise skip it 
-            # Check if the string of the gene_name we are trying to find occurs in the line
-            if line.startswith('>') and transcription_id in line:
-                ## Parse the Line
-                # Remove the fasta header syntax
-                line = line[1:]
-                if line.endswith('\n'):
-                    # remove newline statement
-                    line = line[:len(line)-1]
+            # check if the CDS is properly formatted
+            if CDS.startswith('CDS:'):
+                # retrieve the ranges of the Coding DNA Sequence
+                cds_range = [int(a) for a in CDS[4:].split('-')]
                 
-                # convert the fasta header to tokens
-                tokens = line.split('|')
+                # correct the first number for index mismatch
+                cds_range[0] = cds_range[0]-1
                 
-                # retrieve the various fields from the tokens
-                gene_name_id = tokens[1] # == translation['gene_name-id']
-                havana_gene_name_id = tokens[2] # == translation['Havana-gene_name-id']
-                havana_translation_id = tokens[3] # == translation['Havana-translation-id']
-                translation_name = tokens[4] # == translation['translation-name']
-                gene_name = tokens[5] # == translation['gene-name']
-                nucleotide_sequence_length = tokens[6]
+                # retrieve the sequence
+                matching_transcript['coding-sequence'] = sequence[cds_range[0]:cds_range[1]]
                 
-                # perform checks that we are considering the correct sequence
-                if transcription_id == tokens[0] \
-                    and gene_name_id == translation['gene_name-id'] \
-                    and havana_gene_name_id == translation['Havana-gene_name-id'] \
-                    and havana_translation_id == translation['Havana-translation-id'] \
-                    and translation_name == translation['translation-name'] \
-                    and gene_name == translation['gene-name']:
+                # check if it can be correctly translated to the already found translation
+                translation_check = translate(matching_transcript['coding-sequence'])
+                if not(translation_check == translation['sequence']+'*'):
+                    #translation may contain a Selenocysteine (DNA:'TGA', RNA:'UGA') or a Pyrrolysine (DNA:'TAG', RNA:'UAG')
+                    U_pos = retrieveAllCharacterPositionsFromString(translation['sequence'], 'U')
+                    O_pos = retrieveAllCharacterPositionsFromString(translation['sequence'], 'O')
+                    Stop_pos = retrieveAllCharacterPositionsFromString(translation_check, '*')
                     
-                    utr5=None
-                    utr3=None
-                    CDS=None
+                    if  len(Stop_pos) < 1:
+                        raise TranscriptionNotEncodingForTranslation("No stop codons present in the transcript '"+transcription_id+"'")
                     
-                    for token in tokens[7:]:
-                        if token.startswith('UTR3'):utr3=token
-                        if token.startswith('CDS'):CDS=token
-                        if token.startswith('UTR5'): utr5 = token
-                            
-                    if(utr3 is None):
-                        _log.error("Non-fatal error: no UTR3 found for transcript '"+transcription_id+"'")
-                    if(utr5 is None):
-                        _log.error("Non-fatal error: no UTR5 found for transcript '"+transcription_id+"'")
-                    if(CDS is None):
-                        raise TranscriptionNotContainingCDS("No CDS found in transcript '"+transcription_id+"'")
+                    if len(Stop_pos) < (len(U_pos)+len(O_pos)):
+                        raise TranscriptionNotEncodingForTranslation("When translating the transcript '"+transcription_id+"' the translation did not match the nucleotide translation from BioPython")
                     
-                    sequence = lines[i+1]
-                    if sequence.endswith('\n'):
-                        sequence = sequence[:len(sequence)-1]
-                
-                    # append transcript elements to the object
-                    matching_transcript['sequence'] = sequence
-                    matching_transcript['sequence_length'] = nucleotide_sequence_length
-                    matching_transcript['UTR5'] = utr5
-                    matching_transcript['UTR3'] = utr3
-                    matching_transcript['CDS'] = CDS
+                    # filter out the U and O positions from the measured stop positions
+                    true_stop_codons = [pos for pos in Stop_pos if not(pos in U_pos) and not(pos in O_pos)]
                     
-                    # check if the CDS is properly formatted
-                    if CDS.startswith('CDS:'):
-                        # retrieve the ranges of the Coding DNA Sequence
-                        cds_range = [int(a) for a in CDS[4:].split('-')]
-                        
-                        # correct the first number for index mismatch
-                        cds_range[0] = cds_range[0]-1
-                        
-                        # retrieve the sequence
-                        matching_transcript['coding-sequence'] = sequence[cds_range[0]:cds_range[1]]
-                        
-                        # check if it can be correctly translated to the already found translation
-                        translation_check = translate(matching_transcript['coding-sequence'])
-                        if not(translation_check == translation['sequence']+'*'):
-                            #translation may contain a Selenocysteine (DNA:'TGA', RNA:'UGA') or a Pyrrolysine (DNA:'TAG', RNA:'UAG')
-                            U_pos = retrieveAllCharacterPositionsFromString(translation['sequence'], 'U')
-                            O_pos = retrieveAllCharacterPositionsFromString(translation['sequence'], 'O')
-                            Stop_pos = retrieveAllCharacterPositionsFromString(translation_check, '*')
-                            
-                            if  len(Stop_pos) < 1:
-                                raise TranscriptionNotEncodingForTranslation("No stop codons present in the transcript '"+transcription_id+"'")
-                            
-                            if len(Stop_pos) < (len(U_pos)+len(O_pos)):
-                                raise TranscriptionNotEncodingForTranslation("When translating the transcript '"+transcription_id+"' the translation did not match the nucleotide translation from BioPython")
-                            
-                            # filter out the U and O positions from the measured stop positions
-                            true_stop_codons = [pos for pos in Stop_pos if not(pos in U_pos) and not(pos in O_pos)]
-                            
-                            if len(true_stop_codons) > 1:
-                                raise TranscriptionNotEncodingForTranslation("After filtering out Selenocysteine and Pyrrolysine from the sequence, there were still other stop codons present before the final stop codon for the transcript '"+transcription_id+"'")
-                            if len(true_stop_codons) < 1:
-                                raise TranscriptionNotEncodingForTranslation("After filtering out Selenocysteine and Pyrrolysine from the sequence, there were No stop codons left for the transcript '"+transcription_id+"'")
-                            
-                            if len(U_pos) > 0 and len(O_pos) > 0:
-                                # sequence contains both a Selenocysteine and a Pyrrolysine according to translation
-                                _log.info("Both a Selenocysteine and a Pyrrolysine present in transcript '"+transcription_id+"'")
-                            elif len(U_pos) > 0:
-                                # sequence contains a Selenocysteine
-                                _log.info("A Selenocysteine is present in transcript '"+transcription_id+"'")
-                            elif len(O_pos) > 0:
-                                # sequence contains a Pyrrolysine
-                                _log.info("A Pyrrolysine is present in transcript '"+transcription_id+"'")                                                                
-                    else:
-                        raise MissMatchTranscriptIDToMatchingTranscript("Transcription ID "+transcription_id+" passed checks, but its CDS did not start with 'CDS:'")
+                    if len(true_stop_codons) > 1:
+                        raise TranscriptionNotEncodingForTranslation("After filtering out Selenocysteine and Pyrrolysine from the sequence, there were still other stop codons present before the final stop codon for the transcript '"+transcription_id+"'")
+                    if len(true_stop_codons) < 1:
+                        raise TranscriptionNotEncodingForTranslation("After filtering out Selenocysteine and Pyrrolysine from the sequence, there were No stop codons left for the transcript '"+transcription_id+"'")
                     
-                    return matching_transcript
-                else:
-                    raise MissMatchTranscriptIDToMatchingTranscript("A missmatch occurred during transcript evaluation on: "+\
-                    "transcription_id "+str(transcription_id == tokens[0])+\
-                    " gene_name_id "+str(gene_name_id == translation['gene_name-id'])+\
-                    " havana_gene_name_id "+str(havana_gene_name_id == translation['Havana-gene_name-id'])+\
-                    " havana_translation_id "+str(havana_translation_id == translation['Havana-translation-id'])+\
-                    " translation_name "+str(translation_name == translation['translation-name'])+\
-                    " gene_name" +str(gene_name == translation['gene-name']))
-                
-                
+                    if len(U_pos) > 0 and len(O_pos) > 0:
+                        # sequence contains both a Selenocysteine and a Pyrrolysine according to translation
+                        _log.info("Both a Selenocysteine and a Pyrrolysine present in transcript '"+transcription_id+"'")
+                    elif len(U_pos) > 0:
+                        # sequence contains a Selenocysteine
+                        _log.info("A Selenocysteine is present in transcript '"+transcription_id+"'")
+                    elif len(O_pos) > 0:
+                        # sequence contains a Pyrrolysine
+                        _log.info("A Pyrrolysine is present in transcript '"+transcription_id+"'")                                                                
+            else:
+                raise MissMatchTranscriptIDToMatchingTranscript("Transcription ID "+transcription_id+" passed checks, but its CDS did not start with 'CDS:'")
+            
+            return matching_transcript
+        else:
+            raise MissMatchTranscriptIDToMatchingTranscript("A missmatch occurred during transcript evaluation on: "+\
+            "transcription_id "+str(transcription_id == tokens[0])+\
+            " gene_name_id "+str(gene_name_id == translation['gene_name-id'])+\
+            " havana_gene_name_id "+str(havana_gene_name_id == translation['Havana-gene_name-id'])+\
+            " havana_translation_id "+str(havana_translation_id == translation['Havana-translation-id'])+\
+            " translation_name "+str(translation_name == translation['translation-name'])+\
+            " gene_name" +str(gene_name == translation['gene-name']))
+        
+        
     return matching_transcript
     
 def retrieveCodingGenomicLocations_gencode(transcription):    
-    transcription_records = []
-    # Extract records that have the specific transcription id from the Gencode database 
-    for record in gff3.parseGFF3(GENCODE_HG_ANNOTATION_FILE_GFF3, transcription['transcription-id']):
-        transcription_records.append(record)
-        
-    _log.debug('Found'+str(len(transcription_records))+' records in the GFF file')
-    
-    # retrieve the Coding Domain Sequences
-    CDS = [record for record in transcription_records if record.type=='CDS']
+    # retrieve the Coding Domain Sequences of the specific transcription id via the index of the Gencode database 
+    CDS = retrieve_CDS_index().retrieve_records(transcription['transcription-id'])
     
     _log.debug('Found'+str(len(CDS))+' CDS parts in the GFF file')
     
     return CDS
 
+def retrieve_gencode_basic_offsets():
+    """Retrieves the byte offsets of the lines in the Gencode basic set
+    as {gene_name: [offset, ...]}. The index is built in one pass over the
+    file once per process, also when called from multiple threads"""
+    if not GENCODE_BASIC_FILE in _gencode_basic_offsets:
+        with _gencode_basic_offsets_lock:
+            if not GENCODE_BASIC_FILE in _gencode_basic_offsets:
+                _log.debug("Indexing '"+GENCODE_BASIC_FILE+"'")
+                offsets_per_gene_name = {}
+                with open(GENCODE_BASIC_FILE, 'rb') as infile:
+                    offset = 0
+                    for line in infile:
+                        if not line.startswith(b"#"):
+                            parts = line.split(b"\t")
+                            if len(parts) > 12:
+                                gene_name = urllib.request.unquote(parts[12].decode())
+                                if not gene_name in offsets_per_gene_name:
+                                    offsets_per_gene_name[gene_name] = []
+                                offsets_per_gene_name[gene_name].append(offset)
+                        offset += len(line)
+                _gencode_basic_offsets[GENCODE_BASIC_FILE] = offsets_per_gene_name
+    return _gencode_basic_offsets[GENCODE_BASIC_FILE]
+
+def parseGencodeBasicLine(line):
+    """Parses a line of the Gencode basic set"""
+    parts = line.strip().split("\t")
+    #If this fails, the file format is not standard-compatible
+    assert len(parts) == 16
+    #Normalize data
+    return {
+        "#bin" : None if parts[0] == "" else int(parts[0]),
+        "transcription_id" : None if parts[1] == "" else urllib.request.unquote(parts[1]),
+        "chrom" : None if parts[2] == "" else urllib.request.unquote(parts[2]),
+        "strand" : None if parts[3] == "" else urllib.request.unquote(parts[3]),
+        "txStart" : None if parts[4] == "" else int(parts[4]),
+        "txEnd" : None if parts[5] == "" else int(parts[5]),
+        "cdsStart" : None if parts[6] == "" else int(parts[6]),
+        "cdsEnd" : None if parts[7] == "" else int(parts[7]),
+        "exonCount" : None if parts[8] == "" else int(parts[8]),
+        "exonStarts" : None if parts[9] == "" else urllib.request.unquote(parts[9]),
+        "exonEnds" : None if parts[10] == "" else urllib.request.unquote(parts[10]),
+        "score" : None if parts[11] == "" else int(parts[11]),
+        "gene_name" : None if parts[12] == "" else urllib.request.unquote(parts[12]),
+        "cdsStartStat" : None if parts[13] == "" else urllib.request.unquote(parts[13]),
+        "cdsEndStat" : None if parts[14] == "" else urllib.request.unquote(parts[14]),
+        "exonFrames" : None if parts[15] == "" else urllib.request.unquote(parts[15]),
+    }
+
+def retrieveMRNAValidatedTranslationsForGenes_gencode(gene_names):
+    """Retrieve the gencode basic translations for multiple gene names as
+    {gene_name: [gencode_basic_translation, ...]}, see 
+    retrieveMRNAValidatedTranslations_gencode"""
+    offsets_per_gene_name = retrieve_gencode_basic_offsets()
+    
+    translations_per_gene_name = {}
+    with open(GENCODE_BASIC_FILE, 'rb') as infile:
+        for gene_name in gene_names:
+            translations_per_gene_name[gene_name] = []
+            for offset in offsets_per_gene_name.get(gene_name, []):
+                infile.seek(offset)
+                translations_per_gene_name[gene_name].append(parseGencodeBasicLine(infile.readline().decode()))
+    
+    return translations_per_gene_name
+
 def retrieveMRNAValidatedTranslations_gencode(gene_name):
     """Retrieve the gencode basic translations for a given gene_name based on the gene_name name.
     Gencode basic set is validated on the mRNA level.
@@ -281,35 +354,10 @@ def retrieveMRNAValidatedTranslations_gencode(gene_name):
     
     _log.info("Starting search for mRNA validated matching translations")
     
-    with open(GENCODE_BASIC_FILE) as infile:
-        for line in infile:
-            if line.startswith("#"): continue
-            # Check if the string of the gene_name we are trying to find occurs in the line
-            if gene_name in line:
-                parts = line.strip().split("\t")
-                #If this fails, the file format is not standard-compatible
-                assert len(parts) == 16
-                #Normalize data
-                gencode_basic_translation = {
-                    "#bin" : None if parts[0] == "" else int(parts[0]),
-                    "transcription_id" : None if parts[1] == "" else urllib.request.unquote(parts[1]),
-                    "chrom" : None if parts[2] == "" else urllib.request.unquote(parts[2]),
-                    "strand" : None if parts[3] == "" else urllib.request.unquote(parts[3]),
-                    "txStart" : None if parts[4] == "" else int(parts[4]),
-                    "txEnd" : None if parts[5] == "" else int(parts[5]),
-                    "cdsStart" : None if parts[6] == "" else int(parts[6]),
-                    "cdsEnd" : None if parts[7] == "" else int(parts[7]),
-                    "exonCount" : None if parts[8] == "" else int(parts[8]),
-                    "exonStarts" : None if parts[9] == "" else urllib.request.unquote(parts[9]),
-                    "exonEnds" : None if parts[10] == "" else urllib.request.unquote(parts[10]),
-                    "score" : None if parts[11] == "" else int(parts[11]),
-                    "gene_name" : None if parts[12] == "" else urllib.request.unquote(parts[12]),
-                    "cdsStartStat" : None if parts[13] == "" else urllib.request.unquote(parts[13]),
-                    "cdsEndStat" : None if parts[14] == "" else urllib.request.unquote(parts[14]),
-                    "exonFrames" : None if parts[15] == "" else urllib.request.unquote(parts[15]),
-                }
-                #yoeld the record
-                yield gencode_basic_translation    
+    # only the translations of exactly this gene name (name2)
+    for gencode_basic_translation in retrieveMRNAValidatedTranslationsForGenes_gencode([gene_name])[gene_name]:
+        #yield the record
+        yield gencode_basic_translation
 
 def retrieveGeneTranslations_gencode(gene_name):
     """Retrieve the gencode translations for a given gene_name based on the gene_name name.
@@ -324,95 +372,58 @@ def retrieveGeneTranslations_gencode(gene_name):
     _log.info("Starting search for matching translations")
     # Look up the best matching translation
     matching_translations = []
-    with open(GENCODE_HG_TRANSLATION_FILE) as hg_translation:
-        # read the lines in the file
-        lines = hg_translation.readlines()
-        for i in range(len(lines)):
-            # retrieve current line
-            line = lines[i]
-            
-            # check if the line is a fasta header, otherwise skip it
-            if line.startswith('>'):
-                # Check if the string of the gene_name we are trying to find occurs in the line
-                if gene_name in line:
-                    ## Parse the Line
-                    # Remove the fasta header syntax
-                    line = line[1:]
-                    if line.endswith('\n'):
-                        # remove newline statement
-                        line = line[:len(line)-1]
-                    
-                    tokens = line.split('|')
-                    
-                    # Only add the translation to the translation list if the gene_name exactly matches the one we are looking for
-                    if gene_name == tokens[5]:
-                        sequence = lines[i+1]
-                        if sequence.endswith('\n'):
-                            sequence = sequence[:len(sequence)-1]
-                        
-                        translation = {'transcription-id': tokens[0],
-                                      'gene_name-id': tokens[1],
-                                      'Havana-gene_name-id': tokens[2],
-                                      'Havana-translation-id': tokens[3],
-                                      'translation-name':tokens[4],
-                                      'gene-name':tokens[5],
-                                      'sequence-length':int(tokens[6]),
-                                      'sequence':sequence}
-                        
-                        matching_translations.append(translation)
+    # retrieve the fasta headers of the gene_name via the index
+    for line, sequence in retrieve_translation_header_index().retrieve_entries(gene_name):
+        ## Parse the Line
+        # Remove the fasta header syntax
+        line = line[1:]
+        
+        tokens = line.split('|')
+        
+        translation = {'transcription-id': tokens[0],
+                      'gene_name-id': tokens[1],
+                      'Havana-gene_name-id': tokens[2],
+                      'Havana-translation-id': tokens[3],
+                      'translation-name':tokens[4],
+                      'gene-name':tokens[5],
+                      'sequence-length':int(tokens[6]),
+                      'sequence':sequence}
+        
+        matching_translations.append(translation)
                         
     return matching_translations
 
 def retrieve_all_protein_coding_gene_names():
     """Retrieves the protein-coding gene names for the Gencode dataset"""
-    gene_names = set()
-    with open(GENCODE_HG_TRANSLATION_FILE) as hg_translation:
-        # read the lines in the file
-        lines = hg_translation.readlines()
-        for i in range(len(lines)):
-            # retrieve current line
-            line = lines[i]
-            
-            # check if the line is a fasta header, otherwise skip it
-            if not line.startswith('>'):
-                continue
-            
-            tokens = line.strip().split('|')
-            
-            if len(tokens) > 0:
-                # add the gene name to the set
-                gene_names.add(tokens[5])
-                
-    return list(gene_names)
+    # the gene names are the keys of the header index
+    return list(retrieve_translation_header_index().keys())
+
+def retrieve_refseq_identifiers_for_transcripts(gencode_ids):
+    """Retrieves the refseq identifiers for multiple Gencode transcripts as {gencode_id: {'NP': [...], 'NM': [...], 'NR': [...]}}"""
+    results = {}
+    refseq_rows = retrieve_metadata_rows(GENCODE_REFSEQ_FILE)
+    for gencode_id in gencode_ids:
+        result = {}
+        result['NP'] = []
+        result['NM'] = []
+        result['NR'] = []
+        for tokens in refseq_rows.get(gencode_id, []):
+            # add the results
+            for token in tokens[1:]:
+                token = token.strip()
+                if token.startswith('NP'):
+                    result['NP'].append(token)
+                elif token.startswith('NM'):
+                    result['NM'].append(token)
+                elif token.startswith('NR'):
+                    result['NR'].append(token)
+                elif len(token) == 0:
+                    continue
+                else:
+                    _log.warning("When retrieving matching RefSeq ids for "+gencode_id+" unexpected token: "+token)
+        results[gencode_id] = result
+    return results
 
 def retrieve_refseq_identifiers_for_transcript(gencode_id):
     """Retrieves the refseq identifiers for a Gencode transcript"""
-    result = {}
-    result['NP'] = []
-    result['NM'] = []
-    result['NR'] = []
-    with open(GENCODE_REFSEQ_FILE) as gencode_refseq:
-        # read the lines in the file
-        lines = gencode_refseq.readlines()
-        for line in lines:
-            # check if the unique identifier is on the current line
-            if gencode_id in line:
-                #Add the result to hits
-                tokens = line.split('\t')
-                
-                # Only add the translation to the translation list if the gene_name exactly matches the one we are looking for
-                if gencode_id == tokens[0]:
-                    # add the results
-                    for token in tokens[1:]:
-                        token = token.strip()
-                        if token.startswith('NP'):
-                            result['NP'].append(token)
-                        elif token.startswith('NM'):
-                            result['NM'].append(token)
-                        elif token.startswith('NR'):
-                            result['NR'].append(token)
-                        elif len(token) == 0:
-                            continue
-                        else:
-                            _log.warning("When retrieving matching RefSeq ids for "+gencode_id+" unexpected token: "+token)    
-    return result
\ No newline at end of file
+    return retrieve_refseq_identifiers_for_transcripts([gencode_id])[gencode_id]
@@ -1,37 +1,167 @@
 import logging
 from metadome.default_settings import PFAM_HMM_DAT, HMMFETCH_EXECUTABLE, PFAM_HMM,\
     HMMALIGN_EXECUTABLE, HMMEMIT_EXECUTABLE, HMMSTAT_EXECUTABLE,\
-    HMMLOGO_EXECUTABLE, PFAM_ALIGNMENT_DIR
+    HMMLOGO_EXECUTABLE, PFAM_ALIGNMENT_DIR, PFAM_HMM_CACHE_DIR
 from metadome.domain.parsers.fasta import unwrap_fasta_alignment
+from metadome.domain.services.file_storage import compute_file_status_checksum,\
+    atomic_replace, atomic_write
 from builtins import FileNotFoundError
+from contextlib import contextmanager
 import os
 import tempfile
 import gzip
 import subprocess
 import re
 import errno
+import json
+import threading
 
 _log = logging.getLogger(__name__)
 
+# the Pfam IDs per accession code (without version) of the PFAM HMM metadata, loaded once per process
+_pfam_ids_per_ac = {}
+_pfam_ids_per_ac_lock = threading.Lock()
+
 class FoundNoPfamHMMException(Exception):
     pass
 
 class FoundMoreThanOnePfamHMMException(Exception):
     pass
 
+def retrieve_PFAM_IDs_per_AC():
+    """Retrieves the PFAM IDs and Accession Codes from the PFAM HMM metadata
+    file as {AC without version: [(ID, AC), ...]}, the file is read once
+    per process"""
+    if not PFAM_HMM_DAT in _pfam_ids_per_ac:
+        with _pfam_ids_per_ac_lock:
+            if not PFAM_HMM_DAT in _pfam_ids_per_ac:
+                pfam_ids_per_ac = {}
+                openFunc = gzip.open if PFAM_HMM_DAT.endswith(".gz") else open
+                with openFunc(PFAM_HMM_DAT) as infile:
+                    previous_line = ""
+                    for line in infile:
+                        line = line.decode()
+                        if line.startswith("#=GF AC   "):
+                            # the ID precedes the AC
+                            AC = line[10:].split('\n')[0]
+                            ID = previous_line[10:].split('\n')[0]
+                            if not AC.split('.')[0] in pfam_ids_per_ac:
+                                pfam_ids_per_ac[AC.split('.')[0]] = []
+                            pfam_ids_per_ac[AC.split('.')[0]].append((ID, AC))
+                        previous_line = line
+                _pfam_ids_per_ac[PFAM_HMM_DAT] = pfam_ids_per_ac
+    return _pfam_ids_per_ac[PFAM_HMM_DAT]
+
 def retrieve_PFAM_ID_by_AC(pfam_ac):
     """Retrieves the PFAM ID w.r.t. the provided PFAM Accession Code
     The PFAM ID is retrieved from the PFAM HMM metadata file, thus
     ensuring a HMM seed is present for the provided AC"""
-    openFunc = gzip.open if PFAM_HMM_DAT.endswith(".gz") else open
-    with openFunc(PFAM_HMM_DAT) as infile:
-        lines = infile.readlines()
-        for line_index in range(len(lines)):
-            line = lines[line_index].decode()
-            if line.startswith("#=GF AC   "+pfam_ac):
-                AC = line[10:].split('\n')[0]
-                ID =  lines[line_index-1].decode()[10:].split('\n')[0]
-                yield ID, AC
+    for ID, AC in retrieve_PFAM_IDs_per_AC().get(pfam_ac.split('.')[0], []):
+        if AC.startswith(pfam_ac):
+            yield ID, AC
+
+def retrieve_single_PFAM_ID_by_AC(pfam_ac):
+    """Retrieves the PFAM ID w.r.t. the provided PFAM Accession Code and
+    raises an exception if there is not exactly one"""
+    # check if there is an ID associated with the provided accession code
+    pfam_ids = [pfam_id for pfam_id, _ in retrieve_PFAM_ID_by_AC(pfam_ac)]
+    
+    if len(pfam_ids) > 1:
+        raise FoundMoreThanOnePfamHMMException("Found more than one Pfam ids that match the Pfam ac '"+pfam_ac+"' when searching for matching HMMER HMM's")
+    if len(pfam_ids) == 0:
+        raise FoundNoPfamHMMException("Found no matching Pfam ids that for Pfam ac '"+pfam_ac+"' when searching for matching HMMER HMM's")
+    
+    return pfam_ids[0]
+
+def compute_PFAM_HMM_checksum():
+    """Computes a checksum over the path, size and modification time of the
+    PFAM HMM (metadata) files, identifying the version of the cached results"""
+    return compute_file_status_checksum([PFAM_HMM, PFAM_HMM_DAT])
+
+def remove_previous_PFAM_cache_versions(cache_file):
+    """Removes the versions of the cache file for previous versions of the
+    PFAM HMM files"""
+    cache_dir, cache_filename = os.path.split(cache_file)
+    prefix = cache_filename.split('_')[0]+'_'
+    for filename in os.listdir(cache_dir):
+        if filename.startswith(prefix) and not filename.endswith('.tmp') and filename != cache_filename:
+            os.remove(os.path.join(cache_dir, filename))
+
+@contextmanager
+def fetch_PFAM_HMM(pfam_ac):
+    """Provides the filename of the HMM for the pfam accession code, as 
+    fetched from the PFAM HMM file. If PFAM_HMM_CACHE_DIR exists the HMM is
+    fetched once and kept as PFAM_HMM_CACHE_DIR+<pfam_ac>+'/hmm_'+<checksum>+'.hmm',
+    otherwise it is fetched to a temporary file that is removed afterwards"""
+    pfam_id = retrieve_single_PFAM_ID_by_AC(pfam_ac)
+    
+    if os.path.isdir(PFAM_HMM_CACHE_DIR):
+        hmm_file = PFAM_HMM_CACHE_DIR+pfam_ac+'/hmm_'+compute_PFAM_HMM_checksum()+'.hmm'
+        if not os.path.isfile(hmm_file):
+            os.makedirs(PFAM_HMM_CACHE_DIR+pfam_ac, exist_ok=True)
+            
+            # a failed fetch never ends up in the cache
+            with atomic_replace(hmm_file) as tmp_hmm_file:
+                fetch_args = [HMMFETCH_EXECUTABLE, "-o", tmp_hmm_file, PFAM_HMM, pfam_id]
+                try:
+                    subprocess.check_call(fetch_args)
+                except subprocess.CalledProcessError as e:
+                    _log.error("Fetching the HMM of '"+pfam_ac+"' failed: {}".format(e))
+                    raise
+            remove_previous_PFAM_cache_versions(hmm_file)
+        yield hmm_file
+    else:
+        # create a temporary HMM file
+        tmp_hmm_file = tempfile.NamedTemporaryFile(suffix=".hmm", delete=False)
+        
+        # fetch the HMM
+        fetch_args = [HMMFETCH_EXECUTABLE, "-o", tmp_hmm_file.name, PFAM_HMM, pfam_id]
+        try:
+            subprocess.check_call(fetch_args)
+        except subprocess.CalledProcessError as e:
+            _log.error("Fetching the HMM of '"+pfam_ac+"' failed: {}".format(e))
+            os.remove(tmp_hmm_file.name)
+            raise
+        try:
+            yield tmp_hmm_file.name
+        finally:
+            # remove the temporary files
+            os.remove(tmp_hmm_file.name)
+
+def retrieve_cached_PFAM_result(pfam_ac, result_name, compute):
+    """Retrieves the (json serializable) result of compute() for the pfam
+    accession code from PFAM_HMM_CACHE_DIR+<pfam_ac>+'/'+<result_name>+'_'+<checksum>+'.json'.
+    If it is not cached it is computed and stored, provided that
+    PFAM_HMM_CACHE_DIR exists."""
+    if not os.path.isdir(PFAM_HMM_CACHE_DIR):
+        return compute()
+    
+    cache_file = PFAM_HMM_CACHE_DIR+pfam_ac+'/'+result_name+'_'+compute_PFAM_HMM_checksum()+'.json'
+    if os.path.isfile(cache_file):
+        with open(cache_file) as f:
+            return json.load(f)
+    
+    result = compute()
+    
+    os.makedirs(PFAM_HMM_CACHE_DIR+pfam_ac, exist_ok=True)
+    with atomic_write(cache_file) as f:
+        json.dump(result, f)
+    remove_previous_PFAM_cache_versions(cache_file)
+    
+    return result
+
+def retrieve_PFAM_consensus_sequence(pfam_ac, hmm_file=None):
+    """Retrieves the consensus identifier and sequence of the HMM for the 
+    pfam accession code, see retrieve_consensus_sequence. The HMM is fetched
+    unless its hmm_file is provided"""
+    def compute():
+        if hmm_file is None:
+            with fetch_PFAM_HMM(pfam_ac) as fetched_hmm_file:
+                return retrieve_consensus_sequence(fetched_hmm_file)
+        return retrieve_consensus_sequence(hmm_file)
+    
+    consensus_identifier, consensus_sequence = retrieve_cached_PFAM_result(pfam_ac, 'consensus', compute)
+    return consensus_identifier, consensus_sequence
 
 def retrieve_PFAM_full_alignment_by_AC(pfam_ac):
     """
@@ -93,27 +223,8 @@ def retrieve_PFAM_full_alignment_by_AC(pfam_ac):
     if not os.path.exists(alignment_file):
         raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), alignment_file)
     
-    # check if there is an ID associated with the provided accession code
-    pfam_hmm_meta_data = retrieve_PFAM_ID_by_AC(pfam_ac)
-    found_ids = 0
-    for pfam_id, _ in pfam_hmm_meta_data:
-        found_ids+=1
-    
-    if found_ids > 1:
-        raise FoundMoreThanOnePfamHMMException("Found more than one Pfam ids that match the Pfam ac '"+pfam_ac+"' when searching for matching HMMER HMM's")
-    if found_ids == 0:
-        raise FoundNoPfamHMMException("Found no matching Pfam ids that for Pfam ac '"+pfam_ac+"' when searching for matching HMMER HMM's")
-    
-    # create a temporary HMM file
-    tmp_hmm_file = tempfile.NamedTemporaryFile(suffix=".hmm", delete=False)
-    
-    # fetch the HMM
-    fetch_args = [HMMFETCH_EXECUTABLE, "-o", tmp_hmm_file.name, PFAM_HMM, pfam_id]
-    try:
-        subprocess.call(fetch_args)
-    except subprocess.CalledProcessError as e:
-        _log.error("{}".format(e.output))
-    consensus_identifier, consensus_sequence = retrieve_consensus_sequence(tmp_hmm_file.name)
+    # retrieve the consensus of the HMM
+    consensus_identifier, consensus_sequence = retrieve_PFAM_consensus_sequence(pfam_ac)
     
     pfam_alignment_output = {'AC':pfam_ac,
                             'alignments':[], 
@@ -160,9 +271,6 @@ def retrieve_PFAM_full_alignment_by_AC(pfam_ac):
     if n_sequences != len(pfam_alignment_output['alignments']):
         _log.error("Number of sequences in full alignment for Pfam "+pfam_ac+" ('"+n_sequences+"') does not match the actual number of sequences '"+len(pfam_alignment_output['alignments'])+"'")
 
-    # remove the temporary files
-    os.remove(tmp_hmm_file.name)
-    
     # return the output
     return pfam_alignment_output
         
@@ -220,32 +328,19 @@ def report_hmm_logo_for_pfam(pfam_ac):
       A, C, D, E, F, G, H, I, K, L, M, N, P, Q, R, S, T, V, W, Y
         relent for the specific amino acid residue at this position
     """
-    # check if there is an ID associated with the provided accession code
-    pfam_hmm_meta_data = retrieve_PFAM_ID_by_AC(pfam_ac)
-    found_ids = 0
-    for pfam_id, _ in pfam_hmm_meta_data:
-        found_ids+=1
-    
-    if found_ids > 1:
-        raise FoundMoreThanOnePfamHMMException("Found more than one Pfam ids that match the Pfam ac '"+pfam_ac+"' when searching for matching HMMER HMM's")
-    if found_ids == 0:
-        raise FoundNoPfamHMMException("Found no matching Pfam ids that for Pfam ac '"+pfam_ac+"' when searching for matching HMMER HMM's")
-    
-    # create a temporary HMM file
-    tmp_hmm_file = tempfile.NamedTemporaryFile(suffix=".hmm", delete=False)
-    
-    # fetch the HMM
-    fetch_args = [HMMFETCH_EXECUTABLE, "-o", tmp_hmm_file.name, PFAM_HMM, pfam_id]
-    try:
-        subprocess.call(fetch_args)
-    except subprocess.CalledProcessError as e:
-        _log.error("{}".format(e.output))
+    def compute():
+        with fetch_PFAM_HMM(pfam_ac) as hmm_file:
+            return report_hmm_logo_for_hmm(hmm_file)
     
+    return retrieve_cached_PFAM_result(pfam_ac, 'hmmlogo', compute)
+
+def report_hmm_logo_for_hmm(hmm_file):
+    """Creates the HMM logo of the HMM file, see report_hmm_logo_for_pfam"""
     # Create temp file for storing the hmm logo
     tmp_hmm_logo_file = tempfile.NamedTemporaryFile(suffix=".hmm_hmmlogo", delete=False)
     
     # use the HMM as a hmmalign using the found HMM model    
-    hmmlogo_args = [HMMLOGO_EXECUTABLE, "--height_relent_all", "--no_indel", tmp_hmm_file.name]
+    hmmlogo_args = [HMMLOGO_EXECUTABLE, "--height_relent_all", "--no_indel", hmm_file]
     try:
         subprocess.call(hmmlogo_args, stdout=tmp_hmm_logo_file)
     except subprocess.CalledProcessError as e:
@@ -290,7 +385,6 @@ def report_hmm_logo_for_pfam(pfam_ac):
         _log.error("{}".format(e.output))
     
     # remove the temporary files
-    os.remove(tmp_hmm_file.name)
     os.remove(tmp_hmm_logo_file.name)
     
     # return the hmmstat
@@ -340,33 +434,19 @@ def report_hmm_stat_for_pfam(pfam_ac):
         can slow the HMMER3 acceleration pipeline, by causing  too  many
         nonhomologous sequences to pass the filters.
     """
-    # check if there is an ID associated with the provided accession code
-    pfam_hmm_meta_data = retrieve_PFAM_ID_by_AC(pfam_ac)
-    found_ids = 0
-    for pfam_id, _ in pfam_hmm_meta_data:
-        found_ids+=1
-    
-    if found_ids > 1:
-        raise FoundMoreThanOnePfamHMMException("Found more than one Pfam ids that match the Pfam ac '"+pfam_ac+"' when searching for matching HMMER HMM's")
-    if found_ids == 0:
-        raise FoundNoPfamHMMException("Found no matching Pfam ids that for Pfam ac '"+pfam_ac+"' when searching for matching HMMER HMM's")
-    
-    # create a temporary HMM file
-    tmp_hmm_file = tempfile.NamedTemporaryFile(suffix=".hmm", delete=False)
-    
-    # fetch the HMM
-    fetch_args = [HMMFETCH_EXECUTABLE, "-o", tmp_hmm_file.name, PFAM_HMM, pfam_id]
-    try:
-        subprocess.call(fetch_args)
-    except subprocess.CalledProcessError as e:
-        _log.error("{}".format(e.output))
-        
+    def compute():
+        with fetch_PFAM_HMM(pfam_ac) as hmm_file:
+            return report_hmm_stat_for_hmm(hmm_file)
     
+    return retrieve_cached_PFAM_result(pfam_ac, 'hmmstat', compute)
+
+def report_hmm_stat_for_hmm(hmm_file):
+    """Creates the hmmstat report of the HMM file, see report_hmm_stat_for_pfam"""
     # Create temp file for storing the statistics
     tmp_hmm_stat_file = tempfile.NamedTemporaryFile(suffix=".hmm_hmmstats", delete=False)
     
     # use the HMM as a hmmalign using the found HMM model    
-    hmmstat_args = [HMMSTAT_EXECUTABLE, tmp_hmm_file.name]
+    hmmstat_args = [HMMSTAT_EXECUTABLE, hmm_file]
     try:
         subprocess.call(hmmstat_args, stdout=tmp_hmm_stat_file)
     except subprocess.CalledProcessError as e:
@@ -401,7 +481,6 @@ def report_hmm_stat_for_pfam(pfam_ac):
         _log.error("{}".format(e.output))
     
     # remove the temporary files
-    os.remove(tmp_hmm_file.name)
     os.remove(tmp_hmm_stat_file.name)
     
     # return the hmmstat
@@ -435,78 +514,58 @@ def create_alignment_of_sequences_according_to_PFAM_HMM(sequences, pfam_ac, targ
                     that the profile considered to be consensus.
     
     """
-    # check if there is an ID associated with the provided accession code
-    pfam_hmm_meta_data = retrieve_PFAM_ID_by_AC(pfam_ac)
-    found_ids = 0
-    for pfam_id, pfam_ac_hmm in pfam_hmm_meta_data:
-        found_ids+=1
-    
-    if found_ids > 1:
-        raise FoundMoreThanOnePfamHMMException("Found more than one Pfam ids that match the Pfam ac '"+pfam_ac+"' when searching for matching HMMER HMM's")
-    if found_ids == 0:
-        raise FoundNoPfamHMMException("Found no matching Pfam ids that for Pfam ac '"+pfam_ac+"' when searching for matching HMMER HMM's")
-    
-    # create _src temporary HMM file
-    tmp_hmm_file = tempfile.NamedTemporaryFile(suffix=".hmm", delete=False)
-    
     # fetch the HMM
-    fetch_args = [HMMFETCH_EXECUTABLE, "-o", tmp_hmm_file.name, PFAM_HMM, pfam_id]
-    try:
-        subprocess.call(fetch_args)
-    except subprocess.CalledProcessError as e:
-        _log.error("{}".format(e.output))
-    
-    # get the consensus sequence
-    consensus_identifier, consensus_sequence = retrieve_consensus_sequence(tmp_hmm_file.name)
-    
-    # create an fasta file from the various sequences
-    with tempfile.NamedTemporaryFile(suffix=".fasta", delete=False) as tmp_sequences_file:
-        tmp_sequences_file.write(('\n'.join(['>'+str(consensus_identifier), consensus_sequence])).encode(encoding='utf_8', errors='strict'))
-        for sequence in sequences:
-            tmp_sequences_file.write(('\n'.join(['>'+str(sequence['uniprot_ac'])+'/'+str(sequence['start'])+'-'+str(sequence['stop']), sequence['sequence']])).encode(encoding='utf_8', errors='strict'))
-    
-    # Create temp file for storing the alignment
-    tmp_hmm_alignment_file = tmp_hmm_file.name+"_alignment"
-    
-    # use the HMM as _src hmmalign using the found HMM model    
-    hmmalign_args = [HMMALIGN_EXECUTABLE, "-o", tmp_hmm_alignment_file, "--outformat", "Pfam", tmp_hmm_file.name, tmp_sequences_file.name]
-    try:
-        subprocess.call(hmmalign_args)
-    except subprocess.CalledProcessError as e:
-        _log.error("{}".format(e.output))
-    
-    try:
-        # retrieve the aligned sequences from the output file
-        if os.path.exists(tmp_hmm_alignment_file):
-            # first create the metadomain dir if it does not yet exist
-            if not os.path.isdir(target_directory):
-                _log.info('Directory '+target_directory+' did not exist yet, creating ...')
-                os.mkdir(target_directory)
+    with fetch_PFAM_HMM(pfam_ac) as hmm_file:
+        # get the consensus sequence
+        consensus_identifier, consensus_sequence = retrieve_PFAM_consensus_sequence(pfam_ac, hmm_file)
+    
+        # create an fasta file from the various sequences
+        with tempfile.NamedTemporaryFile(suffix=".fasta", delete=False) as tmp_sequences_file:
+            tmp_sequences_file.write(('\n'.join(['>'+str(consensus_identifier), consensus_sequence])).encode(encoding='utf_8', errors='strict'))
+            for sequence in sequences:
+                tmp_sequences_file.write(('\n'.join(['>'+str(sequence['uniprot_ac'])+'/'+str(sequence['start'])+'-'+str(sequence['stop']), sequence['sequence']])).encode(encoding='utf_8', errors='strict'))
+    
+        # Create temp file for storing the alignment
+        tmp_hmm_alignment_file = tmp_sequences_file.name+"_alignment"
+    
+        # use the HMM as _src hmmalign using the found HMM model    
+        hmmalign_args = [HMMALIGN_EXECUTABLE, "-o", tmp_hmm_alignment_file, "--outformat", "Pfam", hmm_file, tmp_sequences_file.name]
+        try:
+            subprocess.call(hmmalign_args)
+        except subprocess.CalledProcessError as e:
+            _log.error("{}".format(e.output))
+    
+        try:
+            # retrieve the aligned sequences from the output file
+            if os.path.exists(tmp_hmm_alignment_file):
+                # first create the metadomain dir if it does not yet exist
+                if not os.path.isdir(target_directory):
+                    _log.info('Directory '+target_directory+' did not exist yet, creating ...')
+                    os.mkdir(target_directory)
                 
-            # first create the specific metadomain dir if it does not yet exist
-            if not os.path.isdir(target_directory+pfam_ac):
-                _log.info('Directory '+target_directory+pfam_ac+' did not exist yet, creating ...')
-                os.mkdir(target_directory+pfam_ac)
+                # first create the specific metadomain dir if it does not yet exist
+                if not os.path.isdir(target_directory+pfam_ac):
+                    _log.info('Directory '+target_directory+pfam_ac+' did not exist yet, creating ...')
+                    os.mkdir(target_directory+pfam_ac)
                 
-            with open(tmp_hmm_alignment_file) as _src:
-                with open(target_directory+pfam_ac+'/'+target_file_alignments, 'wt') as _dst:
-                    Pfam_alignments = _src.readlines()
-                    for line in Pfam_alignments:
-                        # write the line
-                        _dst.write(line)
-                        if line.startswith('# STOCKHOLM 1.0'):
-                            # this is just after the start of the file, appending comments
-                            _dst.write('#=GF ID '+consensus_identifier+'\n')
-                            _dst.write('#=GF AC '+pfam_ac+'\n')
-                            _dst.write('#=GF DC This alignment file only contains Pfam domains found in the human species'+'\n')
-                            _dst.write('#=GF CC consensus_sequence:'+consensus_sequence+'\n')
-    except IOError as e:
-        _log.error("{}".format(e.output))
+                with open(tmp_hmm_alignment_file) as _src:
+                    with open(target_directory+pfam_ac+'/'+target_file_alignments, 'wt') as _dst:
+                        Pfam_alignments = _src.readlines()
+                        for line in Pfam_alignments:
+                            # write the line
+                            _dst.write(line)
+                            if line.startswith('# STOCKHOLM 1.0'):
+                                # this is just after the start of the file, appending comments
+                                _dst.write('#=GF ID '+consensus_identifier+'\n')
+                                _dst.write('#=GF AC '+pfam_ac+'\n')
+                                _dst.write('#=GF DC This alignment file only contains Pfam domains found in the human species'+'\n')
+                                _dst.write('#=GF CC consensus_sequence:'+consensus_sequence+'\n')
+        except IOError as e:
+            _log.error("{}".format(e.output))
         
-    # remove the temporary files
-    os.remove(tmp_hmm_file.name)
-    os.remove(tmp_sequences_file.name)
-    os.remove(tmp_hmm_alignment_file)
+        # remove the temporary files
+        os.remove(tmp_sequences_file.name)
+        os.remove(tmp_hmm_alignment_file)
 
 def interpret_hmm_alignment_file(hmm_alignment_file):
     # interpret the alignments made by Pfam's HMM
@@ -1,13 +1,27 @@
 import logging
-from metadome.domain.wrappers.blast import run_blast, interpret_blast_as_uniprot
+import threading
+import hashlib
+from metadome.domain.parsers.fasta import FastaHeaderIndex
+from metadome.domain.wrappers.blast import run_blast, run_blast_batch,\
+    interpret_blast_as_uniprot
 from metadome.domain.wrappers.gencode import retrieveSwissProtIDs,\
     NoSwissProtEntryFoundException
 from metadome.default_settings import UNIPROT_SPROT_CANONICAL,\
     UNIPROT_MAX_BLAST_RESULTS, UNIPROT_SPROT_CANONICAL_AND_ISOFORM,\
-    UNIPROT_SPROT_ISOFORM
+    UNIPROT_SPROT_ISOFORM, UNIPROT_SPROT_SPECIES_FILTER, UNIPROT_INDEX_FILE_SUFFIX
 
 _log = logging.getLogger(__name__)
 
+# the header indices of the UniProt FASTA files on accession code, loaded once per process
+_uniprot_header_indices = {}
+_uniprot_header_indices_lock = threading.Lock()
+
+# the sequences per accession code held in memory, see load_uniprot_sequences
+_uniprot_sequences = {}
+
+# the entries per sequence hash for each (FASTA file, species), see load_uniprot_sequences
+_uniprot_sequence_hashes = {}
+_uniprot_sequence_hashes_lock = threading.Lock()
 
 class NoUniProtACFoundException(Exception):
     pass
@@ -18,8 +32,10 @@ class NoneExistingUniprotDatabaseProvidedException(Exception):
 class MissMatchingSwissProtEntriesFoundException(Exception):
     pass
 
-def retrieveIdenticalUniprotMatch(geneTranslation, uniprot_database="sp", species_filter=None):
-    """Retrieves the top swiss-/Uniprot match for the provided sequence"""
+def retrieveIdenticalUniprotMatch(geneTranslation, uniprot_database="sp", species_filter=None, blast_results=None):
+    """Retrieves the top swiss-/Uniprot match for the provided sequence. The
+    blast output of the sequence may be provided in blast_results, as 
+    returned by blastUniprotSequencesInBatch"""
     # Which database to blast to
     if uniprot_database=="sp":
         _log.debug('Querying the gene translation to Uniprot_Sprot database')
@@ -27,25 +43,35 @@ def retrieveIdenticalUniprotMatch(geneTranslation, uniprot_database="sp", specie
     else:
         raise NoneExistingUniprotDatabaseProvidedException("Possible options are 'sp' for SwissProt and 'tr' for Uniprot_Trembl, provided was '"+str(uniprot_database)+"'")
     
-    # retrieve the results
-    sequence_results = retrieveMatchingUniprotSequences(geneTranslation, blast_db, species_filter)
-    _log.debug("Retrieved '"+str(len(sequence_results))+"' results from blasting to Uniprot")
-    
-    # retrieve the best matching result
+    # first look for identical sequences of the species, which does not require blast
     top_result = None
-    for result in sequence_results:
-        _result_sequence = getUniprotSequence(result['accession_code'], blast_db)
-        if _result_sequence == geneTranslation['sequence']:
-            _log.debug('input and blast result sequences are identical')
+    if not species_filter is None:
+        for result in retrieveIdenticalUniprotEntries(geneTranslation['sequence'], blast_db, species_filter):
+            _log.debug('input sequence is identical to '+result['accession_code'])
             top_result = result
+            top_result_sequence = geneTranslation['sequence']
             break
     
+    if top_result is None:
+        # retrieve the results
+        sequence_results = retrieveMatchingUniprotSequences(geneTranslation, blast_db, species_filter, blast_results)
+        _log.debug("Retrieved '"+str(len(sequence_results))+"' results from blasting to Uniprot")
+        
+        # retrieve the best matching result
+        for result in sequence_results:
+            _result_sequence = getUniprotSequence(result['accession_code'], blast_db)
+            if _result_sequence == geneTranslation['sequence']:
+                _log.debug('input and blast result sequences are identical')
+                top_result = result
+                top_result_sequence = _result_sequence
+                break
+    
     if top_result is None:
         raise NoUniProtACFoundException("No identical uniprot sequence found for "+geneTranslation['gene-name']+" after blast search")
     
     # construct the result    
     uniprot_result = {
-        "sequence": getUniprotSequence(top_result['accession_code'], blast_db),
+        "sequence": top_result_sequence,
         "database": "swissprot" if top_result['database_id']=='sp' else "uniprot_trembl",
         "uniprot_name": top_result['entry_name'],
         "uniprot_ac": top_result['accession_code'],
@@ -55,34 +81,120 @@ def retrieveIdenticalUniprotMatch(geneTranslation, uniprot_database="sp", specie
     return uniprot_result
     
 
+def blastUniprotSequencesInBatch(geneTranslations, uniprot_database="sp", species_filter=None):
+    """Blasts the sequences of the gene translations that have no identical
+    entry of the species with a single blastp process. Returns the blast 
+    output per sequence as {sequence: [blast output line, ...]}, to be
+    provided to retrieveIdenticalUniprotMatch"""
+    if uniprot_database=="sp":
+        blast_db=UNIPROT_SPROT_CANONICAL_AND_ISOFORM
+    else:
+        raise NoneExistingUniprotDatabaseProvidedException("Possible options are 'sp' for SwissProt and 'tr' for Uniprot_Trembl, provided was '"+str(uniprot_database)+"'")
+    
+    # only blast the unique sequences that can not be matched otherwise
+    sequences = []
+    for geneTranslation in geneTranslations:
+        if geneTranslation['sequence'] in sequences: continue
+        if not species_filter is None and len(retrieveIdenticalUniprotEntries(geneTranslation['sequence'], blast_db, species_filter)) > 0: continue
+        sequences.append(geneTranslation['sequence'])
+    
+    _log.info("Blasting '"+str(len(sequences))+"' sequences in batch to Uniprot")
+    return dict(zip(sequences, run_blast_batch(sequences, blastdb=blast_db, max_target_seqs=UNIPROT_MAX_BLAST_RESULTS)))
+
+def retrieve_uniprot_header_index(blast_db=UNIPROT_SPROT_CANONICAL_AND_ISOFORM):
+    """Retrieves the header index of the UniProt FASTA file on accession code,
+    the index is persisted next to the FASTA file"""
+    if not blast_db in _uniprot_header_indices:
+        with _uniprot_header_indices_lock:
+            if not blast_db in _uniprot_header_indices:
+                # headers are formatted as '>sp|P12345|ENTRY_HUMAN description'
+                _uniprot_header_indices[blast_db] = FastaHeaderIndex.initializeFromFile(blast_db, blast_db+UNIPROT_INDEX_FILE_SUFFIX,
+                                                                                        lambda header: header.split('|')[1:2])
+    return _uniprot_header_indices[blast_db]
+
+def compute_sequence_hash(sequence):
+    """Computes the hash of a sequence as used in the sequence hash index"""
+    return hashlib.md5(sequence.encode()).hexdigest()
+
+def load_uniprot_sequences(blast_db=UNIPROT_SPROT_CANONICAL_AND_ISOFORM, species_filter=UNIPROT_SPROT_SPECIES_FILTER):
+    """Reads the sequences of the entries of the species in the UniProt FASTA
+    file in one pass and holds them in memory, so getUniprotSequence does
+    not need to access the file for these entries. The entries are also
+    indexed on the hash of their sequence, see retrieveIdenticalUniprotEntries"""
+    sequences = {}
+    entries_per_hash = {}
+
+    def add_entry(entry, sequence_lines):
+        if entry is None or entry['accession_code'] in sequences: return
+        sequence = ''.join(sequence_lines)
+        sequences[entry['accession_code']] = sequence
+        sequence_hash = compute_sequence_hash(sequence)
+        if not sequence_hash in entries_per_hash:
+            entries_per_hash[sequence_hash] = []
+        entries_per_hash[sequence_hash].append(entry)
+
+    with open(blast_db) as fasta_file:
+        entry = None
+        sequence_lines = []
+        for line in fasta_file:
+            if line.startswith('>'):
+                add_entry(entry, sequence_lines)
+                sseqid = line[1:].split(' ')[0].strip()
+                tokens = sseqid.split('|')
+                # only keep the entries of the species
+                if len(tokens) > 2 and tokens[2].split('_')[-1] == species_filter:
+                    entry = {'database_id': tokens[0], 'accession_code': tokens[1], 'entry_name': tokens[2], 'sseqid': sseqid}
+                else:
+                    entry = None
+                sequence_lines = []
+            elif not entry is None:
+                sequence_lines.append(line.strip())
+        add_entry(entry, sequence_lines)
+
+    if not blast_db in _uniprot_sequences:
+        _uniprot_sequences[blast_db] = {}
+    _uniprot_sequences[blast_db].update(sequences)
+    _uniprot_sequence_hashes[(blast_db, species_filter)] = entries_per_hash
+    _log.info("Loaded '"+str(len(sequences))+"' "+str(species_filter)+" sequences of '"+blast_db+"' in memory")
+
+def retrieveIdenticalUniprotEntries(sequence, blast_db=UNIPROT_SPROT_CANONICAL_AND_ISOFORM, species_filter=UNIPROT_SPROT_SPECIES_FILTER):
+    """Retrieves the entries of the species with exactly this sequence in
+    file order, as dictionaries with keys: database_id, accession_code,
+    entry_name, sseqid. The sequences are loaded once per process"""
+    if not (blast_db, species_filter) in _uniprot_sequence_hashes:
+        with _uniprot_sequence_hashes_lock:
+            if not (blast_db, species_filter) in _uniprot_sequence_hashes:
+                load_uniprot_sequences(blast_db, species_filter)
+
+    # compare the sequences as well, in case of a hash collision
+    return [entry for entry in _uniprot_sequence_hashes[(blast_db, species_filter)].get(compute_sequence_hash(sequence), [])
+            if _uniprot_sequences[blast_db][entry['accession_code']] == sequence]
+
 def getUniprotSequence(accession_code , blast_db=UNIPROT_SPROT_CANONICAL_AND_ISOFORM):
     if blast_db != UNIPROT_SPROT_CANONICAL_AND_ISOFORM and blast_db != UNIPROT_SPROT_CANONICAL and blast_db != UNIPROT_SPROT_ISOFORM:
         raise NotImplementedError('Only swissprot is supported for now, uniprot needs to be handled by a database structure')
     
-    sequence = ""
-    with open(blast_db) as fasta_file:
-        fasta_lines = fasta_file.read().splitlines()
-        n_total_lines = len(fasta_lines)
-        for i in range(n_total_lines):
-            if not(fasta_lines[i].startswith('>')):continue
-            if accession_code in fasta_lines[i]:
-                for j in range(i+1, n_total_lines):
-                    if fasta_lines[j].startswith('>'):
-                        return sequence
-                    if j < n_total_lines:
-                        sequence = sequence+fasta_lines[j]
-                    else:
-                        return sequence
-                
-    return sequence    
-
-def retrieveMatchingUniprotSequences(geneTranslation, blast_db=UNIPROT_SPROT_CANONICAL_AND_ISOFORM, species_filter=None):
+    # first check the sequences held in memory
+    if blast_db in _uniprot_sequences and accession_code in _uniprot_sequences[blast_db]:
+        return _uniprot_sequences[blast_db][accession_code]
+    
+    # retrieve the (first) entry with exactly this accession code
+    for _header, sequence in retrieve_uniprot_header_index(blast_db).retrieve_entries(accession_code):
+        return sequence
+    
+    return ""
+
+def retrieveMatchingUniprotSequences(geneTranslation, blast_db=UNIPROT_SPROT_CANONICAL_AND_ISOFORM, species_filter=None, blast_results=None):
     """Blasts the translated gene sequence to the uniprot/swissprot fasta database and returns 
      the blast results as a list of dictionaries with keys: database_id, accession_code,
      entry_name, qseqid, sseqid, pident, length, mismatch, gapopen, qstart, qend, sstart,
      send, evalue, bitscore"""
     sequence_results = []
-    blast_results = run_blast(sequence=geneTranslation['sequence'], blastdb=blast_db, max_target_seqs=UNIPROT_MAX_BLAST_RESULTS)
+    if not blast_results is None and geneTranslation['sequence'] in blast_results:
+        # already blasted in batch
+        blast_results = blast_results[geneTranslation['sequence']]
+    else:
+        blast_results = run_blast(sequence=geneTranslation['sequence'], blastdb=blast_db, max_target_seqs=UNIPROT_MAX_BLAST_RESULTS)
     
     if not len(blast_results) == 0 :
         sequence_results = [interpret_blast_as_uniprot(blast_result) for blast_result in blast_results]
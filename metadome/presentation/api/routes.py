@@ -14,7 +14,7 @@ import json
 from metadome.controllers.job import (create_visualization_job_if_needed,
                                       get_visualization_status,
                                       retrieve_visualization)
-from metadome.domain.wrappers.gencode import retrieve_refseq_identifiers_for_transcript
+from metadome.domain.wrappers.gencode import retrieve_refseq_identifiers_for_transcripts
 
 
 _log = logging.getLogger(__name__)
@@ -38,10 +38,12 @@ def get_transcript_ids_for_gene(gene_name):
     else:
         message = "No transcripts available in database for gene '"+gene_name+"'"
 
+    # retrieve matching refseq identifiers for all transcripts
+    refseq_ids_per_transcript = retrieve_refseq_identifiers_for_transcripts([t.gencode_transcription_id for t in trancripts])
+
     transcript_results = []
     for t in trancripts:
-        # retrieve matching refseq identifiers for this transcript 
-        refseq_ids = retrieve_refseq_identifiers_for_transcript(t.gencode_transcription_id)
+        refseq_ids = refseq_ids_per_transcript[t.gencode_transcription_id]
         refseq_nm_numbers = ", ".join(nm_number for nm_number in refseq_ids['NM'])
         
         transcript_entry = {}
@@ -3,8 +3,11 @@ from metadome.domain.models.entities.gene_region import GeneRegion
 from metadome.domain.models.entities.single_nucleotide_variant import SingleNucleotideVariant
 from metadome.domain.models.entities.meta_domain import MetaDomain,\
     UnsupportedMetaDomainIdentifier
+from metadome.domain.services.meta_domain_cache import retrieve_metadomain
 from metadome.domain.services.computation.gene_region_computations import compute_tolerance_landscape
 from metadome.domain.services.annotation.gene_region_annotators import annotateTranscriptWithClinvarData
+from metadome.domain.services.annotation.annotation_cache import retrieve_cached_transcript_annotation
+from metadome.domain.services.helper_functions import IntervalIndex
 from metadome.domain.services.annotation.annotation import annotateSNVs,\
     convertNucleotide
 from metadome.controllers.job import store_error, store_visualization
@@ -134,7 +137,7 @@ def retrieve_metadomain_annotation(transcript_id, protein_position, domain_posit
         alignment_depth = 0
         
         # retrieve the metadomain
-        meta_domain = MetaDomain.initializeFromDomainID(domain_id)
+        meta_domain = retrieve_metadomain(domain_id)
         
         # retrieve the codon
         current_codon = meta_domain.get_codon_for_transcript_and_position(transcript_id, protein_position)
@@ -230,7 +233,7 @@ def analyse_transcript(transcript_id):
                 try:
                     if not pfam_domain['ID'] in meta_domains.keys():
                         # construct a meta-domain if possible
-                        temp_meta_domain = MetaDomain.initializeFromDomainID(domain.ext_db_id)
+                        temp_meta_domain = retrieve_metadomain(domain.ext_db_id)
 
                         # Ensure there are enough instances to actually perform the metadomain trick
                         if temp_meta_domain.n_instances < 2:
@@ -251,11 +254,12 @@ def analyse_transcript(transcript_id):
                 Pfam_domains.append(pfam_domain)
 
         # Annotate the clinvar variants for the current gene
-        ClinVar_annotation = annotateSNVs(annotateTranscriptWithClinvarData,
-                                         mappings_per_chr_pos=gene_region.retrieve_mappings_per_chromosome(),
-                                         strand=gene_region.strand,
-                                         chromosome=gene_region.chr,
-                                         regions=gene_region.regions)
+        ClinVar_annotation = retrieve_cached_transcript_annotation(transcript_id, 'ClinVar',
+                                                                   lambda: annotateSNVs(annotateTranscriptWithClinvarData,
+                                                                                        mappings_per_chr_pos=gene_region.retrieve_mappings_per_chromosome(),
+                                                                                        strand=gene_region.strand,
+                                                                                        chromosome=gene_region.chr,
+                                                                                        regions=gene_region.regions))
 
         # retrieve the mappings per chromosome position
         _mappings_per_chromosome = gene_region.retrieve_mappings_per_chromosome()
@@ -273,6 +277,9 @@ def analyse_transcript(transcript_id):
                 variant_entry = SingleNucleotideVariant.initializeFromVariant(_codon=codon, _chr_position=chrom_pos, _alt_nucleotide=variant['ALT'], _variant_source='ClinVar').toClinVarJson(ClinVar_id=variant['ID'])
                 region_positional_annotation[protein_pos]['ClinVar'].append(variant_entry)
 
+        # index the Pfam domains on their (inclusive) protein positions
+        Pfam_domain_index = IntervalIndex([(domain["start"], domain["stop"], domain) for domain in Pfam_domains])
+
         # annotate the positions further
         for d in region_positional_annotation:
             # retrieve the position as is in the database
@@ -283,16 +290,15 @@ def analyse_transcript(transcript_id):
 
             # add domain and meta domain information per position
             d['domains'] = {}
-            for domain in Pfam_domains:
-                if d['protein_pos'] >= domain["start"] and d['protein_pos'] <= domain["stop"]:
-                    # add the domain id for this position
-                    d['domains'][domain['ID']] = None
-                    if not meta_domains[domain['ID']] is None:
-                        # retrieve the context for this protein
-                        consensus_positions = meta_domains[domain['ID']].get_consensus_positions_for_uniprot_position(uniprot_ac=gene_region.uniprot_ac, uniprot_position=db_position)
-
-                        if domain["metadomain"] and len(consensus_positions)>0:
-                            d['domains'][domain['ID']] = create_meta_domain_entry(gene_region, meta_domains[domain['ID']], consensus_positions, db_position)
+            for domain in Pfam_domain_index.retrieve(d['protein_pos']):
+                # add the domain id for this position
+                d['domains'][domain['ID']] = None
+                if not meta_domains[domain['ID']] is None:
+                    # retrieve the context for this protein
+                    consensus_positions = meta_domains[domain['ID']].get_consensus_positions_for_uniprot_position(uniprot_ac=gene_region.uniprot_ac, uniprot_position=db_position)
+
+                    if domain["metadomain"] and len(consensus_positions)>0:
+                        d['domains'][domain['ID']] = create_meta_domain_entry(gene_region, meta_domains[domain['ID']], consensus_positions, db_position)
         result = {"transcript_id":transcript_id, "refseq_ids":refseq_ids['NM'], "protein_ac":gene_region.uniprot_ac, "gene_name":gene_region.gene_name, "positional_annotation":region_positional_annotation, "domains":Pfam_domains}
     else:
         result = {'error': 'No gene region could be build for transcript '+str(transcript_id)}
@@ -0,0 +1,12 @@
+import argparse
+import logging
+
+from metadome.domain.services.meta_domain_creation import migrate_metadomains_to_memory_mapped_format
+
+logging.basicConfig(format='%(levelname)s:%(message)s', level=logging.INFO)
+
+parser = argparse.ArgumentParser(description='Converts the csv files of all meta-domains to the memory-mapped format')
+parser.add_argument('--remove-legacy-files', action='store_true', help='remove the csv files after conversion')
+args = parser.parse_args()
+
+migrate_metadomains_to_memory_mapped_format(remove_legacy_files=args.remove_legacy_files)
@@ -75,6 +75,9 @@ with app.app_context():
     transcript_ids = filter(not_created,
                             [transcript.gencode_transcription_id for transcript in transcripts])
 
+# the visualization jobs populate the per transcript annotation cache
+os.makedirs(settings.TRANSCRIPT_ANNOTATION_CACHE_DIR, exist_ok=True)
+
 _log.debug("submitting visualization jobs")
 results = {transcript_id: create_prebuild_visualization.delay(transcript_id)
            for transcript_id in transcript_ids}
@@ -0,0 +1,29 @@
+import unittest
+from mock import patch
+
+from metadome.domain.data_generation.mapping.Protein2ProteinMapping import createMappingOfAASequenceToAASequence
+
+class TestProtein2ProteinMapping(unittest.TestCase):
+
+    @patch('metadome.domain.data_generation.mapping.Protein2ProteinMapping.clustalw_pairwiseAlignment')
+    def test_identical_sequences_are_not_aligned(self, mock_clustalw_pairwiseAlignment):
+        aligned_mapping = createMappingOfAASequenceToAASequence('MAGW', 'MAGW')
+
+        self.assertEqual(mock_clustalw_pairwiseAlignment.call_count, 0)
+        self.assertEqual(aligned_mapping['primary_sequence'], 'MAGW')
+        self.assertEqual(aligned_mapping['secondary_sequence'], 'MAGW')
+        self.assertEqual(aligned_mapping['mapping'], {0: 0, 1: 1, 2: 2, 3: 3})
+
+    @patch('metadome.domain.data_generation.mapping.Protein2ProteinMapping.clustalw_pairwiseAlignment')
+    def test_other_sequences_are_aligned_with_clustalw(self, mock_clustalw_pairwiseAlignment):
+        mock_clustalw_pairwiseAlignment.return_value = ('MAGW', 'MA-W')
+
+        aligned_mapping = createMappingOfAASequenceToAASequence('MAGW', 'MAW')
+
+        self.assertEqual(mock_clustalw_pairwiseAlignment.call_count, 1)
+        self.assertEqual(aligned_mapping['secondary_sequence'], 'MA-W')
+        self.assertEqual(sorted(aligned_mapping['mapping'].keys()), [0, 1, 3])
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from mock import patch, Mock
+
+from metadome.domain.models.entities.gene_region import ChromosomePositionTable,\
+    GeneRegion
+from metadome.domain.models.gene import Strand
+
+class mock_Mapping(object):
+    strand = Strand.plus
+    chromosome = 'chr1'
+    gene_id = 1
+    protein_id = 1
+    
+    def __init__(self, base_pair, codon, codon_base_pair_position, amino_acid_position,
+                 cDNA_position=None, chromosome_position=None, amino_acid_residue=None):
+        self.id = cDNA_position
+        self.base_pair = base_pair
+        self.codon = codon
+        self.codon_base_pair_position = codon_base_pair_position
+        self.amino_acid_position = amino_acid_position
+        self.cDNA_position = cDNA_position
+        self.chromosome_position = chromosome_position
+        self.amino_acid_residue = amino_acid_residue
+        self.uniprot_residue = amino_acid_residue
+        self.uniprot_position = amino_acid_position
+
+class Test_gene_region(unittest.TestCase):
+
+    def setUp(self):
+        # two codons with descending chromosome positions, spanning an intron
+        self.mappings_per_cDNA = {0: mock_Mapping('A', 'ATG', 0, 0),
+                                  1: mock_Mapping('T', 'ATG', 1, 0),
+                                  2: mock_Mapping('G', 'ATG', 2, 0),
+                                  3: mock_Mapping('T', 'TAA', 0, 1),
+                                  4: mock_Mapping('A', 'TAA', 1, 1),
+                                  5: mock_Mapping(None, None, None, None)}
+        self.chromosome_pos_to_cDNA = {1005: 0, 1004: 1, 1003: 2, 902: 3, 901: 4, 900: 5}
+
+    def test_chromosome_position_table(self):
+        table = ChromosomePositionTable.initializeFromMappings(self.chromosome_pos_to_cDNA, self.mappings_per_cDNA, 'ENST00000000001.1')
+
+        self.assertEqual(len(table), 6)
+        self.assertEqual(list(table), [900, 901, 902, 1003, 1004, 1005])
+        self.assertTrue(1004 in table)
+        self.assertFalse(1000 in table)
+        with self.assertRaises(KeyError):
+            table[1000]
+
+        self.assertEqual(table[1004], {'base_pair_representation': 'ATG', 'codon_base_pair_position': 1,
+                                       'amino_acid_position': 0, 'base_pair': 'T', 'gencode_transcription_id': 'ENST00000000001.1'})
+        self.assertEqual(table[900], {'base_pair_representation': None, 'codon_base_pair_position': None,
+                                      'amino_acid_position': None, 'base_pair': None, 'gencode_transcription_id': 'ENST00000000001.1'})
+
+        # iterating the items gives the same mappings as the lookups
+        self.assertEqual(dict(table.items()), {chromosome_position: table[chromosome_position] for chromosome_position in table})
+
+    @patch('metadome.domain.models.entities.gene_region.InterproRepository')
+    @patch('metadome.domain.models.entities.gene_region.ProteinRepository')
+    @patch('metadome.domain.models.entities.gene_region.MappingRepository')
+    def test_retrieve_codon_for_protein_position_is_cached(self, mock_mapping_repository, mock_protein_repository, mock_interpro_repository):
+        mock_mapping_repository.get_mappings_for_gene.return_value = [mock_Mapping('A', 'ATG', 0, 0, 0, 100, 'M'),
+                                                                      mock_Mapping('T', 'ATG', 1, 0, 1, 101, 'M'),
+                                                                      mock_Mapping('G', 'ATG', 2, 0, 2, 102, 'M'),
+                                                                      mock_Mapping('T', 'TGG', 0, 1, 3, 103, 'W'),
+                                                                      mock_Mapping('G', 'TGG', 1, 1, 4, 104, 'W'),
+                                                                      mock_Mapping('G', 'TGG', 2, 1, 5, 105, 'W')]
+        mock_protein_repository.retrieve_protein.return_value = Mock(id=1, uniprot_ac='P00001', uniprot_name='TEST_HUMAN')
+        mock_interpro_repository.get_domains_for_protein.return_value = []
+        gene = Mock(gene_name='TEST', id=1, sequence_length=2, gencode_transcription_id='ENST00000000001.1', strand=Strand.plus, protein_id=1)
+        
+        gene_region = GeneRegion(gene)
+        
+        codon = gene_region.retrieve_codon_for_protein_position(1)
+        self.assertEqual(codon.base_pair_representation, 'TGG')
+        self.assertTrue(gene_region.retrieve_codon_for_protein_position(1) is codon)
+        self.assertFalse(gene_region.retrieve_codon_for_protein_position(0) is codon)
+        self.assertEqual(gene_region.retrieve_mappings_per_chromosome()[104]['base_pair'], 'G')
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
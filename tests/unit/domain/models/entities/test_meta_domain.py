@@ -1,8 +1,12 @@
 import unittest
 from metadome.domain.models.entities.meta_domain import MetaDomain,\
     UnsupportedMetaDomainIdentifier, ConsensusPositionOutOfBounds
+from metadome.domain.services.columnar_storage import write_memory_mapped_table,\
+    MemoryMappedTable
 import pandas as pd
 import numpy as np
+import tempfile
+import shutil
 
 class mock_MetaDomain(MetaDomain):
     @classmethod
@@ -37,6 +41,24 @@ class Test_meta_domain(unittest.TestCase):
         
         self.assertTrue(mock_metadom.get_max_alignment_depth() == 17)
         
+    def test_get_alignment_depth_per_consensus_position(self):
+        # mock the metadomain
+        mock_metadom = mock_MetaDomain.mock_PF00907_metadomain_first_three_consensus_positions()
+        
+        self.assertEqual(list(mock_metadom.get_alignment_depth_per_consensus_position()), [13, 15, 17])
+        
+        # the depth should be identical to counting the unique codon representations
+        for consensus_position in range(mock_metadom.consensus_length):
+            self.assertEqual(mock_metadom.get_alignment_depth_per_consensus_position()[consensus_position],
+                             len(mock_metadom.get_codons_aligned_to_consensus_position(consensus_position)))
+        
+        # a previously computed alignment depth should be used as is
+        cached_metadom = mock_MetaDomain(domain_id=mock_metadom.domain_id, consensus_length=mock_metadom.consensus_length,
+                                         n_instances=mock_metadom.n_instances, meta_domain_mapping=mock_metadom.meta_domain_mapping,
+                                         meta_domain_annotation=mock_metadom.meta_domain_annotation,
+                                         alignment_depth_per_consensus_position=[1, 2, 3])
+        self.assertTrue(cached_metadom.get_max_alignment_depth() == 3)
+        
     def test_invalid_domain_id(self):
         with self.assertRaises(UnsupportedMetaDomainIdentifier):
             MetaDomain.initializeFromDomainID('PFTEST')
@@ -55,6 +77,39 @@ class Test_meta_domain(unittest.TestCase):
         with self.assertRaises(ConsensusPositionOutOfBounds):
             len(mock_metadom.get_codons_aligned_to_consensus_position(-4))
         
+    def test_get_annotated_SNVs_for_consensus_position(self):
+        # mock the metadomain
+        mock_metadom = mock_MetaDomain.mock_PF00907_metadomain_first_three_consensus_positions()
+        
+        self.assertTrue(len(mock_metadom.get_annotated_SNVs_for_consensus_position(0)) == 10)
+        self.assertTrue(len(mock_metadom.get_annotated_SNVs_for_consensus_position(1)) == 11)
+        self.assertTrue(len(mock_metadom.get_annotated_SNVs_for_consensus_position(2)) == 8)
+        
+        with self.assertRaises(ConsensusPositionOutOfBounds):
+            len(mock_metadom.get_annotated_SNVs_for_consensus_position(3))
+        
+        # the indexed rows should be identical to a full scan of the annotation
+        for consensus_position in range(mock_metadom.consensus_length):
+            snvs = mock_metadom.get_annotated_SNVs_for_consensus_position(consensus_position)
+            expected = mock_metadom.meta_domain_annotation[mock_metadom.meta_domain_annotation.consensus_pos == consensus_position].to_dict('records')
+            self.assertEqual(sum(len(snvs[key]) for key in snvs.keys()), len(expected))
+            for row in expected:
+                self.assertTrue(row['unique_snv_str_representation'] in snvs.keys())
+                self.assertTrue(row['Unnamed: 0'] in [snv['Unnamed: 0'] for snv in snvs[row['unique_snv_str_representation']]])
+    
+    def test_consensus_position_index_is_rebuilt(self):
+        # mock the metadomain
+        mock_metadom = mock_MetaDomain.mock_PF00907_metadomain_first_three_consensus_positions()
+        
+        # replace the annotation, the index should follow
+        mock_metadom.meta_domain_annotation = mock_metadom.meta_domain_annotation[mock_metadom.meta_domain_annotation.consensus_pos != 1]
+        self.assertTrue(len(mock_metadom.get_annotated_SNVs_for_consensus_position(0)) == 10)
+        self.assertTrue(len(mock_metadom.get_annotated_SNVs_for_consensus_position(1)) == 0)
+        
+        # an empty annotation should not contain any SNVs
+        mock_metadom.meta_domain_annotation = pd.DataFrame()
+        self.assertTrue(len(mock_metadom.get_annotated_SNVs_for_consensus_position(2)) == 0)
+        
     def test_get_consensus_position_for_uniprot_position(self):
         # mock the metadomain
         mock_metadom = mock_MetaDomain.mock_PF00907_metadomain_first_three_consensus_positions()
@@ -79,6 +134,32 @@ class Test_meta_domain(unittest.TestCase):
         # check if
         self.assertTrue(mock_metadom.get_consensus_positions_for_uniprot_position(uniprot_ac='Q8IWI9-4', uniprot_position=77) == [1, 0])
         
+    def test_memory_mapped_meta_domain(self):
+        mock_metadom = mock_MetaDomain.mock_PF00907_metadomain_first_three_consensus_positions()
+        
+        directory = tempfile.mkdtemp()
+        try:
+            write_memory_mapped_table(mock_metadom.meta_domain_mapping, directory+'/mapping', sort_column='consensus_pos')
+            write_memory_mapped_table(mock_metadom.meta_domain_annotation, directory+'/annotation', sort_column='consensus_pos')
+            memory_mapped_metadom = MetaDomain(mock_metadom.domain_id, mock_metadom.consensus_length, mock_metadom.n_instances,
+                                               MemoryMappedTable.initializeFromDirectory(directory+'/mapping'),
+                                               MemoryMappedTable.initializeFromDirectory(directory+'/annotation'))
+            
+            self.assertEqual(memory_mapped_metadom.n_proteins, mock_metadom.n_proteins)
+            self.assertEqual(memory_mapped_metadom.n_transcripts, mock_metadom.n_transcripts)
+            for consensus_position in range(mock_metadom.consensus_length):
+                self.assertEqual(sorted(memory_mapped_metadom.get_codons_aligned_to_consensus_position(consensus_position).keys()),
+                                 sorted(mock_metadom.get_codons_aligned_to_consensus_position(consensus_position).keys()))
+                # compare the string representations, as NaN != NaN
+                self.assertEqual(str(memory_mapped_metadom.get_annotated_SNVs_for_consensus_position(consensus_position)),
+                                 str(mock_metadom.get_annotated_SNVs_for_consensus_position(consensus_position)))
+            self.assertEqual(memory_mapped_metadom.get_consensus_positions_for_uniprot_position('Q99593', 57), [2])
+            self.assertEqual(str(memory_mapped_metadom.get_codon_for_transcript_and_position('ENST00000332710.4', 111)),
+                             str(mock_metadom.get_codon_for_transcript_and_position('ENST00000332710.4', 111)))
+            self.assertEqual(list(memory_mapped_metadom.get_alignment_depth_per_consensus_position()), [13, 15, 17])
+        finally:
+            shutil.rmtree(directory)
+
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,55 @@
+import unittest
+import tempfile
+import shutil
+import os
+from mock import patch
+
+from metadome.domain.parsers.fasta import FastaHeaderIndex
+
+fasta_lines = ['>ENST00000000001.1|ENSG00000000001.1|-|-|GENE1-001|GENE1|3|',
+               'MAG',
+               '>ENST00000000002.1|ENSG00000000002.1|-|-|GENE2-001|GENE2|2|',
+               'MW',
+               '>ENST00000000003.1|ENSG00000000001.1|-|-|GENE1-002|GENE1|4|',
+               'MAGW']
+
+def retrieve_gene_name(header):
+    return header.split('|')[5:6]
+
+class TestFasta(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()+'/'
+        self.fasta_file = self.directory+'translations.fa'
+        self.index_file = self.directory+'translations.fa.index.json'
+        with open(self.fasta_file, 'w') as f:
+            f.write('\n'.join(fasta_lines)+'\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_fasta_header_index(self):
+        index = FastaHeaderIndex.initializeFromFile(self.fasta_file, self.index_file, retrieve_gene_name)
+
+        self.assertEqual(sorted(index.keys()), ['GENE1', 'GENE2'])
+        self.assertEqual(index.retrieve_entries('GENE1'), [(fasta_lines[0], fasta_lines[1]), (fasta_lines[4], fasta_lines[5])])
+        self.assertEqual(index.retrieve_entries('GENE3'), [])
+        self.assertTrue(os.path.isfile(self.index_file))
+
+        # the persisted index is reused
+        with patch('metadome.domain.parsers.fasta.open', side_effect=open) as mock_open,\
+                patch('metadome.domain.services.file_storage.open', side_effect=open) as mock_index_open:
+            persisted_index = FastaHeaderIndex.initializeFromFile(self.fasta_file, self.index_file, retrieve_gene_name)
+            self.assertEqual(mock_open.call_count, 0)
+            self.assertEqual([call[0][0] for call in mock_index_open.call_args_list], [self.index_file])
+        self.assertEqual(persisted_index.entries_per_key, index.entries_per_key)
+
+        # a changed fasta file is indexed again
+        with open(self.fasta_file, 'a') as f:
+            f.write('>ENST00000000004.1|ENSG00000000003.1|-|-|GENE3-001|GENE3|1|\nM\n')
+        updated_index = FastaHeaderIndex.initializeFromFile(self.fasta_file, self.index_file, retrieve_gene_name)
+        self.assertEqual(updated_index.retrieve_entries('GENE3'), [('>ENST00000000004.1|ENSG00000000003.1|-|-|GENE3-001|GENE3|1|', 'M')])
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import tempfile
+import shutil
+
+from metadome.domain.parsers.gff3 import parseGFF3, GFF3RecordIndex
+
+gff3_lines = ['##gff-version 3',
+              'chr1\tHAVANA\ttranscript\t100\t400\t.\t+\t.\tID=ENST00000000001.1;transcript_id=ENST00000000001.1',
+              'chr1\tHAVANA\tCDS\t100\t200\t.\t+\t0\tID=CDS:ENST00000000001.1;Parent=ENST00000000001.1;transcript_id=ENST00000000001.1',
+              'chr1\tHAVANA\tCDS\t150\t200\t.\t+\t0\tID=CDS:ENST00000000001.10;Parent=ENST00000000001.10;transcript_id=ENST00000000001.10',
+              'chr1\tHAVANA\tCDS\t300\t400\t.\t+\t1\tID=CDS:ENST00000000001.1;Parent=ENST00000000001.1;transcript_id=ENST00000000001.1',
+              'chr1\tHAVANA\tUTR\t401\t500\t.\t+\t.\tID=UTR3:ENST00000000001.1;Parent=ENST00000000001.1;transcript_id=ENST00000000001.1']
+
+class TestGFF3(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()+'/'
+        self.gff3_file = self.directory+'annotation.gff3'
+        with open(self.gff3_file, 'w') as f:
+            f.write('\n'.join(gff3_lines)+'\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_GFF3RecordIndex(self):
+        index = GFF3RecordIndex.initializeFromFile(self.gff3_file, self.directory+'annotation.gff3.index.json', feature_type='CDS', attribute='transcript_id')
+
+        # the same records as parsing the whole file
+        self.assertEqual(index.retrieve_records('ENST00000000001.1'),
+                         [record for record in parseGFF3(self.gff3_file) if record.type == 'CDS' and record.attributes['transcript_id'] == 'ENST00000000001.1'])
+        self.assertEqual([(record.start, record.end, record.phase) for record in index.retrieve_records('ENST00000000001.1')], [(100, 200, '0'), (300, 400, '1')])
+        self.assertEqual(len(index.retrieve_records('ENST00000000001.10')), 1)
+        self.assertEqual(index.retrieve_records('ENST00000000002.1'), [])
+
+        # the persisted index is reused
+        persisted_index = GFF3RecordIndex.initializeFromFile(self.gff3_file, self.directory+'annotation.gff3.index.json', feature_type='CDS', attribute='transcript_id')
+        self.assertEqual(persisted_index.offsets_per_key, index.offsets_per_key)
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
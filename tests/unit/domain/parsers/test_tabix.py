@@ -0,0 +1,41 @@
+import unittest
+from mock import patch
+
+from metadome.domain.parsers import tabix
+from metadome.domain.parsers.tabix import tabix_query, variant_coordinate_system
+
+class TestTabix(unittest.TestCase):
+
+    def setUp(self):
+        # start without any open readers
+        tabix._open_vcf_readers.pid = None
+
+    @patch('metadome.domain.parsers.tabix.TabixVCFReader')
+    def test_vcf_reader_is_reused(self, mock_reader):
+        mock_reader.return_value.fetch.side_effect = lambda chrom, start, end: iter([(chrom, start, end)])
+
+        self.assertEqual(list(tabix_query('a.vcf.gz', '1', 10, 20, variant_coordinate_system.one_based)), [('1', 9, 20)])
+        self.assertEqual(list(tabix_query('a.vcf.gz', '2', 10, 20, variant_coordinate_system.zero_based)), [('2', 10, 20)])
+        self.assertEqual(mock_reader.call_count, 1)
+
+        # another file is opened separately
+        list(tabix_query('b.vcf.gz', '1', 10, 20, variant_coordinate_system.one_based))
+        self.assertEqual(mock_reader.call_count, 2)
+
+    @patch('metadome.domain.parsers.tabix.os.getpid')
+    @patch('metadome.domain.parsers.tabix.TabixVCFReader')
+    def test_vcf_reader_is_reopened_after_fork(self, mock_reader, mock_getpid):
+        mock_reader.return_value.fetch.return_value = iter([])
+
+        mock_getpid.return_value = 1
+        list(tabix_query('a.vcf.gz', '1', 10, 20, variant_coordinate_system.one_based))
+
+        # e.g. a forked worker process
+        mock_getpid.return_value = 2
+        list(tabix_query('a.vcf.gz', '1', 10, 20, variant_coordinate_system.one_based))
+
+        self.assertEqual(mock_reader.call_count, 2)
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
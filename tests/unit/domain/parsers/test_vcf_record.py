@@ -0,0 +1,48 @@
+import unittest
+import io
+import vcf
+
+from metadome.domain.parsers.vcf_record import VCFHeader, VCFRecord
+
+header_lines = ['##fileformat=VCFv4.1',
+                '##FILTER=<ID=AC0,Description="Allele count is zero">',
+                '##INFO=<ID=AC,Number=A,Type=Integer,Description="Allele count in genotypes, for each ALT allele">',
+                '##INFO=<ID=AF,Number=A,Type=Float,Description="Allele Frequency, for each ALT allele">',
+                '##INFO=<ID=AN,Number=1,Type=Integer,Description="Total number of alleles in called genotypes">',
+                '##INFO=<ID=CLNSIG,Number=.,Type=String,Description="Clinical significance for this single variant">',
+                '##INFO=<ID=GENEINFO,Number=1,Type=String,Description="Gene(s) for the variant">',
+                '##INFO=<ID=DB,Number=0,Type=Flag,Description="dbSNP Membership">',
+                '#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO']
+
+record_lines = ['1\t69270\t.\tA\tG\t26.5\tPASS\tAC=2,.;AF=0.5,1e-05;AN=4;DB;CLNSIG=Pathogenic,Benign;GENEINFO=OR4F5:79501;UNDEFINED=x,y;UNDEFINEDFLAG',
+                '1\t69428\trs140739101\tT\tG,C\t.\tAC0;RF\tAN=.',
+                'X\t100\t.\tG\t.\t.\t.\t.']
+
+class TestVCFRecord(unittest.TestCase):
+
+    def test_records_equal_pyvcf(self):
+        header = VCFHeader.initializeFromLines(header_lines)
+        pyvcf_records = list(vcf.Reader(fsock=io.StringIO('\n'.join(header_lines+record_lines)+'\n')))
+
+        for line, pyvcf_record in zip(record_lines, pyvcf_records):
+            record = VCFRecord.initializeFromLine(line+'\n', header)
+
+            self.assertEqual((record.CHROM, record.POS, record.ID, record.REF, record.FILTER),
+                             (pyvcf_record.CHROM, pyvcf_record.POS, pyvcf_record.ID, pyvcf_record.REF, pyvcf_record.FILTER))
+            self.assertEqual(record.ALT, [None if alt is None else str(alt) for alt in pyvcf_record.ALT])
+            self.assertEqual(sorted(record.INFO.keys()), sorted(pyvcf_record.INFO.keys()))
+            self.assertEqual(dict(record.INFO), pyvcf_record.INFO)
+
+    def test_info_is_parsed_on_request(self):
+        record = VCFRecord.initializeFromLine(record_lines[0], VCFHeader.initializeFromLines(header_lines))
+
+        self.assertEqual(record.INFO['AN'], 4)
+        self.assertEqual(list(record.INFO._values.keys()), ['AN'])
+        self.assertTrue('AF' in record.INFO)
+        self.assertFalse('AC_AFR' in record.INFO)
+        with self.assertRaises(KeyError):
+            record.INFO['AC_AFR']
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
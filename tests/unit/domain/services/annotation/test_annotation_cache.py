@@ -0,0 +1,51 @@
+import unittest
+import tempfile
+import shutil
+import os
+from mock import patch, Mock
+
+from metadome.domain.services.annotation import annotation_cache
+from metadome.domain.services.annotation.annotation_cache import retrieve_cached_transcript_annotation
+
+class TestAnnotationCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()+'/'
+        self.vcf_file = self.directory+'variants.vcf.gz'
+        with open(self.vcf_file, 'w') as f:
+            f.write('variants')
+
+        self.patch_dir = patch.object(annotation_cache, 'TRANSCRIPT_ANNOTATION_CACHE_DIR', self.directory+'cache/')
+        self.patch_dependencies = patch.dict(annotation_cache.VARIANT_SOURCE_DEPENDENCIES, {'gnomAD': ([self.vcf_file], ['PASS'])})
+        self.patch_dir.start()
+        self.patch_dependencies.start()
+
+    def tearDown(self):
+        self.patch_dir.stop()
+        self.patch_dependencies.stop()
+        shutil.rmtree(self.directory)
+
+    def test_annotation_is_cached(self):
+        annotation = {12345: [{'REF': 'A', 'ALT': 'G', 'AF': 0.5, 'AC': 1, 'AN': 2, 'CHROM': '1', 'POS': 12345}]}
+        annotate = Mock(return_value=annotation)
+
+        # without the cache directory the annotation is computed every time
+        retrieve_cached_transcript_annotation('ENST00000000001.1', 'gnomAD', annotate)
+        self.assertEqual(annotate.call_count, 1)
+        self.assertFalse(os.path.exists(self.directory+'cache/'))
+
+        os.mkdir(self.directory+'cache/')
+        self.assertEqual(retrieve_cached_transcript_annotation('ENST00000000001.1', 'gnomAD', annotate), annotation)
+        self.assertEqual(retrieve_cached_transcript_annotation('ENST00000000001.1', 'gnomAD', annotate), annotation)
+        self.assertEqual(annotate.call_count, 2)
+
+        # a changed variant file invalidates the cached annotation
+        with open(self.vcf_file, 'w') as f:
+            f.write('more variants')
+        retrieve_cached_transcript_annotation('ENST00000000001.1', 'gnomAD', annotate)
+        self.assertEqual(annotate.call_count, 3)
+        self.assertEqual(len(os.listdir(self.directory+'cache/ENST00000000001.1')), 1)
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
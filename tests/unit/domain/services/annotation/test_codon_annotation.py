@@ -0,0 +1,65 @@
+import unittest
+from mock import Mock, patch
+
+from metadome.domain.models.entities.codon import Codon
+from metadome.domain.services.annotation.codon_annotation import annotate_SNVs_for_codons,\
+    annotate_SNVs_for_codon_groups, annotate_ClinVar_and_gnomAD_SNVs_for_codon_groups
+
+def mock_codon(gencode_transcription_id, chromosome, chromosome_positions):
+    return Codon(_gencode_transcription_id=gencode_transcription_id, _uniprot_ac='P00001', _strand='+',
+                 _base_pair_representation='ATG', _amino_acid_residue='M', _amino_acid_position=1,
+                 _chr=chromosome, _chromosome_position_base_pair_one=chromosome_positions[0],
+                 _chromosome_position_base_pair_two=chromosome_positions[1],
+                 _chromosome_position_base_pair_three=chromosome_positions[2],
+                 _cDNA_position_one=0, _cDNA_position_two=1, _cDNA_position_three=2)
+
+# the variants per chromosome, ordered on position
+variants = {'chr1': [(100, 'A', 'G'), (100, 'A', 'C'), (101, 'T', 'A'), (102, 'GA', 'G'), (150, 'T', 'C'), (203, 'G', 'A')],
+            'chr2': [(100, 'A', 'T'), (102, 'G', 'T')]}
+
+def mock_annotateTranscriptFunction(chromosome, regions):
+    for region_start, region_stop in regions:
+        for position, ref, alt in variants.get(chromosome, []):
+            if region_start <= position <= region_stop:
+                yield {'CHROM': chromosome, 'POS': position, 'REF': ref, 'ALT': alt, 'INFO': {'AC': 1, 'AN': 10}}
+
+class TestCodonAnnotation(unittest.TestCase):
+
+    def test_annotate_SNVs_for_codon_groups(self):
+        codon_groups = [[mock_codon('ENST00000000001.1', 'chr1', [100, 101, 102]), mock_codon('ENST00000000002.1', 'chr1', [100, 101, 102])],
+                        [mock_codon('ENST00000000001.1', 'chr1', [150, 201, 203])],
+                        [mock_codon('ENST00000000003.1', 'chr2', [100, 101, 102])],
+                        [mock_codon('ENST00000000004.1', 'chr1', [99, 100, 101])],
+                        [mock_codon('ENST00000000005.1', 'chr3', [100, 101, 102])]]
+
+        annotateTranscriptFunction = Mock(side_effect=mock_annotateTranscriptFunction)
+        SNVs_per_group = annotate_SNVs_for_codon_groups(annotateTranscriptFunction, codon_groups, 'gnomAD')
+
+        # one sweep per chromosome
+        self.assertEqual(annotateTranscriptFunction.call_count, 3)
+        self.assertEqual(annotateTranscriptFunction.call_args_list[0][0], ('chr1', [(99, 102), (150, 150), (201, 201), (203, 203)]))
+
+        # the same SNVs as annotating each group separately
+        self.assertEqual(SNVs_per_group, [annotate_SNVs_for_codons(mock_annotateTranscriptFunction, codons, 'gnomAD') for codons in codon_groups])
+        self.assertEqual([len(SNVs) for SNVs in SNVs_per_group], [6, 2, 2, 3, 0])
+
+    @patch('metadome.domain.services.annotation.codon_annotation.annotateTranscriptWithGnomADData')
+    @patch('metadome.domain.services.annotation.codon_annotation.annotateTranscriptWithClinvarData')
+    def test_annotate_ClinVar_and_gnomAD_SNVs_for_codon_groups(self, mock_annotateTranscriptWithClinvarData, mock_annotateTranscriptWithGnomADData):
+        mock_annotateTranscriptWithClinvarData.side_effect = lambda chromosome, regions: iter([])
+        mock_annotateTranscriptWithGnomADData.side_effect = mock_annotateTranscriptFunction
+        codon_groups = [[mock_codon('ENST00000000001.1', 'chr2', [100, 101, 102])],
+                        [mock_codon('ENST00000000002.1', 'chr1', [150, 201, 203])],
+                        [mock_codon('ENST00000000003.1', 'chr1', [100, 101, 102])]]
+
+        ClinVar_SNVs_per_group, gnomAD_SNVs_per_group = annotate_ClinVar_and_gnomAD_SNVs_for_codon_groups(codon_groups, n_workers=1)
+
+        # one sweep per chromosome and variant source, merged in the order of the groups
+        self.assertEqual(mock_annotateTranscriptWithClinvarData.call_count, 2)
+        self.assertEqual(mock_annotateTranscriptWithGnomADData.call_count, 2)
+        self.assertEqual(ClinVar_SNVs_per_group, [[], [], []])
+        self.assertEqual(gnomAD_SNVs_per_group, annotate_SNVs_for_codon_groups(mock_annotateTranscriptFunction, codon_groups, 'gnomAD'))
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
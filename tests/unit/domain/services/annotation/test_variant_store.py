@@ -0,0 +1,88 @@
+import unittest
+import tempfile
+import shutil
+import sqlite3
+from mock import patch
+
+from metadome.domain.services.annotation.variant_store import LocalVariantStore,\
+    write_variant_store, retrieve_variant_store, GNOMAD_INFO_FIELDS,\
+    VariantStoreDoesNotCoverRegion
+from metadome.domain.services.annotation import gene_region_annotators
+
+def mock_record(position, ref, alt, allele_count):
+    return {'CHROM': '1', 'POS': position, 'REF': ref, 'ALT': alt, 'INFO': {'AC': allele_count, 'AF': allele_count/10.0, 'AN': 10}}
+
+class TestVariantStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()+'/'
+        self.filename = self.directory+'variants.sqlite'
+        self.records = [mock_record(100, 'A', 'G', 1),
+                        mock_record(100, 'A', 'T', 2),
+                        mock_record(101, 'AC', 'A', 3),
+                        mock_record(105, 'C', 'T', 4),
+                        mock_record(110, 'G', 'A', 5),
+                        mock_record(300, 'G', 'A', 6)]
+        records_per_chromosome = {'chr1': self.records, 'chr2': [dict(mock_record(100, 'T', 'C', 7), CHROM='2')], 'chr3': []}
+
+        def annotate(chromosome, regions):
+            for record in records_per_chromosome[chromosome]:
+                if any(region_start <= record['POS'] <= region_stop for region_start, region_stop in regions):
+                    yield record
+        self.annotate = annotate
+
+        write_variant_store(annotate, {'chr1': [(90, 120)], 'chr2': [(100, 100)], 'chr3': [(1, 1000)]}, GNOMAD_INFO_FIELDS, self.filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_annotate(self):
+        variant_store = LocalVariantStore(self.filename)
+
+        # only the single nucleotide variants within the regions are retrieved, in order of the regions
+        self.assertEqual(list(variant_store.annotate('chr1', [(105, 110), (90, 100)])), [self.records[3], self.records[4], self.records[0], self.records[1]])
+        self.assertEqual(list(variant_store.annotate('chr1', [(101, 104)])), [])
+        self.assertEqual(list(variant_store.annotate('chr2', [(100, 100)])), list(self.annotate('chr2', [(100, 100)])))
+        self.assertEqual(list(variant_store.annotate('chr3', [(1, 1000)])), [])
+
+        # the INFO fields are stored as typed columns
+        with sqlite3.connect(self.filename) as connection:
+            self.assertEqual(connection.execute("SELECT typeof(AC), typeof(AF), typeof(AN) FROM variants LIMIT 1").fetchone(), ('integer', 'real', 'integer'))
+
+    def test_regions_that_were_not_imported(self):
+        variant_store = LocalVariantStore(self.filename)
+
+        self.assertTrue(variant_store.covers('chr1', [(90, 100), (110, 120)]))
+        self.assertFalse(variant_store.covers('chr1', [(90, 100), (110, 300)]))
+        self.assertFalse(variant_store.covers('chr1', [(80, 90)]))
+        self.assertFalse(variant_store.covers('chrX', [(100, 100)]))
+        with self.assertRaises(VariantStoreDoesNotCoverRegion):
+            list(variant_store.annotate('chr1', [(290, 300)]))
+
+    def test_retrieve_variant_store(self):
+        self.assertIsNone(retrieve_variant_store(self.directory+'missing.sqlite'))
+
+        # the store is opened once
+        variant_store = retrieve_variant_store(self.filename)
+        self.assertIs(retrieve_variant_store(self.filename), variant_store)
+
+        # a replaced store is opened again
+        write_variant_store(self.annotate, {'chr1': [(90, 300)]}, GNOMAD_INFO_FIELDS, self.filename)
+        replaced_variant_store = retrieve_variant_store(self.filename)
+        self.assertIsNot(replaced_variant_store, variant_store)
+        self.assertEqual(list(replaced_variant_store.annotate('chr1', [(300, 300)])), [self.records[5]])
+
+    def test_annotators_fall_back_to_tabix(self):
+        with patch.object(gene_region_annotators, 'GNOMAD_VARIANT_STORE', self.filename),\
+                patch.object(gene_region_annotators, 'annotateTranscriptWithGnomADDataFromTabix', side_effect=self.annotate) as mock_tabix:
+            # the imported regions are retrieved from the store
+            self.assertEqual(list(gene_region_annotators.annotateTranscriptWithGnomADData('chr1', [(100, 100)])), self.records[:2])
+            self.assertEqual(mock_tabix.call_count, 0)
+
+            # the other regions are retrieved from the VCF file
+            self.assertEqual(list(gene_region_annotators.annotateTranscriptWithGnomADData('chr1', [(250, 300)])), [self.records[5]])
+            mock_tabix.assert_called_once_with('chr1', [(250, 300)])
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import numpy as np
+from mock import patch, Mock
+
+from metadome.domain.services.computation.gene_region_computations import compute_sliding_window_dn_ds,\
+    compute_tolerance_landscapes, compute_tolerance_landscape,\
+    compute_tolerance_landscape_grid
+from metadome.domain.services.helper_functions import create_sliding_window
+from metadome.domain.metrics.GeneticTolerance import background_corrected_mosy_score
+
+def mock_variant_type_counts(protein_region_start, protein_region_length):
+    random_state = np.random.RandomState(0)
+    variant_type_counts = {}
+    for i in range(protein_region_start, protein_region_start+protein_region_length):
+        variant_type_counts[i] = {'missense': int(random_state.randint(0, 5)),
+                                  'synonymous': int(random_state.randint(0, 3)),
+                                  'background_missense': float(random_state.uniform(0, 3)),
+                                  'background_synonymous': float(random_state.uniform(0, 1))}
+    return variant_type_counts
+
+def sliding_window_dn_ds_per_window(variant_type_counts, protein_region_start, protein_region_length, sliding_window_size):
+    """The sliding window dn/ds by summing the counts over each window"""
+    sw_dn_ds = []
+    sw_coverage = []
+    for window in create_sliding_window(protein_region_length, sliding_window_size):
+        totals = {variant_type: sum(variant_type_counts[j + protein_region_start][variant_type] for j in window['sw_range'])
+                  for variant_type in ['missense', 'background_missense', 'synonymous', 'background_synonymous']}
+        sw_dn_ds.append(background_corrected_mosy_score(missense=totals['missense'],
+                                                        missense_background=totals['background_missense'],
+                                                        synonymous=totals['synonymous'],
+                                                        synonymous_background=totals['background_synonymous']))
+        sw_coverage.append(window['sw_coverage'])
+    return sw_dn_ds, sw_coverage
+
+class TestGeneRegionComputations(unittest.TestCase):
+
+    def test_compute_sliding_window_dn_ds(self):
+        variant_type_counts = mock_variant_type_counts(protein_region_start=5, protein_region_length=40)
+
+        for sliding_window_size in [-1, 0, 1, 2, 10, 50]:
+            sw_dn_ds, sw_coverage = compute_sliding_window_dn_ds(variant_type_counts, 5, 40, sliding_window_size)
+            expected_sw_dn_ds, expected_sw_coverage = sliding_window_dn_ds_per_window(variant_type_counts, 5, 40, sliding_window_size)
+
+            np.testing.assert_allclose(sw_dn_ds, expected_sw_dn_ds, rtol=1e-12)
+            np.testing.assert_allclose(sw_coverage, expected_sw_coverage, rtol=1e-12)
+
+    @patch('metadome.domain.services.computation.gene_region_computations.retrieve_variant_type_counts')
+    @patch('metadome.domain.services.computation.gene_region_computations.annotateSNVs')
+    def test_compute_tolerance_landscapes(self, mock_annotateSNVs, mock_retrieve_variant_type_counts):
+        mock_annotateSNVs.return_value = {}
+        mock_retrieve_variant_type_counts.return_value = mock_variant_type_counts(protein_region_start=1, protein_region_length=10)
+
+        gene_region = Mock(protein_region_start=1, protein_region_length=10)
+        gene_region.retrieve_codon_for_protein_position.side_effect = lambda protein_pos: Mock(toCodonJson=Mock(return_value={'protein_pos': protein_pos}))
+
+        tolerance_landscapes = compute_tolerance_landscapes(gene_region, [1, 3])
+
+        # the gene region is annotated only once for all sliding window sizes
+        self.assertEqual(mock_annotateSNVs.call_count, 1)
+        self.assertEqual(sorted(tolerance_landscapes.keys()), [1, 3])
+
+        for sliding_window_size in [1, 3]:
+            tolerance_landscape = tolerance_landscapes[sliding_window_size]['tolerance_landscape']
+            self.assertEqual(len(tolerance_landscape), 10)
+            self.assertEqual([entry['protein_pos'] for entry in tolerance_landscape], list(range(1, 11)))
+            self.assertEqual([entry['sw_size'] for entry in tolerance_landscape], [sliding_window_size]*10)
+            self.assertEqual([entry['sw_dn_ds'] for entry in tolerance_landscape], tolerance_landscapes[sliding_window_size]['sw_dn_ds'].tolist())
+
+        self.assertEqual(compute_tolerance_landscape(gene_region, 3), tolerance_landscapes[3]['tolerance_landscape'])
+
+    @patch('metadome.domain.services.computation.gene_region_computations.retrieve_variant_type_counts')
+    @patch('metadome.domain.services.computation.gene_region_computations.annotateSNVs')
+    def test_compute_tolerance_landscape_grid(self, mock_annotateSNVs, mock_retrieve_variant_type_counts):
+        mock_annotateSNVs.return_value = {1: [{'AF': 0.5}], 2: [{'AF': 0.001}, {'AF': 0.01}]}
+        mock_retrieve_variant_type_counts.return_value = mock_variant_type_counts(protein_region_start=1, protein_region_length=10)
+
+        gene_region = Mock(protein_region_start=1, protein_region_length=10)
+        gene_region.retrieve_codon_for_protein_position.side_effect = lambda protein_pos: Mock(toCodonJson=Mock(return_value={'protein_pos': protein_pos}))
+
+        tolerance_landscapes = compute_tolerance_landscape_grid(gene_region, [1, 3], [0.0, 0.005, 0.1])
+
+        # the gene region is annotated only once for all combinations
+        self.assertEqual(mock_annotateSNVs.call_count, 1)
+        self.assertEqual(sorted(tolerance_landscapes.keys()), [(0.0, 1), (0.0, 3), (0.005, 1), (0.005, 3), (0.1, 1), (0.1, 3)])
+
+        # the variants are filtered per minimal allele frequency
+        filtered_annotations = [call[0][1] for call in mock_retrieve_variant_type_counts.call_args_list]
+        self.assertEqual(filtered_annotations, [{1: [{'AF': 0.5}], 2: [{'AF': 0.001}, {'AF': 0.01}]},
+                                                {1: [{'AF': 0.5}], 2: [{'AF': 0.01}]},
+                                                {1: [{'AF': 0.5}]}])
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import tempfile
+import shutil
+import pandas as pd
+import numpy as np
+
+from metadome.domain.services.columnar_storage import read_table,\
+    write_memory_mapped_table, MemoryMappedTable, DictionaryEncodedColumn
+
+# rows of the meta domain mappings and annotations, as in MetaDomain.initializeFromDomainID and annotate_metadomain
+metadomain_mapping_rows = [{'gencode_transcription_id': 'ENST00000000001.1', 'uniprot_ac': 'P00001', 'strand': '+', 'base_pair_representation': 'ATG',
+                            'amino_acid_residue': 'M', 'amino_acid_position': 1, 'chr': 'chr1', 'chromosome_position_base_pair_one': 100,
+                            'chromosome_position_base_pair_two': 101, 'chromosome_position_base_pair_three': 102, 'cDNA_position_one': 1,
+                            'cDNA_position_two': 2, 'cDNA_position_three': 3, 'consensus_pos': 0, 'domain_id': 'PF00001'},
+                           {'gencode_transcription_id': 'ENST00000000002.1', 'uniprot_ac': 'P00002', 'strand': '-', 'base_pair_representation': 'TGG',
+                            'amino_acid_residue': 'W', 'amino_acid_position': 20, 'chr': 'chrX', 'chromosome_position_base_pair_one': 302,
+                            'chromosome_position_base_pair_two': 301, 'chromosome_position_base_pair_three': 300, 'cDNA_position_one': 58,
+                            'cDNA_position_two': 59, 'cDNA_position_three': 60, 'consensus_pos': 3, 'domain_id': 'PF00001'}]
+metadomain_annotation_rows = [dict(metadomain_mapping_rows[0], ref_nucleotide='A', alt_nucleotide='G', var_codon_position=0, variant_type='missense',
+                                   alt_amino_acid_residue='V', variant_source='gnomAD', allele_number=246000, allele_count=3,
+                                   unique_snv_str_representation='chr1:100-102_A>G'),
+                              dict(metadomain_mapping_rows[1], ref_nucleotide='G', alt_nucleotide='A', var_codon_position=2, variant_type='nonsense',
+                                   alt_amino_acid_residue='*', variant_source='ClinVar', clinvar_ID='12345',
+                                   unique_snv_str_representation='chrX:300-302_G>A')]
+
+class TestColumnarStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()+'/'
+        self.dataframe = pd.DataFrame([{'chr': 'chr1', 'strand': '+', 'consensus_pos': 0, 'allele_frequency': 0.5, 'clinvar_ID': 'RCV0001'},
+                                       {'chr': 'chr2', 'strand': '-', 'consensus_pos': 3, 'allele_frequency': np.nan, 'clinvar_ID': np.nan},
+                                       {'chr': 'chr1', 'strand': '+', 'consensus_pos': 1, 'allele_frequency': 0.1, 'clinvar_ID': 'RCV0002'}])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_read_table_falls_back_to_csv(self):
+        self.dataframe.to_csv(self.directory+'dataframe')
+        result = read_table(self.directory+'dataframe.mmap', self.directory+'dataframe')
+
+        # the index column written by to_csv is not a column of the result
+        self.assertEqual(list(result.columns), list(self.dataframe.columns))
+        self.assertEqual(list(result.strand), ['+', '-', '+'])
+
+        # the memory-mapped table is preferred
+        write_memory_mapped_table(self.dataframe.iloc[:1], self.directory+'dataframe.mmap')
+        self.assertEqual(read_table(self.directory+'dataframe.mmap', self.directory+'dataframe').n_rows, 1)
+
+    def test_memory_mapped_table(self):
+        directory = self.directory+'table.mmap'
+        write_memory_mapped_table(self.dataframe, directory, sort_column='consensus_pos')
+        table = MemoryMappedTable.initializeFromDirectory(directory)
+
+        self.assertEqual(table.columns, list(self.dataframe.columns))
+        self.assertEqual(table.n_rows, 3)
+        self.assertTrue(isinstance(table.values['consensus_pos'], np.memmap))
+        self.assertTrue(isinstance(table.values['chr'], DictionaryEncodedColumn))
+
+        # the rows are sorted on the sort column
+        self.assertEqual(list(table.values['consensus_pos']), [0, 1, 3])
+        self.assertEqual(table.values['clinvar_ID'][0:3].tolist()[:2], ['RCV0001', 'RCV0002'])
+        self.assertTrue(pd.isnull(table.values['clinvar_ID'][2]))
+        self.assertEqual(list(table.values['chr'].equals('chr1')), [True, True, False])
+
+        # an existing table is replaced
+        write_memory_mapped_table(self.dataframe.iloc[:1], directory)
+        self.assertEqual(MemoryMappedTable.initializeFromDirectory(directory).n_rows, 1)
+
+    def test_memory_mapped_table_retains_dtypes(self):
+        for name, rows in [('mappings', metadomain_mapping_rows), ('annotation', metadomain_annotation_rows)]:
+            dataframe = pd.DataFrame(rows)
+
+            # the meta domains as written directly
+            write_memory_mapped_table(dataframe, self.directory+name+'.mmap')
+            pd.testing.assert_frame_equal(MemoryMappedTable.initializeFromDirectory(self.directory+name+'.mmap').to_dataframe(), dataframe)
+
+            # the meta domains converted from the (legacy) csv files
+            dataframe.to_csv(self.directory+name)
+            csv_dataframe = pd.read_csv(self.directory+name, index_col=0)
+            write_memory_mapped_table(csv_dataframe, self.directory+name+'.mmap')
+            pd.testing.assert_frame_equal(MemoryMappedTable.initializeFromDirectory(self.directory+name+'.mmap').to_dataframe(), csv_dataframe)
+
+        # the ClinVar IDs are not converted
+        write_memory_mapped_table(pd.DataFrame(metadomain_annotation_rows), self.directory+'annotation.mmap')
+        table = MemoryMappedTable.initializeFromDirectory(self.directory+'annotation.mmap')
+        self.assertEqual(table.values['clinvar_ID'][1], '12345')
+        self.assertEqual(list(table.values['clinvar_ID'].equals('12345')), [False, True])
+
+    def test_memory_mapped_table_retains_mixed_types(self):
+        dataframe = pd.DataFrame({'mixed': pd.Series([1, '1', 2.5, True, np.nan], dtype=object),
+                                  'categorical': pd.Categorical(['a', 'b', 'a', np.nan, 'b'])})
+        write_memory_mapped_table(dataframe, self.directory+'table.mmap')
+        result = MemoryMappedTable.initializeFromDirectory(self.directory+'table.mmap').to_dataframe()
+
+        pd.testing.assert_frame_equal(result, dataframe)
+        self.assertEqual([type(value) for value in result.mixed[:4]], [int, str, float, bool])
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import tempfile
+import shutil
+import os
+
+from metadome.domain.services.file_storage import compute_file_status_checksum,\
+    atomic_replace, atomic_write, retrieve_persisted_index
+
+class TestFileStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()+'/'
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_compute_file_status_checksum(self):
+        filename = self.directory+'test.txt'
+        checksum_without_file = compute_file_status_checksum([filename])
+
+        with open(filename, 'w') as f:
+            f.write('test')
+        checksum = compute_file_status_checksum([filename])
+        self.assertNotEqual(checksum, checksum_without_file)
+        self.assertEqual(compute_file_status_checksum([filename]), checksum)
+        self.assertNotEqual(compute_file_status_checksum([filename], ['PASS']), checksum)
+
+        with open(filename, 'a') as f:
+            f.write('ed')
+        self.assertNotEqual(compute_file_status_checksum([filename]), checksum)
+
+    def test_atomic_write(self):
+        filename = self.directory+'test.txt'
+        with atomic_write(filename) as f:
+            f.write('first')
+            self.assertFalse(os.path.exists(filename))
+
+        with self.assertRaises(ValueError):
+            with atomic_write(filename) as f:
+                f.write('second')
+                raise ValueError()
+
+        # the failed write leaves the previous file and no temporary file
+        with open(filename) as f:
+            self.assertEqual(f.read(), 'first')
+        self.assertEqual(os.listdir(self.directory), ['test.txt'])
+
+    def test_atomic_replace_of_directory(self):
+        directory = self.directory+'table'
+        for content in ['first', 'second']:
+            with atomic_replace(directory) as temporary_directory:
+                os.mkdir(temporary_directory)
+                with open(temporary_directory+'/content.txt', 'w') as f:
+                    f.write(content)
+
+        with open(directory+'/content.txt') as f:
+            self.assertEqual(f.read(), 'second')
+        self.assertEqual(os.listdir(self.directory), ['table'])
+
+    def test_retrieve_persisted_index(self):
+        filename = self.directory+'test.txt'
+        index_filename = self.directory+'test.txt.index.json'
+        with open(filename, 'w') as f:
+            f.write('first')
+
+        built_indices = []
+        def build_index():
+            with open(filename) as f:
+                built_indices.append({f.read(): [0]})
+            return built_indices[-1]
+
+        self.assertEqual(retrieve_persisted_index(filename, index_filename, build_index), {'first': [0]})
+        # the persisted index is reused
+        self.assertEqual(retrieve_persisted_index(filename, index_filename, build_index), {'first': [0]})
+        self.assertEqual(len(built_indices), 1)
+
+        # the index is rebuilt once the file changes
+        with open(filename, 'w') as f:
+            f.write('second')
+        self.assertEqual(retrieve_persisted_index(filename, index_filename, build_index), {'second': [0]})
+        self.assertEqual(len(built_indices), 2)
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
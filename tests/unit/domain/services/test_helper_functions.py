@@ -1,8 +1,10 @@
 import unittest
+import random
 
 from metadome.domain.services.helper_functions import (create_sliding_window,
                                                        convertListOfIntegerToRanges,
-                                                       is_transcript_id)
+                                                       is_transcript_id,
+                                                       IntervalIndex)
 
 class TestHelperFunctions(unittest.TestCase):
 
@@ -56,6 +58,25 @@ class TestHelperFunctions(unittest.TestCase):
         self.assertTrue(is_transcript_id('ENST00000273580.7'))
         self.assertFalse(is_transcript_id('foo'))
 
+    def test_IntervalIndex(self):
+        random_state = random.Random(0)
+        intervals = []
+        for i in range(50):
+            start = random_state.randint(0, 100)
+            intervals.append((start, start+random_state.randint(-1, 30), i))
+        interval_index = IntervalIndex(intervals)
+
+        # the overlapping intervals are retrieved in their original order
+        for position in range(-5, 140):
+            self.assertEqual(interval_index.retrieve(position),
+                             [value for start, stop, value in intervals if start <= position <= stop])
+
+        self.assertEqual(IntervalIndex([]).retrieve(0), [])
+
+        # modifying a result does not affect the index
+        interval_index.retrieve(50).append('modified')
+        self.assertFalse('modified' in interval_index.retrieve(50))
+
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
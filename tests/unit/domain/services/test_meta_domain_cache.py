@@ -0,0 +1,108 @@
+import unittest
+import tempfile
+import shutil
+import os
+import pandas as pd
+from mock import patch, Mock
+
+from metadome.domain.services import meta_domain_cache
+from metadome.domain.services.meta_domain_cache import MetaDomainCache
+from metadome.domain.services.columnar_storage import write_memory_mapped_table
+
+def mock_metadomain(n_bytes):
+    meta_domain = Mock()
+    meta_domain.estimate_memory_usage.return_value = n_bytes
+    return meta_domain
+
+class TestMetaDomainCache(unittest.TestCase):
+
+    def setUp(self):
+        self.metadomain_dir = tempfile.mkdtemp()+'/'
+        for domain_id in ['PF00001', 'PF00002', 'PF00003']:
+            os.mkdir(self.metadomain_dir+domain_id)
+            with open(self.metadomain_dir+domain_id+'/metadomain_mappings', 'w') as f:
+                f.write(domain_id)
+
+        self.patch_dir = patch.object(meta_domain_cache, 'METADOMAIN_DIR', self.metadomain_dir)
+        self.patch_dir.start()
+
+    def tearDown(self):
+        self.patch_dir.stop()
+        shutil.rmtree(self.metadomain_dir)
+
+    @patch('metadome.domain.models.entities.meta_domain.MetaDomain.initializeFromDomainID')
+    def test_retrieve_metadomain_is_cached(self, mock_initialize):
+        mock_initialize.side_effect = lambda domain_id: mock_metadomain(10)
+        cache = MetaDomainCache(max_bytes=100)
+
+        first = cache.retrieve_metadomain('PF00001')
+        second = cache.retrieve_metadomain('PF00001')
+
+        self.assertTrue(first is second)
+        self.assertEqual(mock_initialize.call_count, 1)
+        self.assertEqual(cache.current_bytes, 10)
+
+    @patch('metadome.domain.models.entities.meta_domain.MetaDomain.initializeFromDomainID')
+    def test_least_recently_used_is_evicted(self, mock_initialize):
+        mock_initialize.side_effect = lambda domain_id: mock_metadomain(40)
+        cache = MetaDomainCache(max_bytes=100)
+
+        cache.retrieve_metadomain('PF00001')
+        cache.retrieve_metadomain('PF00002')
+        # use the first meta domain again, the second is now least recently used
+        cache.retrieve_metadomain('PF00001')
+        cache.retrieve_metadomain('PF00003')
+
+        self.assertTrue('PF00001' in cache)
+        self.assertFalse('PF00002' in cache)
+        self.assertTrue('PF00003' in cache)
+        self.assertEqual(cache.current_bytes, 80)
+
+    @patch('metadome.domain.models.entities.meta_domain.MetaDomain.initializeFromDomainID')
+    def test_too_large_metadomain_is_not_cached(self, mock_initialize):
+        mock_initialize.side_effect = lambda domain_id: mock_metadomain(1000)
+        cache = MetaDomainCache(max_bytes=100)
+
+        cache.retrieve_metadomain('PF00001')
+
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.current_bytes, 0)
+
+    @patch('metadome.domain.models.entities.meta_domain.MetaDomain.initializeFromDomainID')
+    def test_changed_files_invalidate_the_cache(self, mock_initialize):
+        mock_initialize.side_effect = lambda domain_id: mock_metadomain(10)
+        cache = MetaDomainCache(max_bytes=100)
+
+        first = cache.retrieve_metadomain('PF00001')
+
+        # e.g. a reannotation of the meta domain
+        with open(self.metadomain_dir+'PF00001/metadomain_snv_annotation', 'w') as f:
+            f.write('reannotated')
+
+        second = cache.retrieve_metadomain('PF00001')
+
+        self.assertFalse(first is second)
+        self.assertEqual(mock_initialize.call_count, 2)
+        self.assertEqual(cache.current_bytes, 10)
+
+    @patch('metadome.domain.models.entities.meta_domain.MetaDomain.initializeFromDomainID')
+    def test_rewritten_memory_mapped_table_invalidates_the_cache(self, mock_initialize):
+        mock_initialize.side_effect = lambda domain_id: mock_metadomain(10)
+        cache = MetaDomainCache(max_bytes=100)
+        table_directory = self.metadomain_dir+'PF00001/metadomain_snv_annotation.mmap'
+        write_memory_mapped_table(pd.DataFrame([{'consensus_pos': 0}]), table_directory)
+
+        first = cache.retrieve_metadomain('PF00001')
+        self.assertTrue(cache.retrieve_metadomain('PF00001') is first)
+
+        # e.g. a reannotation of the meta domain, replacing the table directory
+        write_memory_mapped_table(pd.DataFrame([{'consensus_pos': 1}]), table_directory)
+
+        second = cache.retrieve_metadomain('PF00001')
+
+        self.assertFalse(first is second)
+        self.assertEqual(mock_initialize.call_count, 2)
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from mock import patch
+
+from metadome.domain.wrappers.blast import run_blast_batch, interpret_blast_as_uniprot
+
+def mock_blastp(args):
+    """Writes a blast output for each query in the query file"""
+    with open(args[args.index('-query')+1]) as f:
+        qseqids = [line[1:].strip() for line in f if line.startswith('>')]
+    with open(args[args.index('-out')+1], 'w') as f:
+        for qseqid in reversed(qseqids):
+            f.write(qseqid+',sp|P00001|TEST1_HUMAN,100.000,3,0,0,1,3,1,3,1e-10,10.0,3\n')
+    return 0
+
+class TestBlast(unittest.TestCase):
+
+    @patch('metadome.domain.wrappers.blast.subprocess.call')
+    def test_run_blast_batch(self, mock_call):
+        mock_call.side_effect = mock_blastp
+
+        output_per_sequence = run_blast_batch(['MAG', 'MWW', 'MAW'], 'uniprot.fasta', max_target_seqs=10, num_threads=4)
+
+        # a single blastp process with the thread count
+        self.assertEqual(mock_call.call_count, 1)
+        args = mock_call.call_args[0][0]
+        self.assertEqual(args[args.index('-num_threads')+1], '4')
+
+        # the output is demultiplexed on the qseqid
+        self.assertEqual([len(output) for output in output_per_sequence], [1, 1, 1])
+        self.assertEqual([interpret_blast_as_uniprot(output[0])['qseqid'] for output in output_per_sequence], ['query_0', 'query_1', 'query_2'])
+        self.assertEqual(interpret_blast_as_uniprot(output_per_sequence[1][0])['accession_code'], 'P00001')
+
+        self.assertEqual(run_blast_batch([], 'uniprot.fasta'), [])
+        self.assertEqual(mock_call.call_count, 1)
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import tempfile
+import shutil
+from mock import patch
+
+from metadome.domain.wrappers import gencode
+from metadome.domain.wrappers.gencode import retrieve_refseq_identifiers_for_transcripts,\
+    retrieve_refseq_identifiers_for_transcript, retrieveSwissProtIDs,\
+    retrieveSwissProtID, NoSwissProtEntryFoundException,\
+    retrieveMRNAValidatedTranslations_gencode,\
+    retrieveMRNAValidatedTranslationsForGenes_gencode
+
+class TestGencode(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()+'/'
+        with open(self.directory+'metadata.RefSeq', 'w') as f:
+            f.write('ENST00000000001.1\tNM_000001.1\tNP_000001.1\n'
+                    'ENST00000000001.1\tNM_000002.1\t\n'
+                    'ENST00000000001.10\tNM_000010.1\tNP_000010.1\n')
+        with open(self.directory+'metadata.SwissProt', 'w') as f:
+            f.write('ENST00000000001.1\tP00001\tTEST1_HUMAN\n'
+                    'ENST00000000001.1\tP00002\tTEST2_HUMAN\n'
+                    'ENST00000000002.1\tP00003\tTEST3_HUMAN\n')
+        with open(self.directory+'wgEncodeGencodeBasic', 'w') as f:
+            f.write('0\tENST00000000001.1\tchr1\t+\t10\t100\t20\t90\t1\t10,\t100,\t0\tGENE1\tcmpl\tcmpl\t0,\n'
+                    '0\tENST00000000010.1\tchr1\t-\t10\t100\t20\t90\t1\t10,\t100,\t0\tGENE10\tcmpl\tcmpl\t0,\n'
+                    '0\tENST00000000002.1\tchr2\t+\t10\t100\t20\t90\t1\t10,\t100,\t0\tGENE1\tcmpl\tcmpl\t0,\n')
+
+        self.patch_refseq_file = patch.object(gencode, 'GENCODE_REFSEQ_FILE', self.directory+'metadata.RefSeq')
+        self.patch_swissprot_file = patch.object(gencode, 'GENCODE_SWISSPROT_FILE', self.directory+'metadata.SwissProt')
+        self.patch_metadata_rows = patch.object(gencode, '_metadata_rows', {})
+        self.patch_basic_file = patch.object(gencode, 'GENCODE_BASIC_FILE', self.directory+'wgEncodeGencodeBasic')
+        self.patch_basic_offsets = patch.object(gencode, '_gencode_basic_offsets', {})
+        self.patchers = [self.patch_refseq_file, self.patch_swissprot_file, self.patch_metadata_rows, self.patch_basic_file, self.patch_basic_offsets]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.directory)
+
+    def test_retrieve_refseq_identifiers_for_transcripts(self):
+        refseq_ids = retrieve_refseq_identifiers_for_transcripts(['ENST00000000001.1', 'ENST00000000003.1'])
+
+        # only exactly matching transcript ids
+        self.assertEqual(refseq_ids['ENST00000000001.1'], {'NP': ['NP_000001.1'], 'NM': ['NM_000001.1', 'NM_000002.1'], 'NR': []})
+        self.assertEqual(refseq_ids['ENST00000000003.1'], {'NP': [], 'NM': [], 'NR': []})
+        self.assertEqual(retrieve_refseq_identifiers_for_transcript('ENST00000000001.10')['NM'], ['NM_000010.1'])
+
+    def test_retrieveSwissProtIDs(self):
+        # the first entry is used
+        self.assertEqual(retrieveSwissProtIDs(['ENST00000000001.1', 'ENST00000000002.1', 'ENST00000000004.1']),
+                         {'ENST00000000001.1': {'ac': 'P00001', 'swissprot_id': 'TEST1_HUMAN'},
+                          'ENST00000000002.1': {'ac': 'P00003', 'swissprot_id': 'TEST3_HUMAN'}})
+        self.assertEqual(retrieveSwissProtID('ENST00000000002.1'), {'ac': 'P00003', 'swissprot_id': 'TEST3_HUMAN'})
+
+        with self.assertRaises(NoSwissProtEntryFoundException):
+            retrieveSwissProtID('ENST00000000004.1')
+
+    def test_metadata_is_read_once(self):
+        with patch('metadome.domain.wrappers.gencode.open', side_effect=open) as mock_open:
+            retrieve_refseq_identifiers_for_transcript('ENST00000000001.1')
+            retrieve_refseq_identifiers_for_transcript('ENST00000000002.1')
+            self.assertEqual(mock_open.call_count, 1)
+
+    def test_retrieveMRNAValidatedTranslations_gencode(self):
+        # only exactly matching gene names
+        translations = list(retrieveMRNAValidatedTranslations_gencode('GENE1'))
+        self.assertEqual([t['transcription_id'] for t in translations], ['ENST00000000001.1', 'ENST00000000002.1'])
+        self.assertEqual(translations[0]['cdsStart'], 20)
+        self.assertEqual(translations[1]['chrom'], 'chr2')
+
+        translations_per_gene = retrieveMRNAValidatedTranslationsForGenes_gencode(['GENE10', 'GENE2'])
+        self.assertEqual([t['strand'] for t in translations_per_gene['GENE10']], ['-'])
+        self.assertEqual(translations_per_gene['GENE2'], [])
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
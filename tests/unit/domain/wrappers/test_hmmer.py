@@ -0,0 +1,109 @@
+import unittest
+import tempfile
+import shutil
+import gzip
+import os
+import subprocess
+from mock import patch
+
+from metadome.domain.wrappers import hmmer
+from metadome.domain.wrappers.hmmer import retrieve_PFAM_ID_by_AC,\
+    report_hmm_stat_for_pfam, retrieve_PFAM_consensus_sequence,\
+    FoundNoPfamHMMException
+
+hmmstat_output = '''# idx  name                 accession        nseq eff_nseq      M relent   info p relE compKL
+# ---- -------------------- ------------ -------- -------- ------ ------ ------ ------ ------
+1      Test                 PF00001.1          10     1.00      5   0.59   0.60   0.55   0.01
+'''
+
+def mock_hmmer(args, stdout=None):
+    """Mocks hmmfetch, hmmemit and hmmstat"""
+    if args[0] == hmmer.HMMFETCH_EXECUTABLE:
+        with open(args[2], 'w') as f:
+            f.write('HMMER3/f\nNAME  '+args[4]+'\n//\n')
+    elif args[0] == hmmer.HMMEMIT_EXECUTABLE:
+        with open(args[2], 'w') as f:
+            f.write('>Test-consensus\nMAGWK\n')
+    elif args[0] == hmmer.HMMSTAT_EXECUTABLE:
+        stdout.write(hmmstat_output.encode())
+        stdout.flush()
+    return 0
+
+class TestHmmer(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()+'/'
+        with gzip.open(self.directory+'Pfam-A.hmm.dat.gz', 'wt') as f:
+            f.write('# STOCKHOLM 1.0\n#=GF ID   Test\n#=GF AC   PF00001.1\n//\n'
+                    '# STOCKHOLM 1.0\n#=GF ID   Test10\n#=GF AC   PF000010.2\n//\n')
+        with open(self.directory+'Pfam-A.hmm', 'w') as f:
+            f.write('HMMER3/f\n')
+        os.mkdir(self.directory+'hmm_cache/')
+
+        self.patchers = [patch.object(hmmer, 'PFAM_HMM_DAT', self.directory+'Pfam-A.hmm.dat.gz'),
+                         patch.object(hmmer, 'PFAM_HMM', self.directory+'Pfam-A.hmm'),
+                         patch.object(hmmer, 'PFAM_HMM_CACHE_DIR', self.directory+'hmm_cache/'),
+                         patch.object(hmmer, '_pfam_ids_per_ac', {})]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.directory)
+
+    def test_retrieve_PFAM_ID_by_AC(self):
+        self.assertEqual(list(retrieve_PFAM_ID_by_AC('PF00001')), [('Test', 'PF00001.1')])
+        self.assertEqual(list(retrieve_PFAM_ID_by_AC('PF000010')), [('Test10', 'PF000010.2')])
+        self.assertEqual(list(retrieve_PFAM_ID_by_AC('PF00002')), [])
+
+        with self.assertRaises(FoundNoPfamHMMException):
+            report_hmm_stat_for_pfam('PF00002')
+
+    @patch('metadome.domain.wrappers.hmmer.subprocess.check_call')
+    @patch('metadome.domain.wrappers.hmmer.subprocess.call')
+    def test_results_are_cached(self, mock_call, mock_check_call):
+        mock_call.side_effect = mock_hmmer
+        # hmmfetch is counted together with the other calls
+        mock_check_call.side_effect = lambda args: mock_call(args)
+
+        hmmstat = report_hmm_stat_for_pfam('PF00001')
+        self.assertEqual([(entry['name'], entry['M']) for entry in hmmstat], [('Test', 5)])
+        self.assertEqual(retrieve_PFAM_consensus_sequence('PF00001'), ('Test-consensus', 'MAGWK'))
+
+        # the HMM is fetched only once
+        self.assertEqual([call[0][0][0] for call in mock_call.call_args_list],
+                         [hmmer.HMMFETCH_EXECUTABLE, hmmer.HMMSTAT_EXECUTABLE, hmmer.HMMEMIT_EXECUTABLE])
+
+        # cached results are read from disk
+        self.assertEqual(report_hmm_stat_for_pfam('PF00001'), hmmstat)
+        self.assertEqual(retrieve_PFAM_consensus_sequence('PF00001'), ('Test-consensus', 'MAGWK'))
+        self.assertEqual(mock_call.call_count, 3)
+
+        # a new version of the Pfam HMM replaces the cached results
+        with open(self.directory+'Pfam-A.hmm', 'a') as f:
+            f.write('//\n')
+        report_hmm_stat_for_pfam('PF00001')
+        self.assertEqual(mock_call.call_count, 5)
+        self.assertEqual(sorted(filename.split('_')[0] for filename in os.listdir(self.directory+'hmm_cache/PF00001')), ['consensus', 'hmm', 'hmmstat'])
+
+    @patch('metadome.domain.wrappers.hmmer.subprocess.check_call')
+    def test_failed_fetch_is_not_cached(self, mock_check_call):
+        def failing_hmmfetch(args):
+            # a partially written HMM
+            with open(args[2], 'w') as f:
+                f.write('HMMER3/f\n')
+            raise subprocess.CalledProcessError(1, args)
+        mock_check_call.side_effect = failing_hmmfetch
+
+        for cache_dir in [self.directory+'hmm_cache/', self.directory+'missing/']:
+            with patch.object(hmmer, 'PFAM_HMM_CACHE_DIR', cache_dir):
+                with self.assertRaises(subprocess.CalledProcessError):
+                    report_hmm_stat_for_pfam('PF00001')
+
+        # no (temporary) HMM is left behind
+        self.assertEqual(os.listdir(self.directory+'hmm_cache/PF00001'), [])
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import tempfile
+import shutil
+from mock import patch
+
+from metadome.domain.wrappers import uniprot
+from metadome.domain.wrappers.uniprot import getUniprotSequence,\
+    load_uniprot_sequences, retrieveIdenticalUniprotMatch,\
+    retrieveIdenticalUniprotEntries, blastUniprotSequencesInBatch
+
+fasta_lines = ['>sp|P00001|TEST1_HUMAN Test protein 1 OS=Homo sapiens',
+               'MAGW',
+               'MAG',
+               '>sp|P00001-2|TEST1_HUMAN Isoform 2 of Test protein 1 OS=Homo sapiens',
+               'MAGWW',
+               '>sp|P000010|TEST10_MOUSE Test protein 10 OS=Mus musculus',
+               'MWWW',
+               'W']
+
+class TestUniprot(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()+'/'
+        self.fasta_file = self.directory+'uniprot_sprot_canonical_and_varsplic.fasta'
+        with open(self.fasta_file, 'w') as f:
+            f.write('\n'.join(fasta_lines)+'\n')
+
+        self.patchers = [patch.object(uniprot, 'UNIPROT_SPROT_CANONICAL_AND_ISOFORM', self.fasta_file),
+                         patch.object(uniprot, '_uniprot_header_indices', {}),
+                         patch.object(uniprot, '_uniprot_sequences', {}),
+                         patch.object(uniprot, '_uniprot_sequence_hashes', {})]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.directory)
+
+    def test_getUniprotSequence(self):
+        # only exactly matching accession codes, the sequence lines are joined
+        self.assertEqual(getUniprotSequence('P00001', self.fasta_file), 'MAGWMAG')
+        self.assertEqual(getUniprotSequence('P00001-2', self.fasta_file), 'MAGWW')
+        self.assertEqual(getUniprotSequence('P000010', self.fasta_file), 'MWWWW')
+        self.assertEqual(getUniprotSequence('P00002', self.fasta_file), '')
+
+    def test_load_uniprot_sequences(self):
+        load_uniprot_sequences(self.fasta_file, 'HUMAN')
+        self.assertEqual(uniprot._uniprot_sequences[self.fasta_file], {'P00001': 'MAGWMAG', 'P00001-2': 'MAGWW'})
+
+        # the sequences in memory are used, other entries are still retrieved from the file
+        with patch('metadome.domain.wrappers.uniprot.retrieve_uniprot_header_index') as mock_index:
+            self.assertEqual(getUniprotSequence('P00001-2', self.fasta_file), 'MAGWW')
+            self.assertEqual(mock_index.call_count, 0)
+        self.assertEqual(getUniprotSequence('P000010', self.fasta_file), 'MWWWW')
+
+    @patch('metadome.domain.wrappers.uniprot.retrieveMatchingUniprotSequences')
+    def test_retrieveIdenticalUniprotMatch(self, mock_retrieveMatchingUniprotSequences):
+        mock_retrieveMatchingUniprotSequences.return_value = [{'database_id': 'sp', 'accession_code': 'P00001', 'entry_name': 'TEST1_HUMAN'},
+                                                              {'database_id': 'sp', 'accession_code': 'P00001-2', 'entry_name': 'TEST1_HUMAN'}]
+
+        uniprot_result = retrieveIdenticalUniprotMatch({'sequence': 'MAGWW', 'gene-name': 'TEST1'})
+        self.assertEqual(uniprot_result['uniprot_ac'], 'P00001-2')
+        self.assertEqual(uniprot_result['sequence'], 'MAGWW')
+        self.assertEqual(uniprot_result['database'], 'swissprot')
+
+    @patch('metadome.domain.wrappers.uniprot.retrieveMatchingUniprotSequences')
+    def test_retrieveIdenticalUniprotMatch_without_blast(self, mock_retrieveMatchingUniprotSequences):
+        self.assertEqual(retrieveIdenticalUniprotEntries('MAGWMAG', self.fasta_file, 'HUMAN'),
+                         [{'database_id': 'sp', 'accession_code': 'P00001', 'entry_name': 'TEST1_HUMAN', 'sseqid': 'sp|P00001|TEST1_HUMAN'}])
+        self.assertEqual(retrieveIdenticalUniprotEntries('MWWWW', self.fasta_file, 'HUMAN'), [])
+
+        # an identical sequence of the species is matched without blasting
+        uniprot_result = retrieveIdenticalUniprotMatch({'sequence': 'MAGWW', 'gene-name': 'TEST1'}, species_filter='HUMAN')
+        self.assertEqual(uniprot_result['uniprot_ac'], 'P00001-2')
+        self.assertEqual(uniprot_result['uniprot_name'], 'TEST1_HUMAN')
+        self.assertEqual(mock_retrieveMatchingUniprotSequences.call_count, 0)
+
+        # otherwise blast is used
+        mock_retrieveMatchingUniprotSequences.return_value = []
+        with self.assertRaises(uniprot.NoUniProtACFoundException):
+            retrieveIdenticalUniprotMatch({'sequence': 'MAGWWW', 'gene-name': 'TEST1'}, species_filter='HUMAN')
+        self.assertEqual(mock_retrieveMatchingUniprotSequences.call_count, 1)
+
+    @patch('metadome.domain.wrappers.uniprot.run_blast')
+    @patch('metadome.domain.wrappers.uniprot.run_blast_batch')
+    def test_blastUniprotSequencesInBatch(self, mock_run_blast_batch, mock_run_blast):
+        mock_run_blast_batch.return_value = [['query_0,sp|P000010|TEST10_MOUSE,100.000,5,0,0,1,5,1,5,1e-10,10.0,5'], []]
+
+        blast_results = blastUniprotSequencesInBatch([{'sequence': 'MAGWW'}, {'sequence': 'MWWWW'}, {'sequence': 'MWWWW'}, {'sequence': 'MW'}], species_filter='HUMAN')
+
+        # only the unique sequences without an identical entry of the species are blasted
+        self.assertEqual(mock_run_blast_batch.call_count, 1)
+        self.assertEqual(mock_run_blast_batch.call_args[0][0], ['MWWWW', 'MW'])
+
+        # the batch results are used instead of blasting again
+        self.assertEqual(sorted(blast_results.keys()), ['MW', 'MWWWW'])
+        uniprot_result = retrieveIdenticalUniprotMatch({'sequence': 'MWWWW', 'gene-name': 'TEST10'}, blast_results=blast_results)
+        self.assertEqual(uniprot_result['uniprot_ac'], 'P000010')
+        with self.assertRaises(uniprot.NoUniProtACFoundException):
+            retrieveIdenticalUniprotMatch({'sequence': 'MW', 'gene-name': 'TEST11'}, blast_results=blast_results)
+        self.assertEqual(mock_run_blast.call_count, 0)
+
+        # without the batch results the sequence is blasted on its own
+        mock_run_blast.return_value = mock_run_blast_batch.return_value[0]
+        retrieveIdenticalUniprotMatch({'sequence': 'MWWWW', 'gene-name': 'TEST10'})
+        self.assertEqual(mock_run_blast.call_count, 1)
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()